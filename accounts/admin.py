@@ -1,19 +1,46 @@
 from django.contrib import admin
-from .models import UserProfile, PaymentMethod, Payment, Order
+from django.core.handlers.asgi import ASGIRequest
+from forge.admin import CachedValuesFieldListFilter, EstimatedCountMixin, TrigramSearchMixin
+from .exports import EXPORTS
+from .models import UserProfile, PaymentMethod, Payment, Order, RevenueRollup, StripeEvent
+
+
+class FinanceExportMixin:
+    """
+    Actions streaming the selected rows as CSV or JSON Lines (accounts.exports).
+    Select all across the filtered changelist to export a date range or status.
+    """
+    export = None
+    actions = ['export_csv', 'export_jsonl']
+
+    def export_response(self, request, queryset, format):
+        export = EXPORTS[self.export]
+        return export.response(export.queryset(queryset), format,
+                               asynchronous=isinstance(request, ASGIRequest))
+
+    @admin.action(description='Export selected as CSV', permissions=['view'])
+    def export_csv(self, request, queryset):
+        return self.export_response(request, queryset, 'csv')
+
+    @admin.action(description='Export selected as JSON Lines', permissions=['view'])
+    def export_jsonl(self, request, queryset):
+        return self.export_response(request, queryset, 'jsonl')
 
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(TrigramSearchMixin, admin.ModelAdmin):
     list_display = ['user', 'phone', 'company', 'stripe_customer_id', 'created_at']
+    list_select_related = ['user']
     search_fields = ['user__username', 'user__email', 'phone', 'company']
     readonly_fields = ['id', 'created_at', 'updated_at', 'stripe_customer_id']
     raw_id_fields = ['user']
 
 
 @admin.register(PaymentMethod)
-class PaymentMethodAdmin(admin.ModelAdmin):
+class PaymentMethodAdmin(TrigramSearchMixin, admin.ModelAdmin):
     list_display = ['user', 'payment_type', 'card_brand', 'card_last4', 'is_default', 'is_active', 'created_at']
     list_filter = ['payment_type', 'is_default', 'is_active', 'card_brand']
+    list_select_related = ['user']
     search_fields = ['user__username', 'user__email', 'card_last4', 'billing_name', 'billing_email']
     readonly_fields = ['id', 'created_at', 'updated_at', 'stripe_payment_method_id']
     raw_id_fields = ['user']
@@ -39,13 +66,18 @@ class PaymentMethodAdmin(admin.ModelAdmin):
 
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(FinanceExportMixin, EstimatedCountMixin, TrigramSearchMixin, admin.ModelAdmin):
     list_display = ['id', 'user', 'status', 'total', 'currency', 'variant', 'created']
-    list_filter = ['status', 'variant', 'currency', 'created']
-    search_fields = ['user__username', 'user__email', 'description', 'transaction_id']
+    list_filter = [
+        'status', ('variant', CachedValuesFieldListFilter), ('currency', CachedValuesFieldListFilter), 'created',
+    ]
+    # Payment.user is nullable, which the changelist's default select_related() skips
+    list_select_related = ['user']
+    search_fields = ['user__username', 'user__email', 'billing_email', 'description', 'transaction_id']
     readonly_fields = ['created', 'modified', 'transaction_id']
     raw_id_fields = ['user', 'saved_payment_method']
     date_hierarchy = 'created'
+    export = 'payments'
     
     fieldsets = (
         ('Payment Information', {
@@ -75,25 +107,29 @@ class PaymentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(FinanceExportMixin, EstimatedCountMixin, TrigramSearchMixin, admin.ModelAdmin):
     list_display = ['id_short', 'user', 'total_amount', 'currency', 'status', 'payment_status', 'created_at']
-    list_filter = ['status', 'currency', 'created_at']
+    list_filter = ['status', ('currency', CachedValuesFieldListFilter), 'created_at']
+    # Both are nullable; without this each row costs a query for the user
+    # and another for payment_status
+    list_select_related = ['user', 'payment']
     search_fields = ['user__username', 'user__email', 'description']
     readonly_fields = ['id', 'created_at', 'updated_at']
     raw_id_fields = ['user', 'payment', 'payment_method']
     date_hierarchy = 'created_at'
+    export = 'orders'
     
     def id_short(self, obj):
         """Show shortened UUID for list display"""
         return str(obj.id)[:8] + '...'
     id_short.short_description = 'Order ID'
     
+    @admin.display(description='Payment Status', ordering='payment__status')
     def payment_status(self, obj):
         """Show payment status"""
         if obj.payment:
             return obj.payment.status
         return 'No payment'
-    payment_status.short_description = 'Payment Status'
     
     fieldsets = (
         ('Order Information', {
@@ -113,3 +149,33 @@ class OrderAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'event_type', 'created_at', 'processed_at', 'attempts']
+    list_filter = ['event_type']
+    search_fields = ['event_id']
+    readonly_fields = ['id', 'event_id', 'event_type', 'payload', 'processed_at', 'attempts', 'error',
+                       'created_at', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RevenueRollup)
+class RevenueRollupAdmin(admin.ModelAdmin):
+    """Read-only: rows only change with orders, or through rebuild_revenue_rollups."""
+    list_display = ['day', 'currency', 'status', 'order_count', 'total_amount']
+    list_filter = ['status', 'currency']
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,106 @@
+"""
+Benchmark the revenue report against aggregating orders directly.
+
+Inserts synthetic orders spread over --days days, in steps up to each size
+in --orders, inside a transaction that is rolled back afterwards (unless
+--keep). After each step it builds the rollups and times a 30-day daily
+revenue report two ways: accounts.reporting.revenue_by_day(), which reads
+RevenueRollup, and the same report as a GROUP BY over accounts_order.
+The first should stay flat as order history grows; the second grows with it.
+"""
+import datetime
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from accounts.models import Order, RevenueRollup
+from accounts.reporting import REVENUE_STATUSES, revenue_by_day
+
+STATUSES = ['completed'] * 8 + ['refunded', 'failed']
+CURRENCIES = ['USD'] * 4 + ['EUR']
+
+
+class Command(BaseCommand):
+    help = 'Time the 30-day revenue report from rollups against a live aggregate as orders grow'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', default='10000,100000,500000',
+                            help='Comma-separated order counts to measure at')
+        parser.add_argument('--days', type=int, default=730,
+                            help='Days of history the orders are spread over')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Times each report runs; the best time is shown')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic data instead of rolling back')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['orders'].split(','))
+        tz = timezone.get_default_timezone()
+        today = timezone.localdate()
+        end = today + datetime.timedelta(days=1)
+        start = end - datetime.timedelta(days=30)
+        rng = random.Random(42)
+
+        self.stdout.write(f'{"orders":>10} {"rollup ms":>10} {"live ms":>10} {"rollup rows":>12}')
+        with transaction.atomic():
+            inserted = 0
+            for size in sizes:
+                self.populate(rng, size - inserted, today, options)
+                inserted = size
+                RevenueRollup.objects.rebuild()
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE accounts_order')
+                        cursor.execute('ANALYZE accounts_revenuerollup')
+
+                live = (
+                    Order.objects.order_by()
+                    .filter(
+                        created_at__gte=datetime.datetime.combine(start, datetime.time.min, tz),
+                        created_at__lt=datetime.datetime.combine(end, datetime.time.min, tz),
+                        status__in=REVENUE_STATUSES,
+                    )
+                    .annotate(day=TruncDate('created_at', tzinfo=tz))
+                    .values('day', 'currency')
+                    .annotate(orders=Count('pk'), revenue=Sum('total_amount'))
+                )
+                rollup_ms = self.best(lambda: list(revenue_by_day(start, end)), options['repeat'])
+                live_ms = self.best(lambda: list(live.all()), options['repeat'])
+                self.stdout.write(
+                    f'{size:>10} {rollup_ms:>10.2f} {live_ms:>10.2f} {RevenueRollup.objects.count():>12}'
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def populate(self, rng, count, today, options):
+        """Insert count orders; each batch shares one creation day."""
+        tz = timezone.get_default_timezone()
+        batch_size = options['batch_size']
+        for offset in range(0, count, batch_size):
+            day = today - datetime.timedelta(days=rng.randrange(options['days']))
+            batch = Order.objects.bulk_create([
+                Order(
+                    total_amount=Decimal(rng.randrange(500, 50000)) / 100,
+                    currency=rng.choice(CURRENCIES), status=rng.choice(STATUSES),
+                )
+                for _ in range(min(batch_size, count - offset))
+            ])
+            # created_at is auto_now_add, so backdate the batch after inserting it
+            Order.objects.filter(pk__in=[order.pk for order in batch]).update(
+                created_at=datetime.datetime.combine(day, datetime.time(12), tz),
+            )
+
+    def best(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - began) * 1000)
+        return min(timings)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.webhooks import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Apply stored Stripe webhook events to payments and orders in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Events applied per transaction')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when no event was applied')
+        parser.add_argument('--once', action='store_true',
+                            help='Process every waiting event, then exit')
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                handled = process_batch(options['batch_size'])
+                total += handled
+                # Back off when nothing was waiting, every event failed or the
+                # database is down, instead of reclaiming straight away
+                if handled:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Processed {total} event(s)')
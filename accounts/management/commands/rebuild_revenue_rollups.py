@@ -0,0 +1,36 @@
+"""
+Recompute RevenueRollup from the orders table.
+
+The rollups are maintained incrementally by Order.save(),
+OrderQuerySet.set_status() and order deletion, so orders changed behind
+the ORM's back (raw SQL, a plain queryset.update() of status) leave them
+wrong. This replaces the rows for a day range (default: every day) with
+fresh totals in one transaction. On PostgreSQL order writes wait for it.
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import RevenueRollup
+
+
+def _day(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}; use YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily revenue rollups from orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=_day,
+                            help='First day rebuilt (YYYY-MM-DD, TIME_ZONE)')
+        parser.add_argument('--to', dest='end', type=_day,
+                            help='Last day rebuilt (YYYY-MM-DD, TIME_ZONE)')
+
+    def handle(self, *args, **options):
+        end = options['end'] + datetime.timedelta(days=1) if options['end'] else None
+        written = RevenueRollup.objects.rebuild(start=options['start'], end=end)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} rollup row(s)'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:08
+
+import forge.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='id',
+            field=models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='paymentmethod',
+            name='id',
+            field=models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='id',
+            field=models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def keep_newest_default(apps, schema_editor):
+    """Leave at most one default payment method per user before adding the constraint."""
+    PaymentMethod = apps.get_model('accounts', 'PaymentMethod')
+    seen_users = set()
+    stale = []
+    defaults = PaymentMethod.objects.filter(is_default=True).order_by('user_id', '-updated_at')
+    for pk, user_id in defaults.values_list('pk', 'user_id').iterator():
+        if user_id in seen_users:
+            stale.append(pk)
+        seen_users.add(user_id)
+    for start in range(0, len(stale), 500):
+        PaymentMethod.objects.filter(pk__in=stale[start:start + 500]).update(is_default=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_newest_default, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='paymentmethod',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('user',), name='unique_default_payment_method'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:40
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from forge.operations import RunPostgresSQL
+
+# (index, table, column) for every column the accounts admins search. Each
+# index is on UPPER(column), the expression Django's icontains, istartswith
+# and iexact compare on PostgreSQL, so forge.admin.TrigramSearchMixin's
+# per-field branches can use them.
+TRIGRAM_INDEXES = [
+    ('auth_user_username_trgm_idx', 'auth_user', 'username'),
+    ('auth_user_email_trgm_idx', 'auth_user', 'email'),
+    ('userprofile_phone_trgm_idx', 'accounts_userprofile', 'phone'),
+    ('userprofile_company_trgm_idx', 'accounts_userprofile', 'company'),
+    ('paymentmethod_last4_trgm_idx', 'accounts_paymentmethod', 'card_last4'),
+    ('paymentmethod_name_trgm_idx', 'accounts_paymentmethod', 'billing_name'),
+    ('paymentmethod_email_trgm_idx', 'accounts_paymentmethod', 'billing_email'),
+    ('payment_email_trgm_idx', 'accounts_payment', 'billing_email'),
+    ('payment_description_trgm_idx', 'accounts_payment', 'description'),
+    ('payment_transaction_trgm_idx', 'accounts_payment', 'transaction_id'),
+    ('order_description_trgm_idx', 'accounts_order', 'description'),
+]
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; it builds
+    # the indexes without blocking writes to the payment tables
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0005_stripe_events'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        *[
+            RunPostgresSQL(
+                sql=f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} '
+                    f'USING gin (UPPER({column}::text) gin_trgm_ops);',
+                reverse_sql=f'DROP INDEX CONCURRENTLY IF EXISTS {name};',
+            )
+            for name, table, column in TRIGRAM_INDEXES
+        ],
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:30
+
+import forge.ids
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def build_rollups(apps, schema_editor):
+    """Fill RevenueRollup from the existing orders (RevenueRollupQuerySet.rebuild())."""
+    Order = apps.get_model('accounts', 'Order')
+    RevenueRollup = apps.get_model('accounts', 'RevenueRollup')
+    totals = (
+        Order.objects.order_by()
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_default_timezone()))
+        .values('day', 'currency', 'status')
+        .annotate(order_count=models.Count('pk'), total_amount=models.Sum('total_amount'))
+    )
+    RevenueRollup.objects.bulk_create([RevenueRollup(**row) for row in totals.iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_export_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueRollup',
+            fields=[
+                ('id', models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed'), ('refunded', 'Refunded'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('order_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['day', 'currency', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'currency', 'status'), name='revenuerollup_key_unique')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
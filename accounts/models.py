@@ -1,5 +1,11 @@
-from django.db import models
+import datetime
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import connections, models, transaction
+from django.db.models.functions import TruncDate
 from django.contrib.auth.models import User
+from django.utils import timezone
 from forge.models import BaseModel
 from payments.models import BasePayment
 
@@ -65,12 +71,55 @@ class PaymentMethod(BaseModel):
 
     class Meta:
         ordering = ['-is_default', '-created_at']
-        
+        indexes = [
+            models.Index(
+                fields=['user', '-is_default', '-created_at'],
+                condition=models.Q(is_active=True),
+                name='paymentmethod_user_active_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(is_default=True),
+                name='unique_default_payment_method',
+            ),
+        ]
+
+    def _clear_other_defaults(self):
+        """
+        Unset the user's other default payment methods.
+        Must run inside a transaction. The user row is locked first so that
+        concurrent default switches for the same user queue up behind each
+        other instead of both passing the partial unique constraint check.
+        """
+        list(User.objects.select_for_update().filter(pk=self.user_id).values_list('pk'))
+        PaymentMethod.objects.filter(
+            user_id=self.user_id, is_default=True,
+        ).exclude(pk=self.pk).update(is_default=False, updated_at=timezone.now())
+
     def save(self, *args, **kwargs):
+        if not self.is_default:
+            super().save(*args, **kwargs)
+            return
         # If this is set as default, unset other defaults for this user
-        if self.is_default:
-            PaymentMethod.objects.filter(user=self.user, is_default=True).update(is_default=False)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            self._clear_other_defaults()
+            super().save(*args, **kwargs)
+
+    def make_default(self):
+        """Make this the user's only default payment method in one transaction."""
+        with transaction.atomic():
+            self._clear_other_defaults()
+            self.updated_at = timezone.now()
+            PaymentMethod.objects.filter(pk=self.pk).update(
+                is_default=True, updated_at=self.updated_at,
+            )
+        self.is_default = True
+
+    async def amake_default(self):
+        """Async variant of make_default()."""
+        await sync_to_async(self.make_default)()
 
 
 class Payment(BasePayment):
@@ -108,6 +157,46 @@ class Payment(BasePayment):
             }
         ]
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['transaction_id'], name='payment_transaction_idx'),
+            # Finance exports and the admin's date hierarchy (accounts.exports)
+            models.Index(fields=['status', 'created'], name='payment_status_created_idx'),
+            models.Index(fields=['created'], name='payment_created_idx'),
+        ]
+
+
+def _add_revenue(deltas, created_at, currency, status, amount, sign=1):
+    """Add one order, or take it away (sign=-1), in deltas {(day, currency, status): (orders, amount)}."""
+    key = (timezone.localdate(created_at, timezone.get_default_timezone()), currency, status)
+    orders, total = deltas.get(key, (0, Decimal(0)))
+    deltas[key] = (orders + sign, total + sign * Decimal(str(amount)))
+
+
+class OrderQuerySet(models.QuerySet):
+    def set_status(self, status, **fields):
+        """
+        Move every order in the queryset to status with one UPDATE, also
+        setting any extra fields, and move their revenue between
+        RevenueRollup rows to match. Returns the number of orders updated.
+        """
+        with transaction.atomic(using=self.db):
+            # Lock the orders (not joined rows) so nobody moves them between reading and updating
+            rows = list(
+                self.select_for_update(of=('self',)).order_by()
+                .values_list('pk', 'created_at', 'currency', 'status', 'total_amount')
+            )
+            deltas = {}
+            for _, created_at, currency, previous, amount in rows:
+                if previous != status:
+                    _add_revenue(deltas, created_at, currency, previous, amount, -1)
+                    _add_revenue(deltas, created_at, currency, status, amount)
+            updated = Order.objects.filter(pk__in=[row[0] for row in rows]).update(
+                **{'status': status, 'updated_at': timezone.now(), **fields},
+            )
+            RevenueRollup.objects.adjust(deltas)
+        return updated
+
 
 class Order(BaseModel):
     """
@@ -138,11 +227,158 @@ class Order(BaseModel):
     
     # Metadata
     notes = models.TextField(blank=True)
+
+    objects = OrderQuerySet.as_manager()
     
     def __str__(self):
         return f"Order {str(self.id)[:8]} - {self.user.username if self.user else 'Guest'} - ${self.total_amount}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'status', 'currency', 'total_amount'} & set(update_fields):
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using') or Order.objects.db):
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Order.objects.select_for_update().filter(pk=self.pk)
+                    .values_list('created_at', 'currency', 'status', 'total_amount').first()
+                )
+            super().save(*args, **kwargs)
+            deltas = {}
+            if previous is not None:
+                _add_revenue(deltas, *previous, -1)
+            _add_revenue(deltas, self.created_at, self.currency, self.status, self.total_amount)
+            RevenueRollup.objects.adjust(deltas)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+            # Finance exports and the admin's date hierarchy (accounts.exports)
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
+
+
+class RevenueRollupQuerySet(models.QuerySet):
+    def adjust(self, deltas):
+        """
+        Add deltas ({(day, currency, status): (orders, amount)}) to the
+        matching rows, creating missing ones, with one INSERT and one UPDATE.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta != (0, 0)}
+        if not deltas:
+            return 0
+        self.bulk_create(
+            [RevenueRollup(day=day, currency=currency, status=status) for day, currency, status in deltas],
+            ignore_conflicts=True,
+        )
+        conditions = [models.Q(day=day, currency=currency, status=status) for day, currency, status in deltas]
+        amount_field = RevenueRollup._meta.get_field('total_amount')
+        orders = models.Case(
+            *[models.When(condition, then=models.Value(count))
+              for condition, (count, _) in zip(conditions, deltas.values())],
+            default=models.Value(0),
+        )
+        amount = models.Case(
+            *[models.When(condition, then=models.Value(total, output_field=amount_field))
+              for condition, (_, total) in zip(conditions, deltas.values())],
+            default=models.Value(Decimal(0), output_field=amount_field),
+        )
+        query = models.Q()
+        for condition in conditions:
+            query |= condition
+        return self.filter(query).update(
+            order_count=models.F('order_count') + orders,
+            total_amount=models.F('total_amount') + amount,
+            updated_at=timezone.now(),
+        )
 
+    def rebuild(self, start=None, end=None):
+        """
+        Recompute the rows for days in [start, end) (default: all) from the
+        orders table. On PostgreSQL order writes wait until it finishes, so
+        no transition is lost between reading orders and replacing rows.
+        Returns the number of rows written.
+        """
+        tz = timezone.get_default_timezone()
+        orders = Order.objects.order_by()
+        rollups = self
+        if start:
+            orders = orders.filter(created_at__gte=datetime.datetime.combine(start, datetime.time.min, tz))
+            rollups = rollups.filter(day__gte=start)
+        if end:
+            orders = orders.filter(created_at__lt=datetime.datetime.combine(end, datetime.time.min, tz))
+            rollups = rollups.filter(day__lt=end)
+        totals = (
+            orders.annotate(day=TruncDate('created_at', tzinfo=tz))
+            .values('day', 'currency', 'status')
+            .annotate(order_count=models.Count('pk'), total_amount=models.Sum('total_amount'))
+        )
+        with transaction.atomic(using=self.db):
+            connection = connections[self.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LOCK TABLE {connection.ops.quote_name(Order._meta.db_table)} IN SHARE MODE')
+            rollups.delete()
+            created = self.bulk_create(
+                [RevenueRollup(**row) for row in totals.iterator()], batch_size=1000,
+            )
+        return len(created)
 
+
+class RevenueRollup(BaseModel):
+    """
+    Number and total of orders per (day, currency, status), where day is the
+    order's creation date in TIME_ZONE. Order.save(), OrderQuerySet.set_status()
+    and order deletion keep it current, so revenue reports (accounts.reporting)
+    never aggregate the orders table. rebuild_revenue_rollups recomputes it.
+    Uses UUID as primary key via BaseModel inheritance.
+    """
+    day = models.DateField()
+    currency = models.CharField(max_length=3)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    objects = RevenueRollupQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.day} {self.currency} {self.status}: {self.order_count} order(s), {self.total_amount}"
+
+    class Meta:
+        ordering = ['day', 'currency', 'status']
+        constraints = [
+            # Also the index reports read day ranges through
+            models.UniqueConstraint(fields=['day', 'currency', 'status'], name='revenuerollup_key_unique'),
+        ]
+
+
+class StripeEvent(BaseModel):
+    """
+    Raw Stripe webhook events, stored as received.
+    Rows are only ever inserted by the webhook endpoint; the unique event_id
+    makes redelivered events a no-op. process_stripe_events applies them in
+    batches and stamps processed_at.
+    Uses UUID as primary key via BaseModel inheritance.
+    """
+    event_id = models.CharField(max_length=255, unique=True, help_text="Stripe event ID (evt_...)")
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id}"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(processed_at__isnull=True),
+                name='stripeevent_unprocessed_idx',
+            ),
+        ]
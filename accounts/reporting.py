@@ -0,0 +1,48 @@
+"""
+Revenue reports read from RevenueRollup only.
+
+Every query filters the rollup table on a day range, which its unique
+(day, currency, status) index serves. A report's cost therefore depends on
+the number of days and currencies it covers, not on how many orders exist.
+Days are in TIME_ZONE.
+"""
+from django.db.models import Sum
+
+from .models import RevenueRollup
+
+# Orders whose amount counts as revenue; refunded orders are reported separately
+REVENUE_STATUSES = ('completed',)
+
+
+def _rollups(start, end, currency=None, statuses=REVENUE_STATUSES):
+    rollups = RevenueRollup.objects.filter(day__gte=start, day__lt=end, status__in=statuses)
+    if currency:
+        rollups = rollups.filter(currency=currency)
+    return rollups
+
+
+def revenue_by_day(start, end, currency=None, statuses=REVENUE_STATUSES):
+    """
+    Rows of {'day', 'currency', 'orders', 'revenue'} for days in
+    [start, end), oldest first. Days without orders are left out.
+    """
+    return (
+        _rollups(start, end, currency, statuses)
+        .values('day', 'currency')
+        .annotate(orders=Sum('order_count'), revenue=Sum('total_amount'))
+        .filter(orders__gt=0)
+        .order_by('day', 'currency')
+    )
+
+
+def revenue_by_status(start, end, currency=None, statuses=None):
+    """Rows of {'currency', 'status', 'orders', 'amount'} over days in [start, end)."""
+    if statuses is None:
+        statuses = [status for status, _ in RevenueRollup._meta.get_field('status').choices]
+    return (
+        _rollups(start, end, currency, statuses)
+        .values('currency', 'status')
+        .annotate(orders=Sum('order_count'), amount=Sum('total_amount'))
+        .filter(orders__gt=0)
+        .order_by('currency', 'status')
+    )
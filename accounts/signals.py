@@ -0,0 +1,18 @@
+"""
+Keeps RevenueRollup current when orders are deleted. Creation and status
+changes go through Order.save() and OrderQuerySet.set_status().
+"""
+from django.db.models.signals import post_delete
+
+from .models import Order, RevenueRollup, _add_revenue
+
+
+def order_deleted(sender, instance, **kwargs):
+    # Covers queryset deletes too, which send post_delete for every order
+    deltas = {}
+    _add_revenue(deltas, instance.created_at, instance.currency, instance.status, instance.total_amount, -1)
+    RevenueRollup.objects.adjust(deltas)
+
+
+def connect():
+    post_delete.connect(order_deleted, sender=Order, dispatch_uid='accounts.order_deleted')
@@ -0,0 +1,176 @@
+"""
+Process-wide Stripe client.
+
+Every call the app makes to Stripe goes through call(). The underlying
+StripeClient is built once per process around a keep-alive requests session,
+so TLS connections to the API are reused across requests, and each call is
+bounded by the configured timeouts and retry policy. Per-operation latency
+is logged and kept in memory for inspection.
+
+Async views use acall(), which runs the same pooled call in a worker thread
+so the event loop is never blocked on the network.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+import stripe
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from forge.stats import percentile
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class StripeNotConfigured(Exception):
+    """Raised when a Stripe call is attempted without STRIPE_SECRET_KEY."""
+
+
+class LatencyMetrics:
+    """
+    Thread-safe per-operation call counts and latency samples.
+    Only the most recent `window` samples are kept for percentiles.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._calls = {}
+        self._errors = {}
+
+    def record(self, operation, elapsed_ms, ok):
+        with self._lock:
+            self._samples.setdefault(operation, deque(maxlen=self.window)).append(elapsed_ms)
+            self._calls[operation] = self._calls.get(operation, 0) + 1
+            if not ok:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+
+    def snapshot(self):
+        """Return {operation: {calls, errors, p50_ms, p95_ms, p99_ms, max_ms}}."""
+        with self._lock:
+            result = {}
+            for operation, samples in self._samples.items():
+                ordered = sorted(samples)
+                result[operation] = {
+                    'calls': self._calls[operation],
+                    'errors': self._errors.get(operation, 0),
+                    'p50_ms': percentile(ordered, 50),
+                    'p95_ms': percentile(ordered, 95),
+                    'p99_ms': percentile(ordered, 99),
+                    'max_ms': ordered[-1],
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._calls.clear()
+            self._errors.clear()
+
+
+metrics = LatencyMetrics()
+
+
+def is_configured():
+    """Whether a Stripe secret key is set."""
+    return bool(settings.STRIPE_SECRET_KEY)
+
+
+def _build_client():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.STRIPE_POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    http_client = stripe.RequestsClient(
+        timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+        session=session,
+    )
+    options = {}
+    if settings.STRIPE_API_BASE:
+        options['base_addresses'] = {'api': settings.STRIPE_API_BASE}
+    return stripe.StripeClient(
+        settings.STRIPE_SECRET_KEY,
+        http_client=http_client,
+        max_network_retries=settings.STRIPE_MAX_RETRIES,
+        **options,
+    )
+
+
+def get_client():
+    """Return the shared StripeClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if not is_configured():
+                    raise StripeNotConfigured('STRIPE_SECRET_KEY is not set')
+                _client = _build_client()
+    return _client
+
+
+def reset_client():
+    """Drop the shared client so the next call rebuilds it from settings."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def call(operation, *args, **kwargs):
+    """
+    Call a Stripe v1 API method, e.g. call('payment_methods.detach', 'pm_123').
+    Raises StripeNotConfigured or stripe.StripeError on failure.
+    """
+    resource_name, method_name = operation.split('.')
+    method = getattr(getattr(get_client().v1, resource_name), method_name)
+    started = time.perf_counter()
+    ok = False
+    try:
+        result = method(*args, **kwargs)
+        ok = True
+        return result
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.record(operation, elapsed_ms, ok)
+        logger.info('stripe %s %s in %.1fms', operation, 'ok' if ok else 'failed', elapsed_ms)
+
+
+async def acall(operation, *args, **kwargs):
+    """
+    Async variant of call(). The request runs on a thread outside the
+    thread-sensitive executor, so concurrent Stripe calls don't queue
+    behind each other or behind sync ORM work.
+    """
+    return await sync_to_async(call, thread_sensitive=False)(operation, *args, **kwargs)
+
+
+def verify_webhook(payload, signature):
+    """
+    Check a webhook body against its Stripe-Signature header and return the
+    decoded event. Purely local: no request is made to Stripe.
+    Raises stripe.SignatureVerificationError or ValueError.
+    """
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        raise StripeNotConfigured('STRIPE_WEBHOOK_SECRET is not set')
+    text = payload.decode('utf-8')
+    stripe.WebhookSignature.verify_header(
+        text, signature, settings.STRIPE_WEBHOOK_SECRET,
+        tolerance=settings.STRIPE_WEBHOOK_TOLERANCE,
+    )
+    return json.loads(text)
+
+
+def _settings_changed(setting, **kwargs):
+    if setting.startswith('STRIPE_'):
+        reset_client()
+
+
+setting_changed.connect(_settings_changed)
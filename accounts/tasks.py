@@ -0,0 +1,34 @@
+"""
+Background jobs that talk to Stripe.
+Only transient Stripe failures (network, rate limits, 5xx) are retried;
+invalid requests fail the job straight away.
+"""
+import stripe
+from jobs.queue import job
+from . import stripe_client
+from .models import UserProfile
+
+TRANSIENT_ERRORS = (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError)
+
+
+@job('stripe.detach_payment_method', retry_on=TRANSIENT_ERRORS)
+def detach_payment_method(stripe_payment_method_id):
+    """Detach a payment method from its Stripe customer"""
+    stripe_client.call('payment_methods.detach', stripe_payment_method_id)
+
+
+@job('stripe.sync_customer', retry_on=TRANSIENT_ERRORS)
+def sync_customer(profile_id):
+    """Create or update the Stripe customer for a user profile"""
+    profile = UserProfile.objects.select_related('user').filter(pk=profile_id).first()
+    if profile is None:
+        return
+    user = profile.user
+    params = {'email': user.email, 'name': user.get_full_name() or user.username}
+    if profile.phone:
+        params['phone'] = profile.phone
+    if profile.stripe_customer_id:
+        stripe_client.call('customers.update', profile.stripe_customer_id, params)
+        return
+    customer = stripe_client.call('customers.create', params)
+    UserProfile.objects.filter(pk=profile.pk).update(stripe_customer_id=customer.id)
@@ -1,3 +1,429 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import threading
+import unittest
+from decimal import Decimal
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.test import AsyncClient, Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import enqueue, run_pending
+import stripe
+from . import stripe_client, webhooks
+from .exports import EXPORTS
+from .models import Order, Payment, PaymentMethod, RevenueRollup, StripeEvent, UserProfile
+from .webhooks import process_batch
+
+
+def create_method(user, **kwargs):
+    return PaymentMethod.objects.create(
+        user=user, stripe_payment_method_id=f'pm_{PaymentMethod.objects.count()}', **kwargs
+    )
+
+
+class PaymentMethodDefaultTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+
+    def test_saving_a_default_clears_the_previous_one(self):
+        first = create_method(self.user, is_default=True)
+        second = create_method(self.user, is_default=True)
+        first.refresh_from_db()
+        self.assertFalse(first.is_default)
+        self.assertTrue(second.is_default)
+
+    def test_make_default_switches_default(self):
+        first = create_method(self.user, is_default=True)
+        second = create_method(self.user)
+        second.make_default()
+        self.assertEqual(
+            list(PaymentMethod.objects.filter(is_default=True).values_list('pk', flat=True)),
+            [second.pk],
+        )
+
+    def test_database_rejects_two_defaults(self):
+        create_method(self.user, is_default=True)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            # bulk_create skips save(), so only the constraint stands in the way
+            PaymentMethod.objects.bulk_create([
+                PaymentMethod(user=self.user, stripe_payment_method_id='pm_x', is_default=True),
+            ])
+
+    async def test_set_default_view_switches_default(self):
+        first = await PaymentMethod.objects.acreate(user=self.user, stripe_payment_method_id='pm_a', is_default=True)
+        second = await PaymentMethod.objects.acreate(user=self.user, stripe_payment_method_id='pm_b')
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse('accounts:set_default_payment_method', args=[second.pk]))
+        self.assertEqual(response.status_code, 302)
+        defaults = [pk async for pk in PaymentMethod.objects.filter(is_default=True).values_list('pk', flat=True)]
+        self.assertEqual(defaults, [second.pk])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Needs row locks from PostgreSQL')
+class SetDefaultConcurrencyTests(TransactionTestCase):
+    threads = 8
+    requests_per_thread = 10
+
+    def test_concurrent_set_default_leaves_one_default(self):
+        user = User.objects.create_user('bob', password='secret')
+        methods = [create_method(user) for _ in range(self.threads)]
+        errors = []
+
+        def hammer(method):
+            client = Client()
+            client.force_login(user)
+            url = reverse('accounts:set_default_payment_method', args=[method.pk])
+            try:
+                for _ in range(self.requests_per_thread):
+                    response = client.post(url)
+                    if response.status_code != 302:
+                        errors.append(response.status_code)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=hammer, args=(method,)) for method in methods]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(PaymentMethod.objects.filter(user=user, is_default=True).count(), 1)
+
+
+class StubStripe:
+    """
+    Minimal local stand-in for the Stripe API.
+    Records every request and answers with queued status codes (200 once the
+    queue is empty), echoing back an object with the requested id.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+                stub.requests.append((self.command, self.path, body))
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                if status == 200:
+                    payload = {'id': self.path.rstrip('/').split('/')[3] if self.path.count('/') > 2 else 'cus_new',
+                               'object': 'payment_method'}
+                else:
+                    payload = {'error': {'type': 'api_error', 'message': 'stub failure'}}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StripeJobTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = StubStripe()
+        cls.settings_override = override_settings(
+            STRIPE_SECRET_KEY='sk_test_stub', STRIPE_API_BASE=cls.stub.url, STRIPE_MAX_RETRIES=0,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.stub.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.stub.requests.clear()
+        self.stub.statuses.clear()
+        self.user = User.objects.create_user('carol', password='secret')
+        self.client.force_login(self.user)
+
+    def test_delete_enqueues_detach_without_calling_stripe(self):
+        method = create_method(self.user)
+        response = self.client.post(reverse('accounts:delete_payment_method', args=[method.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.stub.requests, [])
+
+        run_pending()
+        self.assertEqual(self.stub.requests[0][1], f'/v1/payment_methods/{method.stripe_payment_method_id}/detach')
+        self.assertEqual(Job.objects.get().status, 'succeeded')
+
+    def test_detach_is_retried_after_server_error(self):
+        method = create_method(self.user)
+        self.client.post(reverse('accounts:delete_payment_method', args=[method.pk]))
+        self.stub.statuses.append(500)
+        run_pending()
+        job = Job.objects.get()
+        self.assertEqual(job.status, 'pending')
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_profile_is_synced_to_a_new_stripe_customer(self):
+        profile = UserProfile.objects.create(user=self.user)
+        enqueue('stripe.sync_customer', profile_id=str(profile.pk))
+        run_pending()
+        self.assertEqual(self.stub.requests[0][1], '/v1/customers')
+        self.assertEqual(UserProfile.objects.get(user=self.user).stripe_customer_id, 'cus_new')
+
+    def test_acall_uses_the_pooled_client(self):
+        async_to_sync(stripe_client.acall)('payment_methods.detach', 'pm_async')
+        self.assertEqual(self.stub.requests[0][1], '/v1/payment_methods/pm_async/detach')
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET='whsec_test')
+class StripeWebhookTests(TestCase):
+    def post_event(self, event_id, event_type, obj, created=0, secret='whsec_test'):
+        body = json.dumps({
+            'id': event_id, 'type': event_type, 'created': created, 'data': {'object': obj},
+        })
+        signature = stripe.WebhookSignature.generate_signature_header(body, secret)
+        return self.client.post(
+            reverse('accounts:stripe_webhook'), body,
+            content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+        )
+
+    def create_order(self, intent):
+        payment = Payment.objects.create(variant='stripe', currency='USD', total=10, transaction_id=intent)
+        return Order.objects.create(payment=payment, total_amount=10)
+
+    def test_events_are_stored_once(self):
+        obj = {'object': 'payment_intent', 'id': 'pi_1'}
+        self.assertEqual(self.post_event('evt_1', 'payment_intent.succeeded', obj).status_code, 200)
+        self.assertEqual(self.post_event('evt_1', 'payment_intent.succeeded', obj).status_code, 200)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+
+    def test_bad_signature_is_rejected(self):
+        response = self.post_event('evt_1', 'payment_intent.succeeded', {}, secret='whsec_wrong')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_batch_applies_each_transition_once(self):
+        order = self.create_order('pi_1')
+        self.post_event('evt_1', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': 'pi_1'}, created=1)
+        self.post_event('evt_2', 'charge.refunded', {'object': 'charge', 'payment_intent': 'pi_1'}, created=2)
+        # A late redelivery must not move the refunded payment back to confirmed
+        self.post_event('evt_3', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': 'pi_1'}, created=3)
+
+        self.assertEqual(process_batch(batch_size=2), 2)
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.payment.status), ('refunded', 'refunded'))
+
+        process_batch()
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.payment.status), ('refunded', 'refunded'))
+        self.assertFalse(StripeEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_failed_payment_can_still_succeed(self):
+        first, second = self.create_order('pi_1'), self.create_order('pi_2')
+        self.post_event('evt_1', 'payment_intent.payment_failed', {'object': 'payment_intent', 'id': 'pi_1'}, created=1)
+        process_batch()
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.payment.status), ('failed', 'rejected'))
+
+        # The customer retried with another card; the same batch may hold both events
+        self.post_event('evt_2', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': 'pi_1'}, created=2)
+        self.post_event('evt_3', 'payment_intent.payment_failed', {'object': 'payment_intent', 'id': 'pi_2'}, created=3)
+        self.post_event('evt_4', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': 'pi_2'}, created=4)
+        process_batch()
+        for order in (first, second):
+            order.refresh_from_db()
+            self.assertEqual((order.status, order.payment.status), ('completed', 'confirmed'))
+
+    def test_batch_query_count_does_not_grow_with_events(self):
+        def run(count, offset):
+            for i in range(offset, offset + count):
+                self.create_order(f'pi_{i}')
+                self.post_event(f'evt_{i}', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': f'pi_{i}'})
+            with CaptureQueriesContext(connection) as queries:
+                process_batch()
+            return len(queries)
+
+        self.assertEqual(run(1, 0), run(50, 1))
+        self.assertEqual(Order.objects.filter(status='completed').count(), 51)
+
+    def test_failing_event_does_not_hold_back_its_batch(self):
+        orders = [self.create_order(f'pi_{i}') for i in range(3)]
+        for i in range(3):
+            self.post_event(f'evt_{i}', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': f'pi_{i}'},
+                            created=i)
+
+        original = webhooks.payment_intent_id
+
+        def intent_id(event):
+            intent = original(event)
+            if intent == 'pi_1':
+                raise ValueError('bad event')
+            return intent
+
+        with mock.patch.object(webhooks, 'payment_intent_id', intent_id):
+            self.assertEqual(process_batch(), 2)
+            # The failed event waits out the retry delay instead of being reclaimed at once
+            self.assertEqual(process_batch(), 0)
+
+        statuses = [Order.objects.get(pk=order.pk).status for order in orders]
+        self.assertEqual(statuses, ['completed', 'pending', 'completed'])
+        bad = StripeEvent.objects.get(event_id='evt_1')
+        self.assertEqual((bad.processed_at, bad.attempts), (None, 1))
+        self.assertIn('bad event', bad.error)
+
+        StripeEvent.objects.filter(pk=bad.pk).update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(process_batch(), 1)
+        self.assertEqual(Order.objects.get(pk=orders[1].pk).status, 'completed')
+
+    @override_settings(STRIPE_EVENT_MAX_ATTEMPTS=1)
+    def test_event_is_set_aside_after_max_attempts(self):
+        self.create_order('pi_1')
+        self.post_event('evt_1', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': 'pi_1'})
+        with mock.patch.object(webhooks, 'apply_events', side_effect=ValueError('bad event')):
+            self.assertEqual(process_batch(), 0)
+        StripeEvent.objects.update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(process_batch(), 0)
+        self.assertFalse(StripeEvent.objects.filter(processed_at__isnull=False).exists())
+
+    def test_outage_charges_no_attempts(self):
+        self.create_order('pi_1')
+        self.post_event('evt_1', 'payment_intent.succeeded', {'object': 'payment_intent', 'id': 'pi_1'})
+        with mock.patch.object(webhooks, 'apply_events', side_effect=OperationalError('server closed')):
+            self.assertEqual(process_batch(), 0)
+        event = StripeEvent.objects.get()
+        self.assertEqual((event.processed_at, event.attempts), (None, 0))
+        self.assertEqual(process_batch(), 1)
+
+
+class FinanceExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com')
+        day = timezone.make_aware(datetime.datetime(2026, 3, 1, 12))
+        self.orders = []
+        for offset, status in enumerate(['completed', 'failed', 'completed', 'refunded']):
+            order = Order.objects.create(user=self.user, total_amount=10 + offset, status=status)
+            Order.objects.filter(pk=order.pk).update(created_at=day + datetime.timedelta(days=offset))
+            self.orders.append(order)
+
+    def test_command_filters_by_date_range_and_status(self):
+        stdout = io.StringIO()
+        call_command('export_finance', 'orders', '--from', '2026-03-02', '--to', '2026-03-04',
+                     '--status', 'completed', '--status', 'refunded', stdout=stdout)
+        rows = list(csv.DictReader(io.StringIO(stdout.getvalue())))
+        self.assertEqual([row['id'] for row in rows], [str(self.orders[2].pk), str(self.orders[3].pk)])
+        self.assertEqual((rows[0]['total_amount'], rows[0]['email']), ('12.00', 'alice@example.com'))
+
+    def test_lines_are_fetched_and_written_in_chunks(self):
+        export = EXPORTS['orders']
+        chunks = list(export.lines(export.queryset(), 'jsonl', chunk_size=3))
+        self.assertEqual([chunk.count('\n') for chunk in chunks], [3, 1])
+
+    def test_admin_action_streams_selected_rows(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        response = self.client.post(reverse('admin:accounts_order_changelist'), {
+            'action': 'export_jsonl',
+            '_selected_action': [str(self.orders[0].pk), str(self.orders[1].pk)],
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('orders.jsonl', response['Content-Disposition'])
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['status'] for row in rows], ['completed', 'failed'])
+
+    async def test_admin_action_streams_asynchronously_under_asgi(self):
+        client = AsyncClient()
+        await client.aforce_login(await User.objects.acreate_superuser('admin', 'admin@example.com', 'x'))
+        response = await client.post(reverse('admin:accounts_order_changelist'), {
+            'action': 'export_csv',
+            '_selected_action': [str(order.pk) for order in self.orders],
+        })
+        # An async iterator is streamed as is instead of being read into a list first
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['id'] for row in rows], [str(order.pk) for order in self.orders])
+
+
+class RevenueRollupTests(TestCase):
+    def snapshot(self):
+        return sorted(
+            RevenueRollup.objects.filter(order_count__gt=0)
+            .values_list('day', 'currency', 'status', 'order_count', 'total_amount')
+        )
+
+    def assertMatchesRebuild(self):
+        maintained = self.snapshot()
+        RevenueRollup.objects.rebuild()
+        self.assertEqual(maintained, self.snapshot())
+
+    def test_saves_status_updates_and_deletes_keep_rollups_exact(self):
+        first = Order.objects.create(total_amount=10, status='completed')
+        second = Order.objects.create(total_amount='2.50', currency='EUR')
+        Order.objects.create(total_amount=7, status='completed')
+        second.status = 'completed'
+        second.save()
+        first.status = 'refunded'
+        first.save(update_fields=['status'])
+        Order.objects.filter(currency='EUR').set_status('refunded')
+        Order.objects.filter(total_amount=7).delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            self.snapshot(),
+            [(timezone.localdate(), 'EUR', 'refunded', 1, 2.5), (timezone.localdate(), 'USD', 'refunded', 1, 10)],
+        )
+
+    def test_webhook_batches_move_revenue(self):
+        payment = Payment.objects.create(variant='stripe', currency='USD', total=10, transaction_id='pi_1')
+        Order.objects.create(payment=payment, total_amount=10)
+        StripeEvent.objects.create(
+            event_id='evt_1', event_type='payment_intent.succeeded',
+            payload={'id': 'evt_1', 'data': {'object': {'object': 'payment_intent', 'id': 'pi_1'}}},
+        )
+        process_batch()
+        self.assertEqual([row[2:] for row in self.snapshot()], [('completed', 1, 10)])
+        self.assertMatchesRebuild()
+
+    def test_report_reads_only_rollups(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        Order.objects.create(total_amount=10, status='completed')
+        Order.objects.create(total_amount=5, status='completed')
+        Order.objects.create(total_amount=3, status='failed')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('accounts:revenue_report'))
+        self.assertFalse([query['sql'] for query in queries if 'accounts_order' in query['sql']])
+        report = response.json()
+        self.assertEqual(
+            [(row['day'], row['currency'], row['orders'], Decimal(row['revenue'])) for row in report['days']],
+            [(timezone.localdate().isoformat(), 'USD', 2, 15)],
+        )
+        self.assertEqual([row['status'] for row in report['statuses']], ['completed', 'failed'])
+
+    def test_report_requires_staff(self):
+        response = self.client.get(reverse('accounts:revenue_report'))
+        self.assertEqual(response.status_code, 302)
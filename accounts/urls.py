@@ -13,6 +13,12 @@ urlpatterns = [
     path('payment-methods/<uuid:payment_method_id>/delete/', views.delete_payment_method, name='delete_payment_method'),
     path('payment-methods/<uuid:payment_method_id>/set-default/', views.set_default_payment_method, name='set_default_payment_method'),
     
+    # Staff revenue report (read from RevenueRollup)
+    path('reports/revenue/', views.revenue_report, name='revenue_report'),
+    
+    # Stripe webhooks (stored, then applied by process_stripe_events)
+    path('webhooks/stripe/', views.stripe_webhook, name='stripe_webhook'),
+    
     # Django-payments URLs (handles Stripe callbacks, etc.)
     path('payments/', include('payments.urls')),
 ]
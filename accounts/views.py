@@ -1,15 +1,26 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import datetime
+
+from django.shortcuts import render, redirect, aget_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
-from .models import PaymentMethod, UserProfile
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from jobs.queue import aenqueue
+from .models import PaymentMethod, StripeEvent, UserProfile
+from .reporting import revenue_by_day, revenue_by_status
+from . import stripe_client
 import stripe
 
 
 @login_required
-def payment_methods(request):
+async def payment_methods(request):
     """List all saved payment methods for the logged-in user"""
-    methods = PaymentMethod.objects.filter(user=request.user, is_active=True)
+    user = await request.auser()
+    methods = [method async for method in PaymentMethod.objects.filter(user=user, is_active=True)]
     return render(request, 'accounts/payment_methods.html', {
         'payment_methods': methods,
         'stripe_publishable_key': getattr(settings, 'STRIPE_PUBLISHABLE_KEY', '')
@@ -17,7 +28,7 @@ def payment_methods(request):
 
 
 @login_required
-def add_payment_method(request):
+async def add_payment_method(request):
     """Add a new payment method"""
     if request.method == 'POST':
         # This would integrate with Stripe Elements/Payment Element
@@ -31,21 +42,19 @@ def add_payment_method(request):
 
 
 @login_required
-def delete_payment_method(request, payment_method_id):
+async def delete_payment_method(request, payment_method_id):
     """Delete a saved payment method"""
-    method = get_object_or_404(PaymentMethod, id=payment_method_id, user=request.user)
+    user = await request.auser()
+    method = await aget_object_or_404(PaymentMethod, id=payment_method_id, user=user)
     
     if request.method == 'POST':
-        # Detach from Stripe if configured
-        if hasattr(settings, 'STRIPE_SECRET_KEY') and settings.STRIPE_SECRET_KEY:
-            try:
-                stripe.api_key = settings.STRIPE_SECRET_KEY
-                stripe.PaymentMethod.detach(method.stripe_payment_method_id)
-            except Exception as e:
-                messages.warning(request, f'Could not detach from Stripe: {str(e)}')
+        # Detach from Stripe in the background if configured
+        if stripe_client.is_configured() and method.stripe_payment_method_id:
+            await aenqueue('stripe.detach_payment_method',
+                           stripe_payment_method_id=method.stripe_payment_method_id)
         
         method.is_active = False
-        method.save()
+        await method.asave()
         messages.success(request, 'Payment method removed successfully.')
         return redirect('accounts:payment_methods')
     
@@ -53,18 +62,66 @@ def delete_payment_method(request, payment_method_id):
 
 
 @login_required
-def set_default_payment_method(request, payment_method_id):
+async def set_default_payment_method(request, payment_method_id):
     """Set a payment method as default"""
-    method = get_object_or_404(PaymentMethod, id=payment_method_id, user=request.user)
-    method.is_default = True
-    method.save()
+    user = await request.auser()
+    method = await aget_object_or_404(PaymentMethod, id=payment_method_id, user=user, is_active=True)
+    await method.amake_default()
     messages.success(request, 'Default payment method updated.')
     return redirect('accounts:payment_methods')
 
 
 @login_required
-def profile(request):
+async def profile(request):
     """User profile page"""
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
+    user = await request.auser()
+    profile, created = await UserProfile.objects.aget_or_create(user=user)
+    if created and stripe_client.is_configured():
+        await aenqueue('stripe.sync_customer', profile_id=str(profile.pk))
     return render(request, 'accounts/profile.html', {'profile': profile})
 
+
+@csrf_exempt
+@require_POST
+async def stripe_webhook(request):
+    """
+    Verify and store a Stripe webhook event.
+    Events are applied later in batches by process_stripe_events, so this
+    costs one INSERT; redeliveries of a stored event are ignored.
+    """
+    try:
+        event = stripe_client.verify_webhook(request.body, request.headers.get('Stripe-Signature'))
+        event_id, event_type = event['id'], event['type']
+    except (ValueError, KeyError, TypeError, stripe.SignatureVerificationError, stripe_client.StripeNotConfigured):
+        return HttpResponseBadRequest('Invalid webhook')
+
+    await StripeEvent.objects.abulk_create(
+        [StripeEvent(event_id=event_id, event_type=event_type, payload=event)],
+        ignore_conflicts=True,
+    )
+    return HttpResponse(status=200)
+
+
+@staff_member_required
+async def revenue_report(request):
+    """
+    Daily revenue and per-status totals as JSON, read from the revenue
+    rollups only. ?from= and ?to= are inclusive days (default: the last 30),
+    ?currency= narrows to one currency.
+    """
+    try:
+        end = datetime.date.fromisoformat(request.GET['to']) if request.GET.get('to') else timezone.localdate()
+        start = (
+            datetime.date.fromisoformat(request.GET['from']) if request.GET.get('from')
+            else end - datetime.timedelta(days=29)
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Invalid date; use YYYY-MM-DD')
+    currency = request.GET.get('currency') or None
+    stop = end + datetime.timedelta(days=1)
+    return JsonResponse({
+        'from': start,
+        'to': end,
+        'days': [row async for row in revenue_by_day(start, stop, currency)],
+        'statuses': [row async for row in revenue_by_status(start, stop, currency)],
+    })
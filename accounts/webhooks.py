@@ -0,0 +1,175 @@
+"""
+Batch processing of stored Stripe webhook events.
+
+The webhook view only verifies and inserts StripeEvent rows. process_batch()
+claims a batch of unprocessed events and applies them with one UPDATE for
+payments and one for orders per target status, not per event. Status guards
+on those UPDATEs make re-applying an event a no-op, and processed_at is
+stamped in the same transaction, so a crash can never leave a half-applied
+batch.
+
+When a batch fails, its events are retried one at a time, each in its own
+savepoint, so only the events that fail on their own are charged an
+attempt. A failed event is not claimed again for STRIPE_EVENT_RETRY_DELAY
+seconds. After STRIPE_EVENT_MAX_ATTEMPTS failures it stays unprocessed with
+its error, and it is no longer claimed. Database outages charge no
+attempts. The batch is rolled back and retried after the worker backs off.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from payments import PaymentStatus
+
+from .models import Order, Payment, StripeEvent
+
+logger = logging.getLogger(__name__)
+
+# event type -> (payment status, order status)
+TRANSITIONS = {
+    'payment_intent.succeeded': (PaymentStatus.CONFIRMED, 'completed'),
+    'payment_intent.payment_failed': (PaymentStatus.REJECTED, 'failed'),
+    'payment_intent.canceled': (PaymentStatus.REJECTED, 'cancelled'),
+    'charge.refunded': (PaymentStatus.REFUNDED, 'refunded'),
+}
+
+# Statuses a payment/order may move out of to reach each target status.
+# payment_failed is not final: the customer can retry the same PaymentIntent
+# with another card, so a failed payment/order may still succeed.
+PAYMENT_SOURCES = {
+    PaymentStatus.CONFIRMED: [
+        PaymentStatus.WAITING, PaymentStatus.PREAUTH, PaymentStatus.INPUT, PaymentStatus.ERROR,
+        PaymentStatus.REJECTED,
+    ],
+    PaymentStatus.REJECTED: [PaymentStatus.WAITING, PaymentStatus.PREAUTH, PaymentStatus.INPUT, PaymentStatus.ERROR],
+    PaymentStatus.REFUNDED: [PaymentStatus.CONFIRMED],
+}
+ORDER_SOURCES = {
+    'completed': ['pending', 'processing', 'failed'],
+    'failed': ['pending', 'processing'],
+    'cancelled': ['pending', 'processing'],
+    'refunded': ['completed'],
+}
+
+
+def payment_intent_id(event):
+    """Return the PaymentIntent an event refers to, or None."""
+    obj = event.get('data', {}).get('object', {})
+    if obj.get('object') == 'payment_intent':
+        return obj.get('id')
+    return obj.get('payment_intent')
+
+
+# Errors that mean the database is unavailable rather than an event is bad
+OUTAGE_ERRORS = (OperationalError, InterfaceError)
+
+
+def claim(batch_size):
+    """
+    Lock and return up to batch_size unprocessed events, oldest first,
+    skipping events that failed within the retry delay or used up their
+    attempts.
+    """
+    retry_before = timezone.now() - timedelta(seconds=settings.STRIPE_EVENT_RETRY_DELAY)
+    return list(
+        StripeEvent.objects.select_for_update(skip_locked=True)
+        .filter(processed_at__isnull=True, attempts__lt=settings.STRIPE_EVENT_MAX_ATTEMPTS)
+        .filter(Q(attempts=0) | Q(updated_at__lte=retry_before))
+        .order_by('created_at')[:batch_size]
+    )
+
+
+def apply_events(events):
+    """
+    Apply a batch of events in delivery order with a bounded number of UPDATEs.
+    Each PaymentIntent's transitions are replayed in rounds: round N applies
+    every intent's Nth transition, grouped by target status. The status
+    guards make repeated or out-of-order transitions (e.g. a late 'succeeded'
+    after 'refunded') no-ops. Returns the number of payments updated.
+    """
+    steps = {}
+    for event in sorted(events, key=lambda e: e.payload.get('created', 0)):
+        transition = TRANSITIONS.get(event.event_type)
+        intent = payment_intent_id(event.payload)
+        if not (transition and intent):
+            continue
+        intent_steps = steps.setdefault(intent, [])
+        if not intent_steps or intent_steps[-1] != transition:
+            intent_steps.append(transition)
+
+    updated = 0
+    now = timezone.now()
+    rounds = max((len(intent_steps) for intent_steps in steps.values()), default=0)
+    for index in range(rounds):
+        by_status = {}
+        for intent, intent_steps in steps.items():
+            if index < len(intent_steps):
+                by_status.setdefault(intent_steps[index], []).append(intent)
+
+        for (payment_status, order_status), intents in by_status.items():
+            updated += Payment.objects.filter(
+                transaction_id__in=intents, status__in=PAYMENT_SOURCES[payment_status],
+            ).update(status=payment_status, modified=now)
+            # set_status() also moves the orders' revenue between RevenueRollup rows
+            Order.objects.filter(
+                payment__transaction_id__in=intents, status__in=ORDER_SOURCES[order_status],
+            ).set_status(order_status, updated_at=now)
+    return updated
+
+
+def apply_individually(events):
+    """
+    Apply events one at a time after their batch failed. Each failing event
+    is charged an attempt and keeps its error. Returns the events applied.
+    """
+    applied, failed = [], []
+    for event in sorted(events, key=lambda e: e.payload.get('created', 0)):
+        try:
+            with transaction.atomic():
+                apply_events([event])
+        except OUTAGE_ERRORS:
+            raise
+        except Exception as exc:
+            logger.exception('Failed to apply Stripe event %s', event.event_id)
+            event.attempts += 1
+            event.error = repr(exc)
+            event.updated_at = timezone.now()
+            failed.append(event)
+        else:
+            applied.append(event)
+    if failed:
+        StripeEvent.objects.bulk_update(failed, ['attempts', 'error', 'updated_at'])
+    return applied
+
+
+def process_batch(batch_size=500):
+    """
+    Claim, apply and mark one batch of events. Returns how many were
+    applied, so 0 when nothing was waiting, every event failed or the
+    database was unavailable.
+    """
+    try:
+        with transaction.atomic():
+            events = claim(batch_size)
+            if not events:
+                return 0
+            try:
+                with transaction.atomic():
+                    apply_events(events)
+            except OUTAGE_ERRORS:
+                raise
+            except Exception:
+                logger.exception('Failed to apply %d Stripe events; retrying them one at a time', len(events))
+                events = apply_individually(events)
+
+            # Only events that were actually applied are stamped processed
+            StripeEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                processed_at=timezone.now(), attempts=F('attempts') + 1, error='',
+            )
+    except OUTAGE_ERRORS:
+        logger.exception('Database unavailable while applying Stripe events')
+        return 0
+    return len(events)
@@ -0,0 +1,177 @@
+"""
+Changelists for very large admin tables.
+
+    @admin.register(Payment)
+    class PaymentAdmin(EstimatedCountMixin, admin.ModelAdmin):
+        date_hierarchy = 'created'
+        list_filter = [('variant', CachedValuesFieldListFilter)]
+
+A stock changelist runs an exact COUNT(*) for the paginator and another for
+the unfiltered total, and its date hierarchy and value filters scan the
+whole table for distinct dates and values. On a table with millions of rows
+each of those takes seconds. With the mixin:
+
+- The paginator asks PostgreSQL's planner how many rows the filtered
+  queryset has (EXPLAIN, which reads table statistics instead of rows) and
+  uses the estimate when it is at least ADMIN_COUNT_ESTIMATE_THRESHOLD.
+  Smaller results, and other databases, are still counted exactly.
+- The unfiltered total is not counted (show_full_result_count = False).
+- The date hierarchy's range and its year/month/day buckets are cached in
+  the 'admin' namespace for ADMIN_ROLLUP_TIMEOUT seconds, keyed by the
+  filtered query, as are CachedValuesFieldListFilter's choices. They are
+  rebuilt on expiry rather than on every write, so new rows can take that
+  long to add a bucket.
+
+TrigramSearchMixin is for search_fields that span joins (user__email,
+billing_email, ...). Django ORs every field into one WHERE over the joined
+tables, which PostgreSQL can only answer with a scan. The mixin instead runs
+one branch per field and combines them with UNION. Each branch is a plain
+UPPER(column) LIKE that a pg_trgm GIN index on UPPER(column) can serve (see
+accounts migration 0006). Other databases use Django's default search.
+"""
+import copy
+import hashlib
+import json
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.text import smart_split, unescape_string_literal
+
+from .cache import cached
+
+NAMESPACE = 'admin'
+
+# Django's search_fields prefixes
+SEARCH_LOOKUPS = {'^': 'istartswith', '=': 'iexact', '@': 'search'}
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for queryset, or None when the
+    database is not PostgreSQL.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.values('pk').order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that counts large results from planner statistics."""
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= settings.ADMIN_COUNT_ESTIMATE_THRESHOLD:
+            return estimate
+        return self.object_list.count()
+
+
+def _rollup(queryset, builder, *parts):
+    """Cache builder() for queryset under the 'admin' namespace."""
+    sql, params = queryset.query.sql_with_params()
+    fingerprint = repr((sql, params, timezone.get_current_timezone_name(), parts))
+    return cached(
+        NAMESPACE, builder, queryset.model._meta.label,
+        hashlib.sha256(fingerprint.encode()).hexdigest()[:32],
+        timeout=settings.ADMIN_ROLLUP_TIMEOUT,
+    )
+
+
+class CachedDates:
+    """
+    Stands in for a changelist's queryset in the date_hierarchy tag, which
+    only calls aggregate() for the date range and dates()/datetimes() for
+    the buckets, and serves those calls from the rollup cache.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def aggregate(self, **aggregates):
+        return _rollup(
+            self.queryset, lambda: self.queryset.aggregate(**aggregates),
+            'aggregate', sorted((name, repr(value)) for name, value in aggregates.items()),
+        )
+
+    def dates(self, field_name, kind):
+        return _rollup(self.queryset, lambda: list(self.queryset.dates(field_name, kind)),
+                       'dates', field_name, kind)
+
+    def datetimes(self, field_name, kind):
+        return _rollup(self.queryset, lambda: list(self.queryset.datetimes(field_name, kind)),
+                       'datetimes', field_name, kind)
+
+
+def cached_dates_changelist(cl):
+    """A copy of a ChangeList whose date hierarchy reads from the rollup cache."""
+    cl = copy.copy(cl)
+    cl.queryset = CachedDates(cl.queryset)
+    return cl
+
+
+class CachedValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """AllValuesFieldListFilter whose distinct values come from the rollup cache."""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        lookup_choices = self.lookup_choices
+        self.lookup_choices = _rollup(lookup_choices, lambda: list(lookup_choices), 'values')
+
+
+class EstimatedCountMixin:
+    """ModelAdmin mixin for tables too large to count or scan on every changelist load."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'forge/admin/change_list.html'
+
+
+def uses_trigram_search(queryset):
+    """Whether queryset's database has the pg_trgm indexes."""
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def search_terms(search_term):
+    """Split a search box query into words, keeping quoted phrases whole."""
+    terms = []
+    for bit in smart_split(search_term):
+        if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        if bit:
+            terms.append(bit)
+    return terms
+
+
+class TrigramSearchMixin:
+    """ModelAdmin mixin answering search_fields through trigram indexes on PostgreSQL."""
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        terms = search_terms(search_term)
+        if not (search_fields and terms and uses_trigram_search(queryset)):
+            return super().get_search_results(request, queryset, search_term)
+
+        lookups = []
+        for field in search_fields:
+            lookup = SEARCH_LOOKUPS.get(field[0])
+            lookups.append(f'{field[1:]}__{lookup}' if lookup else f'{field}__icontains')
+        manager = self.model._default_manager.db_manager(queryset.db)
+        conditions = []
+        for term in terms:
+            branches = [manager.filter(**{lookup: term}).values('pk').order_by() for lookup in lookups]
+            conditions.append(Q(pk__in=branches[0].union(*branches[1:])))
+        # Matches are collected by primary key, so there are no join duplicates
+        return queryset.filter(reduce(and_, conditions)), False
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'forge.settings')
 
 application = get_asgi_application()
+
+# Fail fast (or wait) if the database is unreachable when the worker boots.
+# ASGI servers import this module inside their event loop, so the check
+# runs in a thread there.
+from forge.db import wait_for_database_at_startup  # noqa: E402
+
+wait_for_database_at_startup()
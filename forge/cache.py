@@ -0,0 +1,115 @@
+"""
+Read-through cache helpers for catalog data.
+
+Cached values live in namespaces (e.g. 'services'). Every key embeds the
+namespace's current version; saving or deleting a model registered with
+invalidate_on_change() bumps that version, so all entries built from the
+old data are skipped and left to expire.
+
+Async views use the a-prefixed variants, which go through the cache
+backend's async API and take an async builder.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+_MISSING = object()
+
+
+def _version_key(namespace):
+    return f'forge:{namespace}:version'
+
+
+def _new_version():
+    # Time-based so a version key evicted from the cache never comes back
+    # with a number that older entries were stored under.
+    return time.time_ns()
+
+
+def get_version(namespace):
+    """Return the current version of a cache namespace."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(namespace):
+    """Async variant of get_version()."""
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _new_version(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def _join_key(namespace, version, parts):
+    return ':'.join(['forge', namespace, str(version), *map(str, parts)])
+
+
+def make_key(namespace, *parts):
+    """Build a versioned cache key for a namespace."""
+    return _join_key(namespace, get_version(namespace), parts)
+
+
+async def amake_key(namespace, *parts):
+    """Async variant of make_key()."""
+    return _join_key(namespace, await aget_version(namespace), parts)
+
+
+def cached(namespace, builder, *parts, timeout=None):
+    """
+    Return the value cached under namespace/parts, calling builder() to
+    compute and store it on a miss. builder() may return None.
+    """
+    key = make_key(namespace, *parts)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        if timeout is None:
+            timeout = settings.CATALOG_CACHE_TIMEOUT
+        cache.set(key, value, timeout)
+    return value
+
+
+async def acached(namespace, builder, *parts, timeout=None):
+    """Async variant of cached(); builder is awaited on a miss."""
+    key = await amake_key(namespace, *parts)
+    value = await cache.aget(key, _MISSING)
+    if value is _MISSING:
+        value = await builder()
+        if timeout is None:
+            timeout = settings.CATALOG_CACHE_TIMEOUT
+        await cache.aset(key, value, timeout)
+    return value
+
+
+def invalidate(*namespaces):
+    """Invalidate every entry cached under the given namespaces."""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+
+
+def invalidate_on_change(model, *namespaces):
+    """
+    Invalidate namespaces whenever an instance of model is saved or deleted,
+    or, for a many-to-many through model, whenever links are added, removed
+    or cleared in bulk (which sends m2m_changed rather than post_save).
+    """
+    def handler(sender, **kwargs):
+        if kwargs.get('action', 'post_').startswith('post_'):
+            invalidate(*namespaces)
+
+    uid = f'forge.cache:{model._meta.label}:{",".join(namespaces)}'
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+    m2m_changed.connect(handler, sender=model, weak=False, dispatch_uid=uid)
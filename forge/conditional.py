@@ -0,0 +1,130 @@
+"""
+Conditional GET for views whose output depends on a few querysets.
+
+    @conditional_on(
+        lambda request, service_id: Service.objects.filter(id=service_id, is_active=True),
+        namespace='services',
+    )
+    async def service_detail(request, service_id):
+        ...
+
+Before the view runs, each dependency queryset is reduced to
+(Max('updated_at'), Count('pk')) with one aggregate query. Those values give
+a weak ETag and a Last-Modified date, and a request whose If-None-Match or
+If-Modified-Since still matches gets a 304 without the view or its templates
+running. The count makes deleting a row change the ETag even though it does
+not move the maximum updated_at. With a forge.cache namespace the aggregates
+are cached too, so revalidating a cached catalog page costs no queries.
+
+Set ETAG_VERSION (e.g. to the deployed commit) so a template change
+invalidates ETags that were issued before the deploy.
+
+Pages that also depend on the visitor pass vary, a callable taking the
+request whose result is mixed into the ETag. For example, pages with a
+{% csrf_token %} form use vary=csrf_secret. Otherwise a 304 after login
+would keep HTML that holds a token for the rotated secret.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import acached, cached
+
+AGGREGATES = {'last_modified': Max('updated_at'), 'count': Count('pk')}
+
+
+def csrf_secret(request):
+    """
+    The visitor's CSRF secret, for conditional_on(vary=...) on pages with a
+    form. get_token() creates the secret if the cookie is missing, and it
+    makes a 304 set the cookie too.
+    """
+    get_token(request)
+    return request.META['CSRF_COOKIE']
+
+
+def _validators(view, states, varies_by=None):
+    """Return (etag, last_modified timestamp) for aggregate results, or (None, None)."""
+    dates = [state['last_modified'] for state in states if state['last_modified'] is not None]
+    if not dates:
+        # Nothing to depend on (usually a 404): let the view answer
+        return None, None
+    fingerprint = repr([
+        settings.ETAG_VERSION, view.__module__, view.__qualname__,
+        *[(state['last_modified'] and state['last_modified'].isoformat(), state['count']) for state in states],
+        varies_by,
+    ])
+    etag = f'W/"{hashlib.sha256(fingerprint.encode()).hexdigest()[:32]}"'
+    return etag, timegm(max(dates).utctimetuple())
+
+
+def _set_validators(request, response, etag, last_modified):
+    if etag is None or request.method not in ('GET', 'HEAD'):
+        return response
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
+
+
+def conditional_on(*dependencies, namespace=None, vary=None):
+    """
+    Decorate a sync or async view with conditional GET handling. Each
+    dependency is called with the view's arguments and returns a queryset
+    of rows the page is built from. Pass the forge.cache namespace that is
+    invalidated when those rows change to cache the aggregates, and vary
+    for a per-visitor value the page also depends on.
+    """
+    def decorator(view):
+        def cache_parts(args, kwargs):
+            return ['conditional', view.__qualname__, *args, *[f'{key}={value}' for key, value in sorted(kwargs.items())]]
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+
+                async def build():
+                    return [
+                        await dependency(request, *args, **kwargs).aaggregate(**AGGREGATES)
+                        for dependency in dependencies
+                    ]
+
+                if namespace:
+                    states = await acached(namespace, build, *cache_parts(args, kwargs))
+                else:
+                    states = await build()
+                etag, last_modified = _validators(view, states, vary(request) if vary else None)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _set_validators(request, response, etag, last_modified)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return view(request, *args, **kwargs)
+
+                def build():
+                    return [
+                        dependency(request, *args, **kwargs).aggregate(**AGGREGATES)
+                        for dependency in dependencies
+                    ]
+
+                states = cached(namespace, build, *cache_parts(args, kwargs)) if namespace else build()
+                etag, last_modified = _validators(view, states, vary(request) if vary else None)
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _set_validators(request, response, etag, last_modified)
+
+        return wrapper
+    return decorator
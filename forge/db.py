@@ -0,0 +1,80 @@
+"""
+Database startup health check.
+
+wsgi.py and asgi.py call wait_for_database() before serving, so a worker
+that cannot reach the database fails at boot instead of on its first
+request, and a worker started alongside the database waits for it.
+ASGI servers such as uvicorn import asgi.py inside their running event
+loop, where Django refuses synchronous queries, so asgi.py goes through
+wait_for_database_at_startup(), which runs the check in a thread there.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+
+def check_database(alias=DEFAULT_DB_ALIAS):
+    """Open a connection and run a trivial query. Raises OperationalError."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    finally:
+        # Don't carry a connection opened at import time into request threads
+        connection.close()
+
+
+def wait_for_database(alias=DEFAULT_DB_ALIAS, timeout=None, interval=1.0):
+    """
+    Retry check_database() until it succeeds or `timeout` seconds pass
+    (default: settings.DB_STARTUP_TIMEOUT; 0 skips the check). Re-raises the
+    last OperationalError on timeout.
+    """
+    if timeout is None:
+        timeout = settings.DB_STARTUP_TIMEOUT
+    if not timeout:
+        return
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            check_database(alias)
+            return
+        except OperationalError as exc:
+            if time.monotonic() + interval > deadline:
+                logger.error('Database %r unavailable after %ss: %s', alias, timeout, exc)
+                raise
+            logger.warning('Database %r unavailable, retrying: %s', alias, exc)
+            time.sleep(interval)
+
+
+def wait_for_database_at_startup(**kwargs):
+    """
+    wait_for_database(), run in a separate thread when called from a
+    running event loop. Blocks the caller either way and re-raises the
+    check's error.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return wait_for_database(**kwargs)
+
+    errors = []
+
+    def check():
+        try:
+            wait_for_database(**kwargs)
+        except BaseException as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=check, name='wait_for_database')
+    thread.start()
+    thread.join()
+    if errors:
+        raise errors[0]
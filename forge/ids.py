@@ -0,0 +1,61 @@
+"""
+Time-ordered identifiers for TG11 Forge models.
+
+UUIDv7 (RFC 9562) keys start with a 48-bit Unix timestamp in milliseconds,
+so new rows land at the right-hand edge of the primary key B-tree instead
+of at random positions.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def _build(unix_ms, rand_a, rand_b):
+    value = (unix_ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= (rand_a & 0xFFF) << 64
+    value |= 0b10 << 62
+    value |= rand_b & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=value)
+
+
+def uuid7():
+    """
+    Generate a UUIDv7 for the current time.
+    Keys generated by this process are strictly increasing: within the same
+    millisecond the 12-bit rand_a field is used as a counter.
+    """
+    global _last_ms, _counter
+    rand_b = int.from_bytes(os.urandom(8), 'big')
+    with _lock:
+        unix_ms = time.time_ns() // 1_000_000
+        if unix_ms > _last_ms:
+            _last_ms = unix_ms
+            _counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond.
+                _last_ms += 1
+                _counter = 0
+        return _build(_last_ms, _counter, rand_b)
+
+
+def uuid7_from_datetime(dt):
+    """
+    Generate a UUIDv7 whose timestamp is taken from an aware datetime.
+    Used when re-keying existing rows so their keys follow created_at order.
+    """
+    unix_ms = int(dt.timestamp() * 1000)
+    rand = int.from_bytes(os.urandom(10), 'big')
+    return _build(unix_ms, rand >> 64, rand)
+
+
+def uuid7_timestamp_ms(value):
+    """Return the Unix millisecond timestamp embedded in a UUIDv7."""
+    return value.int >> 80
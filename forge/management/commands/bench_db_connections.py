@@ -0,0 +1,85 @@
+"""
+Measure what database connection handling costs each request.
+
+Each simulated request fires Django's request_started/request_finished
+signals around one small query, exactly as a real request does, so
+connections are opened, reused or closed according to CONN_MAX_AGE and
+CONN_HEALTH_CHECKS. The command compares a connection per request
+(CONN_MAX_AGE=0) with persistent connections, and reports connection setup
+time separately from query time.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from forge.stats import percentile
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request connection cost with and without persistent connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Simulated requests per mode')
+        parser.add_argument('--max-age', type=int, default=600,
+                            help='CONN_MAX_AGE used for the persistent mode')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        pooled = bool(settings_dict.get('OPTIONS', {}).get('pool'))
+        self.stdout.write(
+            f'{connection.vendor} ({options["database"]}), {options["requests"]} requests per mode, '
+            f'configured CONN_MAX_AGE={settings_dict["CONN_MAX_AGE"]}, '
+            f'health checks={settings_dict["CONN_HEALTH_CHECKS"]}, pool={pooled}'
+        )
+
+        modes = [('configured', settings_dict['CONN_MAX_AGE'])]
+        if not pooled:
+            # Django rejects CONN_MAX_AGE > 0 with a pool, so only compare
+            # fresh vs persistent connections when pooling is off
+            modes = [('per-request', 0), ('persistent', options['max_age'])] + modes
+
+        original = settings_dict['CONN_MAX_AGE']
+        self.stdout.write(f'{"mode":<12} {"connects":>9} {"avg ms":>8} {"p99 ms":>8} {"connect ms/req":>15}')
+        try:
+            for label, max_age in modes:
+                settings_dict['CONN_MAX_AGE'] = max_age
+                connection.close()
+                stats = self.run(connection, options['requests'])
+                self.stdout.write(
+                    f'{label:<12} {stats["connects"]:>9} {stats["avg_ms"]:>8.3f} '
+                    f'{stats["p99_ms"]:>8.3f} {stats["connect_ms"]:>15.3f}'
+                )
+        finally:
+            settings_dict['CONN_MAX_AGE'] = original
+            connection.close()
+
+    def run(self, connection, count):
+        connects = 0
+        connect_time = 0.0
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            if connection.connection is None:
+                began = time.perf_counter()
+                connection.ensure_connection()
+                connect_time += time.perf_counter() - began
+                connects += 1
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        ordered = sorted(samples)
+        return {
+            'connects': connects,
+            'avg_ms': sum(ordered) / len(ordered),
+            'p99_ms': percentile(ordered, 99),
+            'connect_ms': connect_time * 1000 / count,
+        }
@@ -0,0 +1,73 @@
+"""
+Benchmark primary key inserts with random UUIDv4 keys versus UUIDv7 keys.
+
+Rows are written to temporary tables shaped like a BaseModel table, so the
+command is safe to run against a production-sized database. Index sizes are
+reported on PostgreSQL only.
+"""
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from forge.ids import uuid7
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare insert throughput and primary key index size for UUIDv4 and UUIDv7 keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000,
+                            help='Rows inserted per key type')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per INSERT batch')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        batch_size = options['batch_size']
+        postgres = connection.vendor == 'postgresql'
+        uuid_type = 'uuid' if connection.features.has_native_uuid_field else 'char(32)'
+
+        self.stdout.write(f'Inserting {rows} rows per key type on {connection.vendor}')
+        for name, generate in GENERATORS.items():
+            table = f'bench_pk_{name}'
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+                cursor.execute(
+                    f'CREATE TEMPORARY TABLE {table} ('
+                    f'id {uuid_type} PRIMARY KEY, created_at timestamp NOT NULL, payload text)'
+                )
+                sql = f'INSERT INTO {table} (id, created_at, payload) VALUES (%s, %s, %s)'
+                now = timezone.now().replace(tzinfo=None)
+                elapsed = 0.0
+                for start in range(0, rows, batch_size):
+                    count = min(batch_size, rows - start)
+                    params = [
+                        (self.prepare(generate()), now, 'x' * 64)
+                        for _ in range(count)
+                    ]
+                    began = time.perf_counter()
+                    cursor.executemany(sql, params)
+                    elapsed += time.perf_counter() - began
+
+                line = f'{name}: {rows / elapsed:,.0f} rows/s ({elapsed:.2f}s)'
+                if postgres:
+                    cursor.execute(
+                        'SELECT pg_relation_size(indexrelid) FROM pg_index '
+                        'WHERE indrelid = %s::regclass AND indisprimary',
+                        [table],
+                    )
+                    index_bytes = cursor.fetchone()[0]
+                    line += f', pkey index {index_bytes / 1024 / 1024:.1f} MiB'
+                cursor.execute(f'DROP TABLE {table}')
+            self.stdout.write(line)
+
+    def prepare(self, value):
+        return value if connection.features.has_native_uuid_field else value.hex
@@ -0,0 +1,104 @@
+"""
+EXPLAIN the queries behind the site's hot paths and flag full table scans.
+
+On PostgreSQL a tiny table is always cheaper to read sequentially, so use
+--disable-seqscan on development data to check that a usable index exists.
+"""
+import re
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+# SQLite reports "SCAN table" for full scans and "SCAN table USING INDEX ..."
+# or "SEARCH ..." when an index is used.
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)')
+POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def hot_queries():
+    """Return (label, queryset) pairs for the queries behind hot pages."""
+    from django.contrib import admin
+    from django.utils import timezone
+    from accounts.exports import EXPORTS
+    from accounts.models import Order, PaymentMethod
+    from notes.models import BlogComment, BlogPost, Tag
+    from pages.models import Page
+    from portfolio.models import PortfolioItem
+    from pricing.models import PricingFeature, PricingPlan
+    from hosting.models import HostingPlan
+    from services.models import Service
+    from notes.search import search_posts
+
+    some_id = uuid.uuid4()
+    queries = [
+        ('services list', Service.objects.filter(is_active=True)),
+        ('hosting list', HostingPlan.objects.filter(is_active=True)),
+        ('pricing plans', PricingPlan.objects.active()),
+        ('pricing features prefetch',
+         PricingFeature.objects.filter(plan_id__in=[some_id]).order_by('display_order', 'feature_text')),
+        ('portfolio list', PortfolioItem.objects.filter(is_published=True)),
+        ('portfolio by technology',
+         PortfolioItem.objects.filter(is_published=True, item_technologies__technology_id=some_id)),
+        ('published pages', Page.objects.filter(is_published=True)),
+        ('blog list', BlogPost.objects.filter(is_published=True)),
+        ('posts by tag', BlogPost.objects.filter(is_published=True, post_tags__tag_id=some_id)),
+        ('tag cloud', Tag.objects.cloud()),
+        ('approved comments', BlogComment.objects.filter(post_id=some_id, is_approved=True)),
+        ('payment methods', PaymentMethod.objects.filter(user_id=1, is_active=True)),
+        ('user orders', Order.objects.filter(user_id=1)),
+        ('order export', EXPORTS['orders'].queryset(start=timezone.now(), statuses=['completed'])),
+        ('payment export', EXPORTS['payments'].queryset(start=timezone.now(), end=timezone.now())),
+    ]
+    if connection.vendor == 'postgresql':
+        # The SQLite fallback is a substring match and always scans
+        queries.append(('blog search', search_posts('deployment')))
+        # Trigram indexes only serve the admin's search on PostgreSQL too
+        order_search, _ = admin.site._registry[Order].get_search_results(
+            None, Order.objects.all(), 'customer@example.com',
+        )
+        queries.append(('admin order search', order_search))
+    return queries
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN hot queries and flag sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--disable-seqscan', action='store_true',
+                            help='PostgreSQL only: SET enable_seqscan = off while explaining')
+        parser.add_argument('--fail-on-seqscan', action='store_true',
+                            help='Exit with an error if any query scans a whole table')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full plan for every query')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'postgresql':
+            pattern = POSTGRES_FULL_SCAN
+        elif connection.vendor == 'sqlite':
+            pattern = SQLITE_FULL_SCAN
+        else:
+            raise CommandError(f'Unsupported database vendor: {connection.vendor}')
+
+        flagged = []
+        with transaction.atomic():
+            if options['disable_seqscan'] and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, queryset in hot_queries():
+                plan = queryset.explain()
+                scans = pattern.findall(plan)
+                if scans:
+                    flagged.append(label)
+                    self.stdout.write(self.style.WARNING(
+                        f'SEQ SCAN  {label}: {", ".join(sorted(set(scans)))}'
+                    ))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'ok        {label}'))
+                if options['verbose_plans'] or scans:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'          {line}')
+
+        if flagged and options['fail_on_seqscan']:
+            raise CommandError(f'{len(flagged)} hot queries scan a whole table')
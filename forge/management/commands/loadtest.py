@@ -0,0 +1,123 @@
+"""
+Load-test running servers and compare requests/sec and latency percentiles.
+
+Start the same code under a WSGI and an ASGI server (see DEPLOYMENT.md),
+then point this command at both:
+
+    python manage.py loadtest --target wsgi=http://127.0.0.1:8000 \\
+        --target asgi=http://127.0.0.1:8001 --concurrency 64
+
+Each worker thread keeps one persistent HTTP connection, so the numbers
+reflect the server rather than connection setup.
+"""
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from forge.stats import percentile
+
+DEFAULT_PATHS = ['/services/', '/hosting/', '/pricing/', '/portfolio/']
+
+
+def run_target(base_url, paths, total, concurrency, timeout):
+    """Issue `total` GETs spread over `concurrency` threads; return stats."""
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    prefix = parts.path.rstrip('/')
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        conn = connection_class(parts.netloc, timeout=timeout)
+        samples = []
+        failed = 0
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                break
+            path = prefix + paths[index % len(paths)]
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = connection_class(parts.netloc, timeout=timeout)
+            samples.append((time.perf_counter() - started) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(samples)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors[0],
+        'rps': len(ordered) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(ordered, 50) if ordered else 0.0,
+        'p99_ms': percentile(ordered, 99) if ordered else 0.0,
+        'max_ms': ordered[-1] if ordered else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare requests/sec and p99 latency between running servers (e.g. WSGI vs ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, metavar='LABEL=URL',
+                            help='Server to test, e.g. asgi=http://127.0.0.1:8001 (repeatable)')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help=f'Path to request (repeatable, default: {" ".join(DEFAULT_PATHS)})')
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Requests per target')
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help='Concurrent connections per target')
+        parser.add_argument('--warmup', type=int, default=100,
+                            help='Requests sent first and not measured (fills caches)')
+        parser.add_argument('--timeout', type=float, default=30.0,
+                            help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        targets = []
+        for value in options['target']:
+            label, sep, url = value.partition('=')
+            if not sep or not url.startswith(('http://', 'https://')):
+                raise CommandError(f'Expected LABEL=URL, got {value!r}')
+            targets.append((label, url))
+        paths = options['paths'] or DEFAULT_PATHS
+
+        results = []
+        for label, url in targets:
+            if options['warmup']:
+                run_target(url, paths, options['warmup'], min(options['concurrency'], 8), options['timeout'])
+            self.stdout.write(f'{label}: {options["requests"]} requests, '
+                              f'concurrency {options["concurrency"]} -> {url}')
+            results.append((label, run_target(
+                url, paths, options['requests'], options['concurrency'], options['timeout'],
+            )))
+
+        self.stdout.write('')
+        self.stdout.write(f'{"target":<10} {"req/s":>10} {"p50 ms":>10} {"p99 ms":>10} {"max ms":>10} {"errors":>8}')
+        for label, stats in results:
+            self.stdout.write(
+                f'{label:<10} {stats["rps"]:>10,.1f} {stats["p50_ms"]:>10.1f} '
+                f'{stats["p99_ms"]:>10.1f} {stats["max_ms"]:>10.1f} {stats["errors"]:>8}'
+            )
@@ -0,0 +1,131 @@
+"""
+Re-key existing rows from random UUIDv4 primary keys to time-ordered UUIDv7.
+
+New keys are derived from each row's created_at so the rewritten index keeps
+insertion order. Every foreign key that points at a re-keyed row is updated
+in the same transaction; PostgreSQL and SQLite foreign keys are created
+DEFERRABLE INITIALLY DEFERRED by Django, so constraints are checked at commit.
+Generic references (admin LogEntry rows and any GenericForeignKey with a
+text or UUID object id) are rewritten too.
+
+Rows are read --batch-size at a time in (created_at, pk) order, so memory use
+does not grow with the table.
+"""
+from django.apps import apps
+from django.contrib.admin.models import LogEntry
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from forge.ids import uuid7_from_datetime
+from forge.models import BaseModel
+
+
+class Command(BaseCommand):
+    help = 'Rewrite UUIDv4 primary keys of BaseModel subclasses as UUIDv7 keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.ModelName',
+            help='Models to re-key (default: every BaseModel subclass)',
+        )
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows re-keyed per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report how many rows would be re-keyed without writing')
+
+    def handle(self, *args, **options):
+        for model in self.get_models(options['models']):
+            self.rekey_model(model, options['batch_size'], options['dry_run'])
+
+    def get_models(self, labels):
+        if not labels:
+            return [
+                model for model in apps.get_models()
+                if issubclass(model, BaseModel)
+            ]
+        models = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as exc:
+                raise CommandError(str(exc))
+            if not issubclass(model, BaseModel):
+                raise CommandError(f'{label} does not inherit from BaseModel')
+            models.append(model)
+        return models
+
+    def get_references(self, model):
+        """Return (related_model, fk_attname) pairs pointing at model's primary key."""
+        references = []
+        for field in model._meta.get_fields(include_hidden=True):
+            if not (field.auto_created and not field.concrete):
+                continue
+            if not (field.one_to_many or field.one_to_one):
+                continue
+            if field.field.target_field != model._meta.pk:
+                continue
+            references.append((field.related_model, field.field.attname))
+        return references
+
+    def get_generic_references(self):
+        """Return (model, content_type field, object id field) for every generic reference."""
+        references = [(LogEntry, 'content_type', 'object_id')]
+        for model in apps.get_models():
+            for field in model._meta.private_fields:
+                if not isinstance(field, GenericForeignKey):
+                    continue
+                object_id = model._meta.get_field(field.fk_field)
+                if object_id.get_internal_type() in ('CharField', 'TextField', 'UUIDField'):
+                    references.append((model, field.ct_field, field.fk_field))
+        return references
+
+    def batches(self, model, batch_size):
+        """Yield lists of (pk, created_at) for rows without a UUIDv7 key, oldest first."""
+        queryset = model._default_manager.order_by('created_at', 'pk').values_list('pk', 'created_at')
+        last = None
+        while True:
+            page = queryset
+            if last is not None:
+                # Re-keyed rows may sort after the cursor again; they are v7 and skipped
+                last_pk, last_created_at = last
+                page = page.filter(Q(created_at__gt=last_created_at) | Q(created_at=last_created_at, pk__gt=last_pk))
+            rows = list(page[:batch_size])
+            if not rows:
+                return
+            last = rows[-1]
+            batch = [(pk, created_at) for pk, created_at in rows if pk.version != 7]
+            if batch:
+                yield batch
+
+    def rekey_model(self, model, batch_size, dry_run):
+        label = model._meta.label
+        if dry_run:
+            total = sum(len(batch) for batch in self.batches(model, batch_size))
+            self.stdout.write(f'{label}: {total} row(s) to re-key')
+            return
+
+        references = self.get_references(model)
+        generic_references = self.get_generic_references()
+        content_type = ContentType.objects.get_for_model(model)
+        total = 0
+        for batch in self.batches(model, batch_size):
+            with transaction.atomic():
+                for old_pk, created_at in batch:
+                    new_pk = uuid7_from_datetime(created_at)
+                    for related_model, attname in references:
+                        related_model._base_manager.filter(
+                            **{attname: old_pk}
+                        ).update(**{attname: new_pk})
+                    for related_model, ct_field, fk_field in generic_references:
+                        related_model._base_manager.filter(
+                            **{ct_field: content_type, fk_field: str(old_pk)},
+                        ).update(**{fk_field: str(new_pk)})
+                    model._base_manager.filter(pk=old_pk).update(**{model._meta.pk.attname: new_pk})
+            total += len(batch)
+        if not total:
+            self.stdout.write(f'{label}: 0 row(s) to re-key')
+            return
+        self.stdout.write(self.style.SUCCESS(f'{label}: re-keyed {total} row(s)'))
@@ -2,18 +2,21 @@
 Base models for TG11 Forge project.
 All models should inherit from BaseModel to use UUID primary keys.
 """
-import uuid
 from django.db import models
 
+from forge.ids import uuid7
+
 
 class BaseModel(models.Model):
     """
     Abstract base model with UUID primary key and timestamps.
+    Keys are time-ordered UUIDv7 values so inserts stay append-only in the
+    primary key index.
     All app models should inherit from this.
     """
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False,
         help_text="Unique identifier for this record"
     )
@@ -0,0 +1,23 @@
+"""
+Migration operations shared by the project's apps.
+"""
+from django.db import migrations
+
+
+class RunPostgresSQL(migrations.RunSQL):
+    """
+    RunSQL that only runs on PostgreSQL. Used for PostgreSQL-only objects
+    (GIN indexes, triggers, extensions) so the same migrations still apply
+    to the SQLite development and test databases.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return 'Raw SQL operation (PostgreSQL only)'
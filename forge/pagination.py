@@ -0,0 +1,143 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with a WHERE on the ordering key of the last row seen
+instead of an OFFSET, and rows inserted while a reader is paging cannot
+shift rows between pages. When an index covers the ordering, every page
+costs the same index range scan no matter how deep it is. Orderings on a
+computed value such as a search rank still have to compute it for every
+matching row on each page. The ordering must end in a unique field (the
+primary key) so the key is a total order, and its values must compare
+exactly after a round trip through a cursor (so no float annotations):
+
+    paginator = CursorPaginator(posts, ordering=('-published_date', '-id'))
+    page = paginator.page(request.GET.get('cursor'))
+    page.items, page.next_cursor, page.previous_cursor
+
+Cursors are opaque URL-safe strings encoding the key of the first or last
+row on the page and the direction to move in.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that cannot be decoded or does not fit the ordering."""
+
+
+class CursorPage:
+    """One page of rows plus the cursors for its neighbours (None at either end)."""
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class CursorPaginator:
+    def __init__(self, queryset, ordering, per_page=20):
+        if not ordering or ordering[-1].lstrip('-') not in ('id', 'pk'):
+            raise ValueError('Cursor ordering must end with the primary key')
+        self.queryset = queryset
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        """Return the CursorPage after (or before) cursor; the first page if cursor is empty."""
+        backwards = False
+        queryset = self.queryset
+        if cursor:
+            values, backwards = self.decode(cursor)
+            queryset = queryset.filter(self._beyond(values, backwards))
+
+        order_by = [
+            f'{"-" if descending != backwards else ""}{name}'
+            for name, descending in self.ordering
+        ]
+        rows = list(queryset.order_by(*order_by)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        page = CursorPage(items=rows)
+        if not rows:
+            return page
+        if backwards:
+            # The page we came back from is always there
+            page.next_cursor = self.encode(rows[-1], backwards=False)
+            if has_more:
+                page.previous_cursor = self.encode(rows[0], backwards=True)
+        else:
+            if has_more:
+                page.next_cursor = self.encode(rows[-1], backwards=False)
+            if cursor:
+                page.previous_cursor = self.encode(rows[0], backwards=True)
+        return page
+
+    def _beyond(self, values, backwards):
+        """Q for rows strictly after values in the ordering (before, if backwards)."""
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != backwards else 'gt'
+            equal = {prior: values[position] for position, (prior, _) in enumerate(self.ordering[:index])}
+            condition |= Q(**equal, **{f'{name}__{lookup}': values[index]})
+        # Redundant bound on the leading column lets the database use an index range scan
+        name, descending = self.ordering[0]
+        leading = Q(**{f'{name}__{"lte" if descending != backwards else "gte"}': values[0]})
+        return leading & condition
+
+    def encode(self, row, backwards):
+        values = []
+        for name, _ in self.ordering:
+            value = getattr(row, 'pk' if name == 'id' else name)
+            values.append(value if isinstance(value, (int, float, str)) or value is None else str(value))
+        if any(value is None for value in values):
+            raise ValueError('Cursor ordering fields must not be NULL')
+        payload = json.dumps({'k': values, 'b': backwards}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        """Return (key values, backwards) for a cursor string."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_values, backwards = payload['k'], bool(payload['b'])
+        except (ValueError, KeyError, TypeError, binascii.Error):
+            raise InvalidCursor('Malformed cursor')
+        if not isinstance(raw_values, list) or len(raw_values) != len(self.ordering):
+            raise InvalidCursor('Cursor does not match this ordering')
+        return [self._to_python(name, value) for (name, _), value in zip(self.ordering, raw_values)], backwards
+
+    def _to_python(self, name, value):
+        opts = self.queryset.model._meta
+        try:
+            model_field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            # An annotation such as a search rank
+            annotation = self.queryset.query.annotations.get(name)
+            if annotation is None:
+                raise InvalidCursor(f'Bad cursor value for {name}')
+            model_field = annotation.output_field
+        try:
+            return model_field.to_python(value)
+        except ValidationError:
+            raise InvalidCursor(f'Bad cursor value for {name}')
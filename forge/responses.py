@@ -0,0 +1,83 @@
+"""
+Whole-response caching for machine-read endpoints (sitemaps, feeds).
+
+cached_response() stores a rendered 200 response body together with a
+gzip-compressed copy, keyed by the versions of the forge.cache namespaces
+the body was built from. Crawlers polling these URLs are answered from the
+cache, compressed once rather than on every request, and a strong ETag over
+the body lets them revalidate with a 304. Saving a model registered with
+invalidate_on_change() bumps its namespace, so only the responses built from
+that model are regenerated, on their next request.
+
+Sitemaps and feeds hold absolute URLs built from the request's scheme and
+host, so each scheme and host gets its own cached copy.
+"""
+import gzip
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .cache import get_version, make_key
+
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+# Response headers worth keeping from the original response
+KEPT_HEADERS = ('Last-Modified', 'X-Robots-Tag')
+
+
+def _build_entry(response):
+    if hasattr(response, 'render') and not response.is_rendered:
+        # A TemplateResponse, e.g. from the sitemap views
+        response.render()
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    return {
+        'content': content,
+        'gzip': gzip.compress(content, compresslevel=9, mtime=0),
+        'digest': digest,
+        'content_type': response['Content-Type'],
+        'headers': {name: response[name] for name in KEPT_HEADERS if name in response},
+    }
+
+
+def cached_response(request, view, namespaces, *parts, params=(), timeout=None):
+    """
+    Return view(request) from the cache. namespaces are the forge.cache
+    namespaces whose data the response is built from; parts and the query
+    parameters named in params identify the response among others built from
+    them. Only 200 responses are cached; anything else is returned as is.
+    """
+    versions = [f'{namespace}={get_version(namespace)}' for namespace in namespaces]
+    values = [f'{name}={request.GET.get(name, "")}' for name in params]
+    # Absolute URLs in the body come from the request (RequestSite)
+    origin = f'{request.scheme}://{request.get_host()}'
+    key = make_key('responses', origin, *parts, *values, *versions)
+    entry = cache.get(key)
+    if entry is None:
+        response = view(request)
+        if response.status_code != 200 or response.streaming:
+            return response
+        entry = _build_entry(response)
+        if timeout is None:
+            timeout = settings.CATALOG_CACHE_TIMEOUT
+        cache.set(key, entry, timeout)
+
+    compress = (
+        ACCEPTS_GZIP_RE.search(request.headers.get('Accept-Encoding', ''))
+        and len(entry['gzip']) < len(entry['content'])
+    )
+    # Each encoding is a different representation, so it gets its own ETag
+    etag = f'"{entry["digest"]}{"-gzip" if compress else ""}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(entry['gzip'] if compress else entry['content'], content_type=entry['content_type'])
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    for name, value in entry['headers'].items():
+        response[name] = value
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
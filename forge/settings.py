@@ -38,9 +38,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
+    'django.contrib.sitemaps',
     # Third-party apps
     'payments',
     # TG11 Forge Apps
+    'forge',
+    'jobs',
     'accounts',
     'pages',
     'services',
@@ -109,9 +113,65 @@ else:
             'PASSWORD': os.environ.get('DB_PASSWORD', 'forge_password'),
             'HOST': os.environ.get('DB_HOST', 'localhost'),
             'PORT': os.environ.get('DB_PORT', '5432'),
+            # Seconds a connection is kept open and reused across requests
+            # (0 = close after every request)
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            # Ping a reused connection before the first query of a request so
+            # a connection dropped by the server or a proxy is replaced
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+            },
         }
     }
 
+    # psycopg 3 connection pool: one pool per worker process, shared by its
+    # threads. Recommended under ASGI, where persistent connections are not
+    # reused between requests. Django requires CONN_MAX_AGE = 0 with a pool.
+    if os.environ.get('DB_POOL', 'False').lower() == 'true':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+
+# Seconds wsgi.py/asgi.py wait for the database at startup before failing (0 = skip)
+DB_STARTUP_TIMEOUT = int(os.environ.get('DB_STARTUP_TIMEOUT', 30))
+
+
+# Cache
+# Catalog pages are served through forge.cache. Use a shared backend such as
+# Redis in production (CACHE_BACKEND=django.core.cache.backends.redis.RedisCache,
+# CACHE_LOCATION=redis://...) so invalidations reach every worker process.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Seconds a catalog entry may live before it is rebuilt even without changes
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', 60 * 60))
+
+# Mixed into the ETags of conditional views (forge.conditional). Set it to the
+# deployed commit so template changes invalidate ETags issued before a deploy.
+ETAG_VERSION = os.environ.get('ETAG_VERSION', '')
+
+# URLs per sitemap file; longer sections are split into shards listed by
+# /sitemap.xml (the protocol allows at most 50,000)
+SITEMAP_SHARD_SIZE = int(os.environ.get('SITEMAP_SHARD_SIZE', 10000))
+
+# Comments scoring at least this (0-1, notes/spam.py) are treated as spam
+COMMENT_SPAM_THRESHOLD = float(os.environ.get('COMMENT_SPAM_THRESHOLD', 0.6))
+
+# Admin changelists using forge.admin.EstimatedCountMixin show the planner's
+# row estimate instead of an exact COUNT(*) at or above this many rows, and
+# cache their date hierarchy and value filters for ADMIN_ROLLUP_TIMEOUT seconds
+ADMIN_COUNT_ESTIMATE_THRESHOLD = int(os.environ.get('ADMIN_COUNT_ESTIMATE_THRESHOLD', 100000))
+ADMIN_ROLLUP_TIMEOUT = int(os.environ.get('ADMIN_ROLLUP_TIMEOUT', 10 * 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -166,6 +226,21 @@ PAYMENT_USES_SSL = os.environ.get('PAYMENT_USES_SSL', 'False').lower() == 'true'
 STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
 STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY', '')
 
+# Stripe HTTP client (accounts.stripe_client): one keep-alive session per process
+STRIPE_CONNECT_TIMEOUT = float(os.environ.get('STRIPE_CONNECT_TIMEOUT', '3'))
+STRIPE_READ_TIMEOUT = float(os.environ.get('STRIPE_READ_TIMEOUT', '10'))
+STRIPE_MAX_RETRIES = int(os.environ.get('STRIPE_MAX_RETRIES', '2'))
+STRIPE_POOL_SIZE = int(os.environ.get('STRIPE_POOL_SIZE', '10'))
+# Point at a local stub such as stripe-mock (http://localhost:12111) in development
+STRIPE_API_BASE = os.environ.get('STRIPE_API_BASE', '')
+# Signing secret of the endpoint at /accounts/webhooks/stripe/ (whsec_...)
+STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET', '')
+STRIPE_WEBHOOK_TOLERANCE = int(os.environ.get('STRIPE_WEBHOOK_TOLERANCE', '300'))
+# Stored events that fail this many times are set aside with their error
+STRIPE_EVENT_MAX_ATTEMPTS = int(os.environ.get('STRIPE_EVENT_MAX_ATTEMPTS', '5'))
+# Seconds before a failed event is claimed again
+STRIPE_EVENT_RETRY_DELAY = int(os.environ.get('STRIPE_EVENT_RETRY_DELAY', '60'))
+
 # Django-payments configuration
 PAYMENT_MODEL = 'accounts.Payment'
 PAYMENT_VARIANTS = {
@@ -178,3 +253,9 @@ PAYMENT_VARIANTS = {
 # Supported payment methods (configure as needed)
 PAYMENT_VARIANTS_API = 'stripe'  # Default payment variant
 
+
+# Background jobs (jobs app, run with `python manage.py run_jobs`)
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', '8'))
+JOBS_BACKOFF_BASE = float(os.environ.get('JOBS_BACKOFF_BASE', '5'))  # seconds before the first retry
+JOBS_BACKOFF_MAX = float(os.environ.get('JOBS_BACKOFF_MAX', '3600'))
+JOBS_LOCK_TIMEOUT = int(os.environ.get('JOBS_LOCK_TIMEOUT', '600'))  # reclaim jobs from crashed workers
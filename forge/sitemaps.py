@@ -0,0 +1,65 @@
+"""
+Sitemaps for the site's public content.
+
+Each app defines its sections in its own sitemaps.py as ModelSitemap
+subclasses naming the forge.cache namespace their model invalidates. The
+index and section views wrap django.contrib.sitemaps' views in
+cached_response(), so a section is rebuilt only after its own model
+changes, and the index only after any of them does.
+
+Sections longer than SITEMAP_SHARD_SIZE URLs are split into numbered
+shards (?p=2, ?p=3, ...), which the index lists; each shard is cached
+separately.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.contrib.sitemaps import GenericSitemap, Sitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.http import Http404
+from django.urls import reverse
+
+from .responses import cached_response
+
+
+class ModelSitemap(GenericSitemap):
+    """
+    A section listing a queryset of objects with get_absolute_url() and
+    updated_at. Subclasses set an ordered queryset and namespace.
+    """
+    queryset = None
+    namespace = None
+
+    def __init__(self):
+        super().__init__({'queryset': self.queryset, 'date_field': 'updated_at'})
+
+    @property
+    def limit(self):
+        return settings.SITEMAP_SHARD_SIZE
+
+
+class StaticViewSitemap(Sitemap):
+    """A section of fixed URL names. Subclasses set url_names and namespace."""
+    url_names = ()
+    namespace = None
+
+    def items(self):
+        return list(self.url_names)
+
+    def location(self, item):
+        return reverse(item)
+
+
+def index(request, sitemaps):
+    """Sitemap index listing every section and shard"""
+    namespaces = sorted({sitemap.namespace for sitemap in sitemaps.values()})
+    view = partial(sitemap_views.index, sitemaps=sitemaps, sitemap_url_name='sitemap-section')
+    return cached_response(request, view, namespaces, 'sitemap-index')
+
+
+def section(request, sitemaps, section):
+    """One sitemap section, or one shard of it with ?p="""
+    if section not in sitemaps:
+        raise Http404(f'No sitemap section {section!r}')
+    view = partial(sitemap_views.sitemap, sitemaps=sitemaps, section=section)
+    return cached_response(request, view, [sitemaps[section].namespace], 'sitemap', section, params=('p',))
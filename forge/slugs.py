@@ -0,0 +1,36 @@
+"""
+Slugs for lookup tables keyed by a unique name (portfolio.Technology,
+notes.Tag).
+
+slugify() drops punctuation, so 'C', 'C++' and 'C#' all become 'c'.
+unique_slug() spells out '+' and '#' first ('c-plus-plus', 'c-sharp'), and
+when a slug is still taken it appends -2, -3, ... Names are told apart by
+name_key(), so only differences in case and spacing make two names the same
+entry.
+"""
+from itertools import count
+
+from django.utils.text import slugify
+
+SYMBOLS = {'+': ' plus ', '#': ' sharp '}
+
+
+def normalize_name(name, max_length):
+    """name with runs of whitespace collapsed to single spaces, truncated."""
+    return ' '.join(name.split())[:max_length]
+
+
+def name_key(name):
+    """The key two names must share to be the same entry."""
+    return ' '.join(name.split()).casefold()
+
+
+def unique_slug(name, max_length, exists):
+    """A slug for name, at most max_length long, for which exists(slug) is false."""
+    base = slugify(''.join(SYMBOLS.get(char, char) for char in name))[:max_length].strip('-') or 'item'
+    slug = base
+    for number in count(2):
+        if not exists(slug):
+            return slug
+        suffix = f'-{number}'
+        slug = base[:max_length - len(suffix)].rstrip('-') + suffix
@@ -0,0 +1,10 @@
+"""
+Latency summaries shared by the Stripe client's metrics and the benchmark
+commands.
+"""
+
+
+def percentile(ordered, pct):
+    """The pct-th percentile (nearest rank) of an already sorted, non-empty sequence."""
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,20 @@
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+
+from forge.admin import cached_dates_changelist
+
+register = template.Library()
+
+
+def cached_date_hierarchy(cl):
+    """date_hierarchy with its range and buckets read from the rollup cache."""
+    return date_hierarchy(cached_dates_changelist(cl))
+
+
+@register.tag(name='cached_date_hierarchy')
+def cached_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser, token, func=cached_date_hierarchy,
+        template_name='date_hierarchy.html', takes_context=False,
+    )
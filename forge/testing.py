@@ -0,0 +1,38 @@
+"""
+Test case base classes shared by the apps' test suites.
+"""
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    Runs a data migration over rows created at an earlier schema.
+    Subclasses name the migrations in migrate_from and migrate_to (app label,
+    migration name), create rows with the historical models passed to
+    setUpBeforeMigration(apps), and read the result through self.apps.
+    The database is migrated back to the latest schema afterwards.
+    """
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        super().setUp()
+        self.setUpBeforeMigration(self.migrate(self.migrate_from))
+        self.apps = self.migrate(self.migrate_to)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def setUpBeforeMigration(self, apps):
+        pass
+
+    def migrate(self, target):
+        """Migrate to target and return the historical apps at that state."""
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        executor.loader.build_graph()
+        return executor.loader.project_state([target]).apps
@@ -0,0 +1,377 @@
+import asyncio
+import gzip
+import importlib
+import sys
+import time
+import uuid
+from io import StringIO
+from itertools import count
+from unittest import mock
+
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.admin.models import ADDITION, LogEntry
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Order, Payment, PaymentMethod, RevenueRollup, StripeEvent, UserProfile
+from hosting.models import HostingPlan
+from jobs.models import Job
+from notes.models import BlogComment, BlogPost, Tag
+from pages.models import Page
+from portfolio.models import PortfolioItem, Technology
+from pricing.models import PricingFeature, PricingPlan
+from services.models import Service
+from . import db, ids
+from .pagination import CursorPaginator, InvalidCursor
+
+
+class WaitForDatabaseTests(SimpleTestCase):
+    @mock.patch.object(db.time, 'sleep')
+    def test_retries_until_database_answers(self, sleep):
+        with mock.patch.object(db, 'check_database', side_effect=[OperationalError('down'), None]) as check:
+            db.wait_for_database(timeout=5)
+        self.assertEqual(check.call_count, 2)
+
+    @mock.patch.object(db.time, 'sleep')
+    def test_gives_up_after_timeout(self, sleep):
+        with mock.patch.object(db, 'check_database', side_effect=OperationalError('down')):
+            with self.assertRaises(OperationalError):
+                db.wait_for_database(timeout=0.5, interval=1.0)
+
+    @override_settings(DB_STARTUP_TIMEOUT=0)
+    def test_zero_timeout_skips_the_check(self):
+        with mock.patch.object(db, 'check_database') as check:
+            db.wait_for_database()
+        check.assert_not_called()
+
+
+class AsgiStartupTests(TestCase):
+    def tearDown(self):
+        sys.modules.pop('forge.asgi', None)
+
+    @override_settings(DB_STARTUP_TIMEOUT=5)
+    def test_asgi_module_imports_inside_a_running_loop(self):
+        # uvicorn imports the application from inside its event loop
+        async def import_application():
+            sys.modules.pop('forge.asgi', None)
+            return importlib.import_module('forge.asgi').application
+
+        with mock.patch.object(db, 'check_database', wraps=db.check_database) as check:
+            application = asyncio.run(import_application())
+        self.assertTrue(callable(application))
+        check.assert_called_once()
+
+    @override_settings(DB_STARTUP_TIMEOUT=0.5)
+    @mock.patch.object(db.time, 'sleep')
+    def test_unreachable_database_still_fails_the_import(self, sleep):
+        async def import_application():
+            sys.modules.pop('forge.asgi', None)
+            importlib.import_module('forge.asgi')
+
+        with mock.patch.object(db, 'check_database', side_effect=OperationalError('down')):
+            with self.assertRaises(OperationalError):
+                asyncio.run(import_application())
+
+
+class Uuid7Tests(SimpleTestCase):
+    def test_version_and_variant_bits(self):
+        value = ids.uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        self.assertAlmostEqual(ids.uuid7_timestamp_ms(value), time.time_ns() // 1_000_000, delta=1000)
+
+    def test_keys_within_one_millisecond_are_ordered_by_the_counter(self):
+        frozen = 1_700_000_000_000 * 1_000_000
+        with mock.patch.object(ids.time, 'time_ns', return_value=frozen), \
+                mock.patch.object(ids, '_last_ms', 0):
+            values = [ids.uuid7() for _ in range(5000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+        # 5000 keys overflow the 12-bit counter, which borrows the next millisecond
+        self.assertEqual({ids.uuid7_timestamp_ms(value) for value in values[:2]}, {1_700_000_000_000})
+        self.assertEqual(ids.uuid7_timestamp_ms(values[-1]), 1_700_000_000_001)
+
+    def test_from_datetime_uses_its_timestamp(self):
+        moment = timezone.now()
+        value = ids.uuid7_from_datetime(moment)
+        self.assertEqual((value.version, value.variant), (7, uuid.RFC_4122))
+        self.assertEqual(ids.uuid7_timestamp_ms(value), int(moment.timestamp() * 1000))
+
+
+class RekeyUuid7Tests(TestCase):
+    def test_rewrites_keys_foreign_keys_and_generic_references(self):
+        author = User.objects.create_user('author')
+        start = timezone.now() - timedelta(days=3)
+        posts = []
+        for day in range(3):
+            post = BlogPost.objects.create(
+                id=uuid.uuid4(), title=f'Post {day}', slug=f'post-{day}', author=author, content='Body',
+            )
+            BlogPost.objects.filter(pk=post.pk).update(created_at=start + timedelta(days=day))
+            posts.append(post)
+        comment = BlogComment.objects.create(post=posts[0], author_name='Ada', content='Hi')
+        tag = Tag.objects.create(name='Django')
+        posts[1].tags.add(tag)
+        entry = LogEntry.objects.log_actions(
+            author.pk, [posts[2]], ADDITION, single_object=True,
+        )
+
+        stdout = StringIO()
+        call_command('rekey_uuid7', 'notes.BlogPost', '--batch-size', '2', stdout=stdout)
+        self.assertIn('re-keyed 3 row(s)', stdout.getvalue())
+
+        new_keys = list(BlogPost.objects.order_by('created_at').values_list('pk', flat=True))
+        self.assertTrue(all(key.version == 7 for key in new_keys))
+        self.assertEqual(new_keys, sorted(new_keys))
+        comment.refresh_from_db()
+        self.assertEqual(comment.post_id, new_keys[0])
+        self.assertEqual(list(tag.posts.values_list('pk', flat=True)), [new_keys[1]])
+        entry.refresh_from_db()
+        self.assertEqual(entry.object_id, str(new_keys[2]))
+
+        stdout = StringIO()
+        call_command('rekey_uuid7', 'notes.BlogPost', '--dry-run', stdout=stdout)
+        self.assertIn('0 row(s) to re-key', stdout.getvalue())
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        # Pairs of posts share a timestamp so the id tie-breaker matters
+        for index in range(7):
+            BlogPost.objects.create(
+                title=f'Post {index}', slug=f'post-{index}', content='x',
+                is_published=True, published_date=now - timedelta(hours=index // 2),
+            )
+
+    def paginator(self):
+        return CursorPaginator(BlogPost.objects.all(), ('-published_date', '-id'), per_page=3)
+
+    def test_pages_forward_and_back_cover_every_row_once(self):
+        expected = list(BlogPost.objects.order_by('-published_date', '-id'))
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([post for page in pages for post in page], expected)
+        self.assertFalse(pages[0].has_previous)
+
+        back = paginator.page(pages[-1].previous_cursor)
+        self.assertEqual(back.items, pages[-2].items)
+
+    def test_rows_inserted_while_paging_do_not_shift_pages(self):
+        paginator = self.paginator()
+        first = paginator.page()
+        BlogPost.objects.create(title='New', slug='new', content='x', is_published=True)
+        second = paginator.page(first.next_cursor)
+        self.assertEqual(second.items, list(BlogPost.objects.order_by('-published_date', '-id')[4:7]))
+
+    def test_bad_cursor_is_rejected(self):
+        with self.assertRaises(InvalidCursor):
+            self.paginator().page('not-a-cursor')
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for number in range(3):
+            Service.objects.create(
+                name=f'Service {number}', slug=f'service-{number}',
+                description='Description', short_description='Short',
+            )
+
+    @override_settings(SITEMAP_SHARD_SIZE=2)
+    def test_large_sections_are_sharded(self):
+        response = self.client.get('/sitemap.xml')
+        self.assertContains(response, '/sitemap-services.xml</loc>')
+        self.assertContains(response, '/sitemap-services.xml?p=2</loc>')
+        self.assertNotContains(response, '/sitemap-services.xml?p=3</loc>')
+        shard = self.client.get('/sitemap-services.xml', {'p': 2})
+        self.assertEqual(shard.content.count(b'<url>'), 1)
+
+    def test_repeat_requests_cost_no_queries(self):
+        self.client.get('/sitemap-services.xml')
+        with self.assertNumQueries(0):
+            response = self.client.get('/sitemap-services.xml', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content).count(b'<url>'), 3)
+
+    def test_change_regenerates_only_its_section(self):
+        self.client.get('/sitemap-services.xml')
+        self.client.get('/sitemap-blog.xml')
+        Service.objects.create(name='New', slug='new', description='Description', short_description='Short')
+        with self.assertNumQueries(0):
+            self.client.get('/sitemap-blog.xml')
+        response = self.client.get('/sitemap-services.xml')
+        self.assertEqual(response.content.count(b'<url>'), 4)
+
+    @override_settings(ALLOWED_HOSTS=['example.com', 'www.example.com'])
+    def test_each_host_and_scheme_gets_its_own_urls(self):
+        apex = self.client.get('/sitemap-services.xml', HTTP_HOST='example.com')
+        www = self.client.get('/sitemap-services.xml', HTTP_HOST='www.example.com')
+        secure = self.client.get('/sitemap-services.xml', HTTP_HOST='example.com', secure=True)
+        self.assertContains(apex, '<loc>http://example.com/services/')
+        self.assertContains(www, '<loc>http://www.example.com/services/')
+        self.assertContains(secure, '<loc>https://example.com/services/')
+
+    def test_matching_etag_gets_304(self):
+        etag = self.client.get('/sitemap-services.xml')['ETag']
+        response = self.client.get('/sitemap-services.xml', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+def _user(n):
+    return User.objects.create_user(f'user-{n}', f'user-{n}@example.com')
+
+
+def _payment(n):
+    return Payment.objects.create(variant='stripe', currency='USD', total=10, user=_user(n))
+
+
+def _post(n):
+    return BlogPost.objects.create(title=f'Post {n}', slug=f'post-{n}', content='x', author=_user(n))
+
+
+def _plan(n):
+    return PricingPlan.objects.create(name=f'Plan {n}', slug=f'plan-{n}', description='x')
+
+
+# One row, with its own related rows, for every model registered in the admin
+ROW_FACTORIES = {
+    'auth.Group': lambda n: Group.objects.create(name=f'Group {n}'),
+    'auth.User': _user,
+    'jobs.Job': lambda n: Job.objects.create(name=f'job-{n}'),
+    'accounts.UserProfile': lambda n: UserProfile.objects.create(user=_user(n)),
+    'accounts.PaymentMethod': lambda n: PaymentMethod.objects.create(
+        user=_user(n), stripe_payment_method_id=f'pm_{n}',
+    ),
+    'accounts.Payment': _payment,
+    'accounts.Order': lambda n: Order.objects.create(
+        user=_user(n), payment=_payment(f'{n}-payer'), total_amount=10,
+    ),
+    'accounts.RevenueRollup': lambda n: RevenueRollup.objects.create(
+        day=timezone.localdate() - timedelta(days=n), currency='USD', status='completed',
+    ),
+    'accounts.StripeEvent': lambda n: StripeEvent.objects.create(
+        event_id=f'evt_{n}', event_type='payment_intent.succeeded', payload={},
+    ),
+    'pages.Page': lambda n: Page.objects.create(title=f'Page {n}', slug=f'page-{n}', content='x'),
+    'services.Service': lambda n: Service.objects.create(
+        name=f'Service {n}', slug=f'service-{n}', description='x', short_description='x',
+    ),
+    'hosting.HostingPlan': lambda n: HostingPlan.objects.create(
+        name=f'Hosting {n}', slug=f'hosting-{n}', description='x',
+        cpu='1 vCPU', ram='1 GB', storage='10 GB', bandwidth='1 TB',
+    ),
+    'pricing.PricingPlan': _plan,
+    'pricing.PricingFeature': lambda n: PricingFeature.objects.create(plan=_plan(n), feature_text='x'),
+    'portfolio.Technology': lambda n: Technology.objects.create(name=f'Tech {n}', slug=f'tech-{n}'),
+    'portfolio.PortfolioItem': lambda n: PortfolioItem.objects.create(
+        title=f'Item {n}', slug=f'item-{n}', description='x', short_description='x',
+    ),
+    'notes.Tag': lambda n: Tag.objects.create(name=f'Tag {n}', slug=f'tag-{n}'),
+    'notes.BlogPost': _post,
+    'notes.BlogComment': lambda n: BlogComment.objects.create(
+        post=_post(n), author_name='Reader', author_email='reader@example.com', content='x',
+    ),
+}
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Every changelist must cost the same number of queries however many rows it shows."""
+
+    def setUp(self):
+        self.numbers = count()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def seed(self, label, rows):
+        for _ in range(rows):
+            ROW_FACTORIES[label](next(self.numbers))
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_every_admin_has_a_row_factory(self):
+        labels = {model._meta.label for model in admin.site._registry}
+        self.assertEqual(labels - set(ROW_FACTORIES), set())
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for model in admin.site._registry:
+            label = model._meta.label
+            with self.subTest(label):
+                url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+                self.seed(label, 2)
+                # The first request fills per-process caches (content types, sessions)
+                self.changelist_queries(url)
+                few = self.changelist_queries(url)
+                self.seed(label, 6)
+                self.assertEqual(self.changelist_queries(url), few)
+
+
+class EstimatedCountAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        for number in range(3):
+            Payment.objects.create(variant='stripe', currency='USD', total=number)
+        self.url = reverse('admin:accounts_payment_changelist')
+
+    def test_date_hierarchy_and_value_filters_are_cached(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'variant=stripe')
+        # Neither the distinct date buckets nor the distinct variants are rescanned
+        self.assertFalse([query['sql'] for query in queries if 'DISTINCT' in query['sql']])
+
+    def test_large_results_use_the_planner_estimate(self):
+        with mock.patch('forge.admin.estimate_count', return_value=2_500_000):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+        self.assertContains(response, '2500000 payments')
+        self.assertFalse([query['sql'] for query in queries if 'COUNT(' in query['sql'].upper()])
+
+    def test_small_results_are_counted_exactly(self):
+        with mock.patch('forge.admin.estimate_count', return_value=40):
+            response = self.client.get(self.url)
+        self.assertContains(response, '3 payments')
+
+
+class TrigramSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        alice = User.objects.create_user('alice', 'alice@example.com')
+        bob = User.objects.create_user('bob', 'bob@example.net')
+        self.alice_order = Order.objects.create(user=alice, total_amount=10, description='Hosting for alice')
+        self.bob_order = Order.objects.create(user=bob, total_amount=10, description='Hosting renewal')
+        self.url = reverse('admin:accounts_order_changelist')
+
+    def search(self, query):
+        response = self.client.get(self.url, {'q': query})
+        return list(response.context['cl'].result_list)
+
+    def test_union_search_matches_default_search(self):
+        queries = ['alice', 'example.com', 'hosting', 'hosting bob', '"for alice"', 'nobody']
+        expected = [self.search(query) for query in queries]
+        with mock.patch('forge.admin.uses_trigram_search', return_value=True):
+            self.assertEqual([self.search(query) for query in queries], expected)
+        self.assertEqual(expected[0], [self.alice_order])
+        self.assertEqual(expected[3], [self.bob_order])
+
+    def test_row_matching_several_fields_is_listed_once(self):
+        with mock.patch('forge.admin.uses_trigram_search', return_value=True):
+            self.assertEqual(self.search('alice'), [self.alice_order])
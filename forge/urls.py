@@ -16,9 +16,26 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from forge import sitemaps as forge_sitemaps
+from hosting.sitemaps import HostingPlanSitemap
+from notes.sitemaps import BlogPostSitemap
+from pages.sitemaps import PageSitemap, StaticPagesSitemap
+from portfolio.sitemaps import PortfolioItemSitemap
+from services.sitemaps import ServiceSitemap
+
+sitemaps = {
+    'static': StaticPagesSitemap,
+    'pages': PageSitemap,
+    'services': ServiceSitemap,
+    'hosting': HostingPlanSitemap,
+    'portfolio': PortfolioItemSitemap,
+    'blog': BlogPostSitemap,
+}
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('sitemap.xml', forge_sitemaps.index, {'sitemaps': sitemaps}, name='sitemap-index'),
+    path('sitemap-<section>.xml', forge_sitemaps.section, {'sitemaps': sitemaps}, name='sitemap-section'),
     path('accounts/', include('accounts.urls')),
     path('', include('pages.urls')),
     path('services/', include('services.urls')),
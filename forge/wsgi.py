@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'forge.settings')
 
 application = get_wsgi_application()
+
+# Fail fast (or wait) if the database is unreachable when the worker boots
+from forge.db import wait_for_database  # noqa: E402
+
+wait_for_database()
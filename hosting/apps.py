@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class HostingConfig(AppConfig):
     name = 'hosting'
+
+    def ready(self):
+        from forge.cache import invalidate_on_change
+        from .models import HostingPlan
+        invalidate_on_change(HostingPlan, 'hosting')
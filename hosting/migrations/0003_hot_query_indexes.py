@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hosting', '0002_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hostingplan',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-is_featured', 'name'], name='hostingplan_active_order_idx'),
+        ),
+    ]
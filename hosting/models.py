@@ -1,4 +1,5 @@
 from django.db import models
+from django.urls import reverse
 from forge.models import BaseModel
 
 
@@ -21,6 +22,16 @@ class HostingPlan(BaseModel):
     def __str__(self):
         return self.name
 
+    def get_absolute_url(self):
+        return reverse('hosting:detail', args=[self.id])
+
     class Meta:
         ordering = ['-is_featured', 'name']
+        indexes = [
+            models.Index(
+                fields=['-is_featured', 'name'],
+                condition=models.Q(is_active=True),
+                name='hostingplan_active_order_idx',
+            ),
+        ]
 
@@ -0,0 +1,7 @@
+from forge.sitemaps import ModelSitemap
+from .models import HostingPlan
+
+
+class HostingPlanSitemap(ModelSitemap):
+    namespace = 'hosting'
+    queryset = HostingPlan.objects.filter(is_active=True).only('id', 'updated_at').order_by('id')
@@ -1,11 +1,31 @@
+from django.http import Http404
 from django.shortcuts import render
+from forge.cache import acached
+from forge.conditional import conditional_on
+from .models import HostingPlan
 
 
-def hosting_list(request):
-    """List all hosting solutions"""
-    return render(request, 'hosting/list.html')
+@conditional_on(lambda request: HostingPlan.objects.filter(is_active=True), namespace='hosting')
+async def hosting_list(request):
+    """List all active hosting solutions"""
+    async def build():
+        return [plan async for plan in HostingPlan.objects.filter(is_active=True)]
 
+    plans = await acached('hosting', build, 'list')
+    return render(request, 'hosting/list.html', {'plans': plans})
 
-def hosting_detail(request, hosting_id):
+
+@conditional_on(
+    lambda request, hosting_id: HostingPlan.objects.filter(id=hosting_id, is_active=True),
+    namespace='hosting',
+)
+async def hosting_detail(request, hosting_id):
     """Hosting solution detail view"""
-    return render(request, 'hosting/detail.html', {'hosting_id': hosting_id})
+    plan = await acached(
+        'hosting',
+        lambda: HostingPlan.objects.filter(id=hosting_id, is_active=True).afirst(),
+        'detail', hosting_id,
+    )
+    if plan is None:
+        raise Http404('Hosting plan not found')
+    return render(request, 'hosting/detail.html', {'plan': plan})
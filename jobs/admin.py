@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_after', 'updated_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'locked_at', 'last_error']
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='pending', run_after=timezone.now(), attempts=0, locked_at=None,
+        )
+        self.message_user(request, f'{updated} job(s) queued for retry.')
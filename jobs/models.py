@@ -0,0 +1,44 @@
+from django.db import models
+from django.utils import timezone
+from forge.models import BaseModel
+
+
+class Job(BaseModel):
+    """
+    A unit of background work stored in the database.
+    Enqueued with jobs.queue.enqueue() and executed by the run_jobs worker.
+    Uses UUID as primary key via BaseModel inheritance.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100, help_text="Registered handler name")
+    payload = models.JSONField(default=dict, blank=True, help_text="Keyword arguments for the handler")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run")
+    locked_at = models.DateTimeField(null=True, blank=True, help_text="When a worker claimed the job")
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        ordering = ['run_after']
+        indexes = [
+            models.Index(
+                fields=['run_after'],
+                condition=models.Q(status='pending'),
+                name='job_pending_idx',
+            ),
+            models.Index(
+                fields=['locked_at'],
+                condition=models.Q(status='running'),
+                name='job_running_idx',
+            ),
+        ]
@@ -0,0 +1,151 @@
+"""
+Database-backed job queue.
+
+Handlers are registered with the @job decorator (usually in an app's
+tasks.py) and enqueued by name with JSON-serialisable keyword arguments:
+
+    @job('stripe.detach_payment_method', retry_on=(stripe.APIConnectionError,))
+    def detach_payment_method(stripe_payment_method_id):
+        ...
+
+    enqueue('stripe.detach_payment_method', stripe_payment_method_id='pm_123')
+
+Workers (manage.py run_jobs) claim due jobs with SELECT ... FOR UPDATE SKIP
+LOCKED, so several workers can share the table. Failures listed in retry_on
+are retried with exponential backoff until max_attempts is reached; any other
+exception fails the job immediately.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+class UnknownJob(Exception):
+    """Raised when enqueueing or running a job name with no registered handler."""
+
+
+class Handler:
+    def __init__(self, func, retry_on):
+        self.func = func
+        self.retry_on = retry_on
+
+
+def job(name, retry_on=(Exception,)):
+    """Register the decorated function as the handler for jobs called name."""
+    def decorator(func):
+        _handlers[name] = Handler(func, tuple(retry_on))
+        return func
+    return decorator
+
+
+def get_handler(name):
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise UnknownJob(name)
+
+
+def _new_job(name, run_after, max_attempts, payload):
+    get_handler(name)
+    return Job(
+        name=name,
+        payload=payload,
+        run_after=run_after or timezone.now(),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def enqueue(name, *, run_after=None, max_attempts=None, **payload):
+    """Store a job for the worker and return it."""
+    new_job = _new_job(name, run_after, max_attempts, payload)
+    new_job.save(force_insert=True)
+    return new_job
+
+
+async def aenqueue(name, *, run_after=None, max_attempts=None, **payload):
+    """Async variant of enqueue() for async views."""
+    new_job = _new_job(name, run_after, max_attempts, payload)
+    await new_job.asave(force_insert=True)
+    return new_job
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts`: exponential with jitter, capped."""
+    delay = min(settings.JOBS_BACKOFF_MAX, settings.JOBS_BACKOFF_BASE * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+def claim(batch_size):
+    """
+    Mark up to batch_size due jobs as running and return them.
+    Jobs left running past JOBS_LOCK_TIMEOUT (a crashed worker) are reclaimed
+    while they have attempts left, and failed once they have none.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    with transaction.atomic():
+        Job.objects.filter(status='running', locked_at__lt=stale, attempts__gte=F('max_attempts')).update(
+            status='failed', locked_at=None, updated_at=now,
+            last_error='Worker stopped while running the last attempt',
+        )
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', run_after__lte=now)
+                | Q(status='running', locked_at__lt=stale, attempts__lt=F('max_attempts'))
+            )
+            .order_by('run_after')[:batch_size]
+        )
+        for claimed in jobs:
+            claimed.status = 'running'
+            claimed.locked_at = now
+            claimed.attempts += 1
+        Job.objects.bulk_update(jobs, ['status', 'locked_at', 'attempts'])
+    return jobs
+
+
+def execute(claimed):
+    """Run one claimed job and record the outcome."""
+    retry_on = ()
+    try:
+        handler = get_handler(claimed.name)
+        retry_on = handler.retry_on
+        handler.func(**claimed.payload)
+    except Exception as exc:
+        retry = isinstance(exc, retry_on) and claimed.attempts < claimed.max_attempts
+        claimed.last_error = traceback.format_exc()
+        claimed.locked_at = None
+        if retry:
+            claimed.status = 'pending'
+            claimed.run_after = timezone.now() + backoff(claimed.attempts)
+            logger.warning('Job %s (%s) failed, retrying at %s', claimed.pk, claimed.name, claimed.run_after)
+        else:
+            claimed.status = 'failed'
+            logger.error('Job %s (%s) failed permanently', claimed.pk, claimed.name)
+        claimed.save(update_fields=['status', 'run_after', 'locked_at', 'last_error', 'updated_at'])
+        return False
+
+    claimed.status = 'succeeded'
+    claimed.locked_at = None
+    claimed.save(update_fields=['status', 'locked_at', 'updated_at'])
+    return True
+
+
+def run_pending(batch_size=10):
+    """Claim and execute one batch of due jobs. Returns how many ran."""
+    jobs = claim(batch_size)
+    for claimed in jobs:
+        execute(claimed)
+    return len(jobs)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .models import Job
+from .queue import enqueue, job, run_pending
+
+calls = []
+
+
+class TransientError(Exception):
+    pass
+
+
+@job('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@job('tests.flaky', retry_on=(TransientError,))
+def flaky(fail_times):
+    calls.append('attempt')
+    if len(calls) <= fail_times:
+        raise TransientError('try again')
+
+
+@job('tests.broken', retry_on=(TransientError,))
+def broken():
+    raise ValueError('not retryable')
+
+
+@override_settings(JOBS_BACKOFF_BASE=1, JOBS_BACKOFF_MAX=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_with_payload(self):
+        queued = enqueue('tests.record', value=42)
+        self.assertEqual(run_pending(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'succeeded')
+        self.assertEqual(calls, [42])
+
+    def test_future_job_is_not_claimed(self):
+        enqueue('tests.record', value=1, run_after=timezone.now() + timezone.timedelta(hours=1))
+        self.assertEqual(run_pending(), 0)
+
+    def test_transient_failure_is_retried_with_backoff(self):
+        queued = enqueue('tests.flaky', fail_times=1)
+        before = timezone.now()
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'pending')
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_after, before)
+        self.assertIn('TransientError', queued.last_error)
+
+        Job.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'succeeded')
+        self.assertEqual(queued.attempts, 2)
+
+    def test_job_fails_after_max_attempts(self):
+        queued = enqueue('tests.flaky', fail_times=10, max_attempts=2)
+        for _ in range(2):
+            Job.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+            run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertEqual(calls, ['attempt', 'attempt'])
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_stale_running_job_is_reclaimed_until_out_of_attempts(self):
+        crashed = timezone.now() - timedelta(minutes=5)
+        retried = enqueue('tests.record', value='retried', max_attempts=2)
+        exhausted = enqueue('tests.record', value='exhausted', max_attempts=2)
+        Job.objects.filter(pk=retried.pk).update(status='running', locked_at=crashed, attempts=1)
+        Job.objects.filter(pk=exhausted.pk).update(status='running', locked_at=crashed, attempts=2)
+
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, ['retried'])
+        exhausted.refresh_from_db()
+        self.assertEqual((exhausted.status, exhausted.locked_at), ('failed', None))
+        self.assertEqual(run_pending(), 0)
+
+    def test_unexpected_error_fails_immediately(self):
+        queued = enqueue('tests.broken')
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertEqual(queued.attempts, 1)
@@ -1,28 +1,142 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import BlogPost, BlogComment
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
+from .models import BlogPost, BlogComment, BlogPostTag, Tag
+from .search import search_posts, uses_search_vector
+
+
+class CommentPageFormSet(BaseInlineFormSet):
+    """Inline formset showing one page of comments instead of all of them."""
+    page_number = None
+    per_page = 25
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self.page = Paginator(super().get_queryset(), self.per_page).get_page(self.page_number)
+            comments = list(self.page.object_list)
+            for comment in comments:
+                # Rows are labelled with str(comment), which reads comment.post
+                comment.post = self.instance
+            self._queryset = comments
+        return self._queryset
 
 
 class BlogCommentInline(admin.TabularInline):
+    """
+    Read-only, paginated list of a post's comments (?comments_page=). Popular
+    posts have thousands, so moderation happens in the comment admin.
+    """
     model = BlogComment
+    formset = CommentPageFormSet
+    template = 'admin/notes/blogpost/comment_inline.html'
+    page_param = 'comments_page'
+    per_page = 25
+    fields = ['author_name', 'content', 'is_approved', 'spam_score', 'created_at']
+    readonly_fields = fields
     extra = 0
-    readonly_fields = ['id', 'created_at', 'updated_at']
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get(self.page_param)
+        formset.per_page = self.per_page
+        formset.page_param = self.page_param
+        return formset
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class BlogPostTagInline(admin.TabularInline):
+    model = BlogPostTag
+    extra = 1
+    autocomplete_fields = ['tag']
+    fields = ['tag']
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'post_count']
+    search_fields = ['name', 'slug']
+    readonly_fields = ['id', 'post_count', 'created_at', 'updated_at']
 
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
-    list_display = ['title', 'slug', 'author', 'published_date', 'is_published', 'read_time_minutes']
-    list_filter = ['is_published', 'published_date', 'created_at', 'author']
+    list_display = ['title', 'slug', 'author', 'published_date', 'is_published', 'read_time_minutes', 'approved_comment_count']
+    # Only users who have written a post are offered as author filters
+    list_filter = ['is_published', 'published_date', 'created_at', ('author', admin.RelatedOnlyFieldListFilter)]
+    list_select_related = ['author']
     search_fields = ['title', 'slug', 'content', 'excerpt']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ['id', 'created_at', 'updated_at']
     date_hierarchy = 'published_date'
-    inlines = [BlogCommentInline]
+    inlines = [BlogPostTagInline, BlogCommentInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index on PostgreSQL instead of ILIKE scans."""
+        if search_term and uses_search_vector(queryset):
+            return search_posts(search_term, queryset), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class SpamFilter(admin.SimpleListFilter):
+    """
+    Splits comments on COMMENT_SPAM_THRESHOLD. The moderation queue hides
+    likely spam until 'Likely spam' or 'All' is picked.
+    """
+    title = 'spam'
+    parameter_name = 'spam'
+
+    def lookups(self, request, model_admin):
+        return [('no', 'Not spam'), ('yes', 'Likely spam'), ('all', 'All')]
+
+    def value(self):
+        return super().value() or 'no'
+
+    def choices(self, changelist):
+        # No unfiltered 'All' link: 'no' is the default and 'all' is a lookup
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': self.value() == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        threshold = settings.COMMENT_SPAM_THRESHOLD
+        if self.value() == 'no':
+            return queryset.filter(spam_score__lt=threshold)
+        if self.value() == 'yes':
+            return queryset.filter(spam_score__gte=threshold)
+        return queryset
 
 
 @admin.register(BlogComment)
 class BlogCommentAdmin(admin.ModelAdmin):
-    list_display = ['post', 'author_name', 'author_email', 'is_approved', 'created_at']
-    list_filter = ['is_approved', 'created_at']
+    list_display = ['post', 'author_name', 'author_email', 'is_approved', 'spam_score', 'created_at']
+    list_filter = ['is_approved', SpamFilter, 'created_at']
+    list_select_related = ['post']
     search_fields = ['author_name', 'author_email', 'content']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'spam_score', 'created_at', 'updated_at']
+    actions = ['approve_comments', 'reject_comments']
+
+    # Both actions are a single UPDATE over the selection, however large,
+    # plus one for the posts' approved_comment_count
+
+    @admin.action(description='Approve selected comments', permissions=['change'])
+    def approve_comments(self, request, queryset):
+        count = queryset.set_approved(True)
+        self.message_user(request, f'{count} comment(s) approved.')
+
+    @admin.action(description='Reject selected comments as spam', permissions=['change'])
+    def reject_comments(self, request, queryset):
+        count = queryset.set_approved(False, spam_score=1.0)
+        self.message_user(request, f'{count} comment(s) rejected.')
 
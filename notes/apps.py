@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class NotesConfig(AppConfig):
     name = 'notes'
+
+    def ready(self):
+        from forge.cache import invalidate_on_change
+        from . import signals
+        from .models import BlogPost
+        signals.connect()
+        invalidate_on_change(BlogPost, 'notes')
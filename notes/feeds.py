@@ -0,0 +1,50 @@
+"""
+RSS and Atom feeds of the latest published posts.
+
+Items carry the stored excerpt rather than the body, so building a feed
+never loads or renders post content. The views in notes/views.py serve the
+feeds through forge.responses.cached_response().
+"""
+from django.contrib.syndication.views import Feed
+from django.urls import reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+from .models import BlogPost
+
+FEED_SIZE = 20
+
+
+class LatestPostsFeed(Feed):
+    title = 'TG11 Forge Blog'
+    link = reverse_lazy('notes:list')
+    description = 'Latest posts from TG11 Forge'
+
+    def items(self):
+        return (
+            BlogPost.objects.filter(is_published=True, published_date__isnull=False)
+            .select_related('author')
+            .only('id', 'title', 'excerpt', 'published_date', 'updated_at',
+                  'author__username', 'author__first_name', 'author__last_name')
+            .order_by('-published_date', '-id')[:FEED_SIZE]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.published_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        if item.author is None:
+            return None
+        return item.author.get_full_name() or item.author.username
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
@@ -0,0 +1,18 @@
+from django import forms
+from .models import BlogComment
+
+
+class CommentForm(forms.ModelForm):
+    """Public comment submission form."""
+
+    class Meta:
+        model = BlogComment
+        fields = ['author_name', 'author_email', 'content']
+        labels = {
+            'author_name': 'Name',
+            'author_email': 'Email (not published)',
+            'content': 'Comment',
+        }
+        widgets = {
+            'content': forms.Textarea(attrs={'rows': 5}),
+        }
@@ -0,0 +1,118 @@
+"""
+Benchmark blog search on a synthetic corpus.
+
+Inserts --posts generated posts inside a transaction that is rolled back
+afterwards (unless --keep), then times the admin's old ILIKE search against
+search_posts() for a set of terms. On PostgreSQL the tsvector trigger fills
+search_vector on insert, so insert time includes maintaining it.
+"""
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from notes.models import BlogPost
+from notes.search import search_posts, uses_search_vector
+
+VOCABULARY = (
+    'cloud infrastructure security scaling database kubernetes container network '
+    'latency throughput cache index query migration deployment monitoring backup '
+    'storage compute cluster replica failover encryption certificate firewall '
+    'pipeline release rollback observability metrics logging tracing incident '
+    'capacity budget vendor contract compliance audit policy identity access '
+    'python django postgres redis nginx linux server hardware sensor industrial'
+).split()
+SYLLABLES = 'ka lo mi ner po sta vi ru tel den bra quo zen fi gal tor'.split()
+
+
+def rare_words(rng, count):
+    """Invented words; each post gets a few, so searching one is selective."""
+    return sorted({''.join(rng.choices(SYLLABLES, k=4)) for _ in range(count)})
+
+
+class Command(BaseCommand):
+    help = 'Compare ILIKE and full-text blog search on a synthetic corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000,
+                            help='Synthetic posts to insert')
+        parser.add_argument('--words', type=int, default=400,
+                            help='Words per post body')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Times each search is run')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic posts instead of rolling back')
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        topics = rare_words(rng, 20000)
+        search_terms = [
+            'kubernetes',                   # common: in most posts
+            'encryption certificate',       # two common words
+            topics[0],                      # rare
+            f'{topics[1]} OR {topics[2]}',  # rare, either word
+            'zyxwvut',                      # no matches
+        ]
+        with transaction.atomic():
+            self.populate(rng, topics, options)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE notes_blogpost')
+
+            published = BlogPost.objects.filter(is_published=True)
+            self.stdout.write(f'{"term":<30} {"ILIKE ms":>10} {"search ms":>10} {"matches":>8}')
+            for term in search_terms:
+                ilike = published.filter(
+                    Q(title__icontains=term) | Q(slug__icontains=term)
+                    | Q(content__icontains=term) | Q(excerpt__icontains=term)
+                )
+                ilike_ms, _ = self.time(ilike, options['repeat'])
+                search_ms, matches = self.time(search_posts(term, published), options['repeat'])
+                self.stdout.write(f'{term:<30} {ilike_ms:>10.1f} {search_ms:>10.1f} {matches:>8}')
+
+            if not uses_search_vector(published):
+                self.stdout.write(self.style.WARNING(
+                    f'{connection.vendor} has no search vector; search_posts() used the ILIKE fallback'
+                ))
+            else:
+                self.stdout.write('')
+                self.stdout.write(search_posts(topics[0], published)[:20].explain())
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def populate(self, rng, topics, options):
+        total, batch_size, words = options['posts'], options['batch_size'], options['words']
+        now = timezone.now()
+        started = time.perf_counter()
+        for start in range(0, total, batch_size):
+            batch = []
+            for _ in range(min(batch_size, total - start)):
+                title = ' '.join(rng.choices(VOCABULARY, k=6)).capitalize()
+                batch.append(BlogPost(
+                    title=title,
+                    slug=f'bench-{uuid.uuid4().hex}',
+                    excerpt=' '.join(rng.choices(VOCABULARY, k=25)),
+                    content=' '.join(rng.choices(VOCABULARY, k=words) + rng.choices(topics, k=5)),
+                    is_published=True,
+                    published_date=now,
+                ))
+            BlogPost.objects.bulk_create(batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Inserted {total} posts on {connection.vendor} in {elapsed:.1f}s '
+                          f'({total / elapsed:,.0f} posts/s)')
+
+    def time(self, queryset, repeat):
+        """Return (best time in ms to fetch the first page of ids, total match count)."""
+        best = None
+        for _ in range(repeat):
+            began = time.perf_counter()
+            list(queryset.values_list('id', flat=True)[:20])
+            elapsed = (time.perf_counter() - began) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, queryset.count()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from notes.models import Tag
+
+
+class Command(BaseCommand):
+    help = 'Recount published posts per tag (repairs drift from queryset.update() on posts)'
+
+    def handle(self, *args, **options):
+        updated = Tag.objects.rebuild_post_counts()
+        self.stdout.write(f'Recounted {updated} tag(s)')
@@ -0,0 +1,45 @@
+"""
+Recompute derived BlogPost fields (read_time_minutes and automatic
+excerpts) for the whole table.
+
+Rows are streamed with iterator() and written back with one bulk_update per
+batch, only for posts whose values actually changed. save() and its
+signals are never called.
+"""
+from django.core.management.base import BaseCommand
+
+from notes.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Recompute read_time_minutes and automatic excerpts for every blog post'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Posts per bulk_update')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report how many posts would change without writing')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['read_time_minutes', 'excerpt']
+        posts = BlogPost.objects.order_by('pk').only('pk', 'content', 'excerpt', 'auto_excerpt', 'read_time_minutes')
+
+        scanned = updated = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            scanned += 1
+            if post.update_metadata():
+                batch.append(post)
+            if len(batch) >= batch_size:
+                updated += self.flush(batch, fields, options['dry_run'])
+                batch = []
+        updated += self.flush(batch, fields, options['dry_run'])
+
+        verb = 'would change' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'Scanned {scanned} post(s), {verb} {updated}'))
+
+    def flush(self, batch, fields, dry_run):
+        if batch and not dry_run:
+            BlogPost.objects.bulk_update(batch, fields)
+        return len(batch)
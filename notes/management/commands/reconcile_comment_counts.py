@@ -0,0 +1,51 @@
+"""
+Repair drift in BlogPost.approved_comment_count.
+
+The counter is maintained incrementally, so comments changed behind the
+ORM's back (raw SQL, queryset.update() on is_approved) leave it wrong.
+This walks posts in primary-key batches, compares each counter with a
+correlated COUNT subquery, and rewrites only the posts that drifted, so
+each batch is one read and at most one UPDATE.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from notes.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Recount approved comments per blog post, in batches, fixing posts whose counter drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Posts checked per batch')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted posts without fixing them')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = drifted = 0
+        last_pk = None
+        while True:
+            posts = BlogPost.objects.order_by('pk')
+            if last_pk is not None:
+                posts = posts.filter(pk__gt=last_pk)
+            batch = list(posts.values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1]
+            checked += len(batch)
+
+            wrong = list(
+                BlogPost.objects.filter(pk__in=batch).with_actual_comment_counts()
+                .exclude(approved_comment_count=F('actual_comment_count'))
+                .values_list('pk', 'approved_comment_count', 'actual_comment_count')
+            )
+            for pk, stored, actual in wrong:
+                self.stdout.write(f'{pk}: {stored} -> {actual}')
+            if wrong and not options['dry_run']:
+                BlogPost.objects.filter(pk__in=[pk for pk, _, _ in wrong]).rebuild_comment_counts()
+            drifted += len(wrong)
+
+        action = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} post(s), {action} {drifted}'))
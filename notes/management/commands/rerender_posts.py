@@ -0,0 +1,71 @@
+"""
+Re-render stored blog post HTML, e.g. after bumping RENDERER_VERSION.
+
+Posts are read in batches and rendered across a process pool, since
+markdown, sanitizing and syntax highlighting are CPU-bound. Only the main
+process touches the database: it writes each rendered batch back with
+bulk_update(), which leaves search_vector and updated_at alone.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from notes.models import BlogPost
+from notes.rendering import content_hash, render_many
+
+
+class Command(BaseCommand):
+    help = 'Re-render BlogPost.content_html for stale (or, with --all, every) post'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Renderer processes (default: CPU count)')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Posts per worker task and per bulk_update')
+        parser.add_argument('--all', action='store_true',
+                            help='Re-render posts whose stored render is already current')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+        batches = self.stale_batches(batch_size, options['all'])
+
+        # Workers never use the database; don't let them inherit a connection
+        connections.close_all()
+        rendered = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep a bounded number of batches in flight so the whole table
+            # is never held in memory
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(render_many, batch))
+                if len(pending) >= workers * 2:
+                    rendered += self.save(pending.popleft().result(), batch_size)
+            while pending:
+                rendered += self.save(pending.popleft().result(), batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Done: {rendered} post(s) re-rendered'))
+
+    def save(self, results, batch_size):
+        posts = [
+            BlogPost(pk=pk, content_html=html, content_hash=digest)
+            for pk, html, digest in results
+        ]
+        BlogPost.objects.bulk_update(posts, ['content_html', 'content_hash'], batch_size=batch_size)
+        self.stdout.write(f'Rendered {len(posts)} post(s)')
+        return len(posts)
+
+    def stale_batches(self, batch_size, include_current):
+        """Yield lists of (pk, content) for posts whose render is out of date."""
+        batch = []
+        rows = BlogPost.objects.order_by('pk').values_list('pk', 'content', 'content_hash')
+        for pk, content, stored_hash in rows.iterator(chunk_size=batch_size * 5):
+            if include_current or stored_hash != content_hash(content):
+                batch.append((pk, content))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:25
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from forge.operations import RunPostgresSQL
+
+# Keep in sync with notes.search.SEARCH_CONFIG and the weights documented there
+SEARCH_VECTOR = """
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}.title, '')), 'A') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}.excerpt, '')), 'B') ||
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}.content, '')), 'C')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        RunPostgresSQL(
+            sql=f"""
+                CREATE FUNCTION notes_blogpost_search_vector_update() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector := {SEARCH_VECTOR.format(row='NEW')};
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER notes_blogpost_search_vector_trigger
+                BEFORE INSERT OR UPDATE OF title, excerpt, content, search_vector
+                ON notes_blogpost
+                FOR EACH ROW EXECUTE FUNCTION notes_blogpost_search_vector_update();
+
+                UPDATE notes_blogpost SET search_vector = {SEARCH_VECTOR.format(row='notes_blogpost')};
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS notes_blogpost_search_vector_trigger ON notes_blogpost;
+                DROP FUNCTION IF EXISTS notes_blogpost_search_vector_update();
+            """,
+        ),
+        RunPostgresSQL(
+            sql='CREATE INDEX blogpost_search_vector_idx ON notes_blogpost USING gin (search_vector);',
+            reverse_sql='DROP INDEX IF EXISTS blogpost_search_vector_idx;',
+        ),
+    ]
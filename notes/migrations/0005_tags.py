@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:27
+
+import django.db.models.deletion
+import forge.ids
+from django.db import migrations, models
+from forge.slugs import name_key, normalize_name, unique_slug
+
+
+def split_tags(apps, schema_editor):
+    """Turn each post's comma-separated tags string into Tag/BlogPostTag rows."""
+    BlogPost = apps.get_model('notes', 'BlogPost')
+    Tag = apps.get_model('notes', 'Tag')
+    BlogPostTag = apps.get_model('notes', 'BlogPostTag')
+
+    tags = {}
+    slugs = set()
+    links = []
+    counts = {}
+    posts = BlogPost.objects.exclude(tags='').values_list('pk', 'tags', 'is_published')
+    for post_id, tag_string, is_published in posts.iterator(chunk_size=2000):
+        seen = set()
+        for name in tag_string.split(','):
+            name = normalize_name(name, 50)
+            key = name_key(name)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            # Names differing only in case or spacing are one tag; the first spelling wins
+            if key not in tags:
+                slug = unique_slug(name, 60, slugs.__contains__)
+                slugs.add(slug)
+                tags[key] = Tag(name=name, slug=slug)
+            links.append(BlogPostTag(post_id=post_id, tag=tags[key]))
+            if is_published:
+                counts[key] = counts.get(key, 0) + 1
+
+    for key, tag in tags.items():
+        tag.post_count = counts.get(key, 0)
+    Tag.objects.bulk_create(tags.values(), batch_size=1000)
+    BlogPostTag.objects.bulk_create(links, batch_size=1000)
+
+
+def join_tags(apps, schema_editor):
+    """Write tag names back into the comma-separated field."""
+    BlogPost = apps.get_model('notes', 'BlogPost')
+    BlogPostTag = apps.get_model('notes', 'BlogPostTag')
+
+    names = {}
+    for post_id, name in BlogPostTag.objects.order_by('created_at').values_list('post_id', 'tag__name'):
+        names.setdefault(post_id, []).append(name)
+    posts = list(BlogPost.objects.filter(pk__in=names).only('pk'))
+    for post in posts:
+        post.tags = ', '.join(names[post.pk])[:200]
+    BlogPost.objects.bulk_update(posts, ['tags'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_blogpost_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('slug', models.SlugField(max_length=60, unique=True)),
+                ('post_count', models.PositiveIntegerField(default=0, editable=False, help_text='Published posts with this tag, kept up to date on save')),
+            ],
+            options={
+                'ordering': ['name'],
+                'indexes': [models.Index(condition=models.Q(('post_count__gt', 0)), fields=['-post_count', 'name'], name='tag_cloud_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BlogPostTag',
+            fields=[
+                ('id', models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='notes.blogpost')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='notes.tag')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='blogposttag',
+            index=models.Index(fields=['tag', 'post'], name='blogposttag_tag_post_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='blogposttag',
+            constraint=models.UniqueConstraint(fields=('post', 'tag'), name='unique_blogpost_tag'),
+        ),
+        migrations.RunPython(split_tags, join_tags),
+        migrations.RemoveField(
+            model_name='blogpost',
+            name='tags',
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='posts', through='notes.BlogPostTag', to='notes.tag'),
+        ),
+    ]
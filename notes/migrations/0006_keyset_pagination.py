@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:29
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_published_dates(apps, schema_editor):
+    """Published posts are paginated by published_date, so it can't be NULL."""
+    BlogPost = apps.get_model('notes', 'BlogPost')
+    BlogPost.objects.filter(is_published=True, published_date__isnull=True).update(published_date=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_published_dates, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='blogcomment',
+            options={'ordering': ['created_at', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='blogpost',
+            options={'ordering': ['-published_date', '-id'], 'verbose_name': 'Blog Post', 'verbose_name_plural': 'Blog Posts'},
+        ),
+        migrations.RemoveIndex(
+            model_name='blogcomment',
+            name='blogcomment_approved_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='blogpost',
+            name='blogpost_published_order_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['post', 'created_at', 'id'], name='blogcomment_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_date', '-id'], name='blogpost_published_order_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+def keep_written_excerpts(apps, schema_editor):
+    """Existing excerpts were written by hand; don't overwrite them on the next save."""
+    BlogPost = apps.get_model('notes', 'BlogPost')
+    BlogPost.objects.exclude(excerpt='').update(auto_excerpt=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0007_blogpost_content_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='auto_excerpt',
+            field=models.BooleanField(default=True, help_text='Derive the excerpt from the content on save; untick to write your own'),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='read_time_minutes',
+            field=models.IntegerField(default=1, editable=False, help_text='Estimated reading time in minutes, derived from the content on save'),
+        ),
+        migrations.RunPython(keep_written_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0008_derived_post_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogcomment',
+            name='spam_score',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(condition=models.Q(('is_approved', False)), fields=['created_at', 'id'], name='blogcomment_moderation_idx'),
+        ),
+    ]
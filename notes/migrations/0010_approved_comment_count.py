@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:42
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_approved_comments(apps, schema_editor):
+    """Fill approved_comment_count for existing posts in one UPDATE."""
+    BlogPost = apps.get_model('notes', 'BlogPost')
+    BlogComment = apps.get_model('notes', 'BlogComment')
+    approved = (
+        BlogComment.objects.filter(post=models.OuterRef('pk'), is_approved=True)
+        .order_by().values('post').annotate(count=models.Count('pk')).values('count')
+    )
+    BlogPost.objects.update(approved_comment_count=Coalesce(models.Subquery(approved), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0009_comment_spam_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='approved_comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Approved comments, kept up to date as comments are approved, unapproved and deleted'),
+        ),
+        migrations.RunPython(count_approved_comments, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,111 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
 from forge.models import BaseModel
+from forge.slugs import unique_slug
+from .rendering import content_hash, render_content
+from .text import make_excerpt, read_time_minutes
+
+
+class TagQuerySet(models.QuerySet):
+    """
+    Query API for tags. post_count is precomputed (see notes/signals.py),
+    so the tag cloud is a single indexed read.
+    """
+
+    def cloud(self, limit=30):
+        """Tags with at least one published post, most used first."""
+        return self.filter(post_count__gt=0).order_by('-post_count', 'name')[:limit]
+
+    def adjust_post_counts(self, tag_ids, delta):
+        """Add delta to the post_count of each tag in tag_ids, never going below zero."""
+        tags = self.filter(pk__in=tag_ids)
+        if delta < 0:
+            tags = tags.filter(post_count__gte=-delta)
+        return tags.update(post_count=models.F('post_count') + delta)
+
+    def rebuild_post_counts(self):
+        """Recount every tag's published posts in one UPDATE."""
+        published = (
+            BlogPostTag.objects.filter(tag=models.OuterRef('pk'), post__is_published=True)
+            .order_by().values('tag').annotate(count=models.Count('pk')).values('count')
+        )
+        return self.update(post_count=Coalesce(models.Subquery(published), 0))
+
+
+class Tag(BaseModel):
+    """
+    Model for blog post tags.
+    Uses UUID as primary key via BaseModel inheritance.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    slug = models.SlugField(max_length=60, unique=True, blank=True, help_text="Generated from the name when left blank")
+    post_count = models.PositiveIntegerField(default=0, editable=False, help_text="Published posts with this tag, kept up to date on save")
+
+    objects = TagQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            others = Tag.objects.exclude(pk=self.pk)
+            self.slug = unique_slug(self.name, 60, lambda slug: others.filter(slug=slug).exists())
+        super().save(*args, **kwargs)
+
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['-post_count', 'name'],
+                condition=models.Q(post_count__gt=0),
+                name='tag_cloud_idx',
+            ),
+        ]
+
+
+def _approved_comment_count():
+    """Subquery counting the approved comments of the outer post."""
+    approved = (
+        BlogComment.objects.filter(post=models.OuterRef('pk'), is_approved=True)
+        .order_by().values('post').annotate(count=models.Count('pk')).values('count')
+    )
+    return Coalesce(models.Subquery(approved), 0)
+
+
+class BlogPostQuerySet(models.QuerySet):
+    """
+    Query API for posts. approved_comment_count is maintained by
+    BlogComment.save(), BlogCommentQuerySet.set_approved() and the comment
+    post_delete handler in notes/signals.py, so listings never count comments.
+    """
+
+    def adjust_comment_counts(self, deltas):
+        """
+        Add deltas ({post_id: n}) to approved_comment_count with one atomic
+        UPDATE, never going below zero.
+        """
+        deltas = {post_id: delta for post_id, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+        change = models.Case(
+            *[models.When(pk=post_id, then=models.Value(delta)) for post_id, delta in deltas.items()],
+            default=models.Value(0),
+        )
+        return self.filter(pk__in=deltas).update(
+            approved_comment_count=Greatest(models.F('approved_comment_count') + change, models.Value(0)),
+        )
+
+    def with_actual_comment_counts(self):
+        """Annotate actual_comment_count, the number of approved comments counted now."""
+        return self.annotate(actual_comment_count=_approved_comment_count())
+
+    def rebuild_comment_counts(self):
+        """Recount approved comments for every post in the queryset in one UPDATE."""
+        return self.update(approved_comment_count=_approved_comment_count())
 
 
 class BlogPost(BaseModel):
@@ -10,23 +115,144 @@ class BlogPost(BaseModel):
     """
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
-    content = models.TextField()
+    content = models.TextField(help_text="Markdown")
+    # Rendered from content on save; see notes/rendering.py
+    content_html = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
     excerpt = models.CharField(max_length=300, blank=True)
+    auto_excerpt = models.BooleanField(default=True, help_text="Derive the excerpt from the content on save; untick to write your own")
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='blog_posts')
     published_date = models.DateTimeField(null=True, blank=True)
     is_published = models.BooleanField(default=False)
-    read_time_minutes = models.IntegerField(default=5, help_text="Estimated reading time in minutes")
-    tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
+    read_time_minutes = models.IntegerField(default=1, editable=False, help_text="Estimated reading time in minutes, derived from the content on save")
+    tags = models.ManyToManyField(Tag, through='BlogPostTag', related_name='posts', blank=True)
+    approved_comment_count = models.PositiveIntegerField(default=0, editable=False, help_text="Approved comments, kept up to date as comments are approved, unapproved and deleted")
+    # Maintained by a database trigger on PostgreSQL; see notes/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = BlogPostQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return reverse('notes:detail', args=[self.id])
+
+    def render(self):
+        """
+        Re-render content_html if content or the renderer changed since the
+        last render. Returns whether anything changed; does not save.
+        """
+        current = content_hash(self.content)
+        if current == self.content_hash:
+            return False
+        self.content_html = render_content(self.content)
+        self.content_hash = current
+        return True
+
+    def update_metadata(self):
+        """
+        Derive read_time_minutes, and the excerpt when auto_excerpt is set or
+        none was written, from content. Returns the names of changed fields.
+        """
+        changed = []
+        read_time = read_time_minutes(self.content)
+        if read_time != self.read_time_minutes:
+            self.read_time_minutes = read_time
+            changed.append('read_time_minutes')
+        if self.auto_excerpt or not self.excerpt:
+            excerpt = make_excerpt(self.content, self._meta.get_field('excerpt').max_length)
+            if excerpt != self.excerpt:
+                self.excerpt = excerpt
+                changed.append('excerpt')
+        return changed
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            if self.render() and update_fields is not None:
+                update_fields = {*update_fields, 'content_html', 'content_hash'}
+            changed = self.update_metadata()
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, *changed}
+        # Published posts always have a date: it is the blog's pagination key
+        if self.is_published and self.published_date is None:
+            self.published_date = timezone.now()
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'published_date'}
+        was_published = None
+        if not self._state.adding and (update_fields is None or 'is_published' in update_fields):
+            was_published = BlogPost.objects.filter(pk=self.pk).values_list('is_published', flat=True).first()
+        if not self._state.adding and update_fields is None:
+            # The comment counter only moves through F() updates; writing back
+            # the value loaded with this instance would undo concurrent ones
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'approved_comment_count'
+            ]
+        super().save(*args, **kwargs)
+        # Publishing or unpublishing moves every tag of the post in or out of the counts
+        if was_published is not None and was_published != self.is_published:
+            Tag.objects.adjust_post_counts(
+                self.post_tags.values('tag_id'), 1 if self.is_published else -1,
+            )
+
     class Meta:
-        ordering = ['-published_date', '-created_at']
+        # The primary key breaks ties so the order is total (see forge.pagination)
+        ordering = ['-published_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['-published_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='blogpost_published_order_idx',
+            ),
+        ]
         verbose_name = "Blog Post"
         verbose_name_plural = "Blog Posts"
 
 
+class BlogPostTag(BaseModel):
+    """
+    Link between a blog post and a tag.
+    Uses UUID as primary key via BaseModel inheritance.
+    """
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='post_tags')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_tags')
+
+    def __str__(self):
+        return f"{self.post} - {self.tag}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'], name='unique_blogpost_tag'),
+        ]
+        indexes = [
+            # Tag filter: posts for one tag without touching other tags' rows
+            models.Index(fields=['tag', 'post'], name='blogposttag_tag_post_idx'),
+        ]
+
+
+class BlogCommentQuerySet(models.QuerySet):
+    def set_approved(self, approved, **fields):
+        """
+        Approve (or unapprove) every comment in the queryset with one UPDATE,
+        also setting any extra fields, and move approved_comment_count on
+        their posts to match. Returns the number of comments updated.
+        """
+        with transaction.atomic(using=self.db):
+            # Lock the rows so nobody else flips them between counting and updating
+            rows = list(self.select_for_update().values_list('pk', 'post_id', 'is_approved'))
+            deltas = {}
+            for _, post_id, is_approved in rows:
+                if is_approved != approved:
+                    deltas[post_id] = deltas.get(post_id, 0) + (1 if approved else -1)
+            updated = BlogComment.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+                is_approved=approved, updated_at=timezone.now(), **fields,
+            )
+            BlogPost.objects.adjust_comment_counts(deltas)
+        return updated
+
+
 class BlogComment(BaseModel):
     """
     Model for blog post comments.
@@ -37,10 +263,46 @@ class BlogComment(BaseModel):
     author_email = models.EmailField()
     content = models.TextField()
     is_approved = models.BooleanField(default=False)
+    # Set from notes/spam.py when the comment is submitted; 0 is clean, 1 is spam
+    spam_score = models.FloatField(default=0.0, editable=False)
+
+    objects = BlogCommentQuerySet.as_manager()
 
     def __str__(self):
         return f"Comment by {self.author_name} on {self.post.title}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'is_approved', 'post'} & set(update_fields):
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using') or BlogComment.objects.db):
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    BlogComment.objects.select_for_update().filter(pk=self.pk)
+                    .values_list('post_id', 'is_approved').first()
+                )
+            super().save(*args, **kwargs)
+            deltas = {}
+            if previous is not None and previous[1]:
+                deltas[previous[0]] = -1
+            if self.is_approved:
+                deltas[self.post_id] = deltas.get(self.post_id, 0) + 1
+            BlogPost.objects.adjust_comment_counts(deltas)
+
     class Meta:
-        ordering = ['created_at']
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                condition=models.Q(is_approved=True),
+                name='blogcomment_approved_idx',
+            ),
+            # The admin's moderation queue: unapproved comments, oldest first
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(is_approved=False),
+                name='blogcomment_moderation_idx',
+            ),
+        ]
 
@@ -0,0 +1,64 @@
+"""
+Markdown rendering for blog posts.
+
+Posts are rendered once, when they are saved, into BlogPost.content_html.
+content_hash identifies the source text and the renderer that produced the
+HTML, so bumping RENDERER_VERSION after changing anything below marks every
+stored render as stale; `manage.py rerender_posts` then refreshes them in
+bulk.
+"""
+import hashlib
+
+import markdown
+import nh3
+
+# Bump whenever the output of render_content() changes for the same input
+RENDERER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'codehilite', 'tables', 'sane_lists', 'toc']
+MARKDOWN_CONFIG = {
+    # Pygments highlighting with CSS classes; see static/css/highlight.css
+    'codehilite': {'css_class': 'highlight', 'guess_lang': False},
+    'toc': {'permalink': False},
+}
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'blockquote', 'br', 'code', 'del', 'div', 'em', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'img', 'li', 'ol', 'p', 'pre', 'span', 'strong', 'sub',
+    'sup', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    '*': {'class', 'id'},
+    'a': {'href', 'title'},
+    'abbr': {'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'align'},
+    'th': {'align'},
+}
+URL_SCHEMES = {'http', 'https', 'mailto'}
+
+
+def content_hash(content):
+    """Hash of the source text and renderer version."""
+    return hashlib.sha256(f'{RENDERER_VERSION}:{content}'.encode()).hexdigest()
+
+
+def render_content(content):
+    """Render markdown to sanitized HTML with highlighted code blocks."""
+    html = markdown.markdown(
+        content,
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_CONFIG,
+        output_format='html',
+    )
+    return nh3.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes=URL_SCHEMES,
+    )
+
+
+def render_many(items):
+    """Render [(pk, content), ...] to [(pk, html, hash), ...]. Runs in pool workers."""
+    return [(pk, render_content(content), content_hash(content)) for pk, content in items]
@@ -0,0 +1,54 @@
+"""
+Ranked full-text search over blog posts.
+
+On PostgreSQL, BlogPost.search_vector holds a weighted tsvector (title A,
+excerpt B, content C). A trigger (notes migration 0004) keeps it up to date
+and a GIN index serves the queries. Other databases fall back to a
+case-insensitive substring match so development and tests work anywhere.
+
+The rank is a float, which would not survive the round trip through a
+page cursor exactly. It is cast to a fixed-precision numeric, so rows are
+compared on the same value in the ORDER BY and in the cursor's WHERE.
+"""
+from decimal import Decimal
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import DecimalField, F, Q, Value
+from django.db.models.functions import Cast
+
+from .models import BlogPost
+
+SEARCH_CONFIG = 'english'
+RANK_FIELD = DecimalField(max_digits=12, decimal_places=6)
+
+
+def uses_search_vector(queryset):
+    """Whether queryset's database maintains BlogPost.search_vector."""
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def search_posts(query, queryset=None):
+    """
+    Filter queryset (default: published posts) to posts matching query,
+    annotated with a fixed-precision `rank` and ordered best match first. Accepts web-search
+    syntax on PostgreSQL: quoted phrases, OR, and -excluded words.
+    """
+    if queryset is None:
+        queryset = BlogPost.objects.filter(is_published=True)
+    query = query.strip()
+    if not query:
+        return queryset.none()
+
+    if uses_search_vector(queryset):
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(rank=Cast(SearchRank(F('search_vector'), search_query), RANK_FIELD))
+            .order_by('-rank', '-published_date')
+        )
+
+    return (
+        queryset.filter(Q(title__icontains=query) | Q(excerpt__icontains=query) | Q(content__icontains=query))
+        .annotate(rank=Value(Decimal(0), output_field=RANK_FIELD))
+    )
@@ -0,0 +1,68 @@
+"""
+Keep Tag.post_count in step with tag links, and BlogPost.approved_comment_count
+in step with deleted comments.
+
+post_count counts published posts only. Links are created either one at a
+time (admin inline, BlogPostTag.objects.create -> post_save) or in bulk by
+post.tags.add()/set() (bulk_create -> m2m_changed 'post_add'). Removals all
+go through a queryset delete, which sends post_delete per link while a
+receiver is connected, so 'post_remove'/'post_clear' are not handled here.
+Publishing and unpublishing a post is handled in BlogPost.save().
+
+Tag changes also bump the post's updated_at, which is part of the detail
+page's fragment cache key and the sitemap's lastmod, so they invalidate the
+'notes' cache namespace too.
+
+Approving and unapproving comments moves approved_comment_count in
+BlogComment.save() and BlogCommentQuerySet.set_approved(); deleting one is
+handled here, since queryset and cascade deletes never call delete().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+from forge.cache import invalidate
+
+from .models import BlogComment, BlogPost, BlogPostTag, Tag
+
+
+def _touch_published(post_ids):
+    """Bump updated_at on the published posts among post_ids and return how many there were."""
+    touched = BlogPost.objects.filter(pk__in=post_ids, is_published=True).update(updated_at=timezone.now())
+    if touched:
+        invalidate('notes')
+    return touched
+
+
+def link_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and _touch_published([instance.post_id]):
+        Tag.objects.adjust_post_counts([instance.tag_id], 1)
+
+
+def link_deleted(sender, instance, **kwargs):
+    if _touch_published([instance.post_id]):
+        Tag.objects.adjust_post_counts([instance.tag_id], -1)
+
+
+def links_added(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # tag.posts.add(*posts)
+        published = _touch_published(pk_set)
+        if published:
+            Tag.objects.adjust_post_counts([instance.pk], published)
+    elif _touch_published([instance.pk]):
+        # post.tags.add(*tags)
+        Tag.objects.adjust_post_counts(pk_set, 1)
+
+
+def comment_deleted(sender, instance, **kwargs):
+    # Covers queryset deletes and posts deleted with their comments
+    if instance.is_approved:
+        BlogPost.objects.adjust_comment_counts({instance.post_id: -1})
+
+
+def connect():
+    post_save.connect(link_saved, sender=BlogPostTag, dispatch_uid='notes.tag_link_saved')
+    post_delete.connect(link_deleted, sender=BlogPostTag, dispatch_uid='notes.tag_link_deleted')
+    m2m_changed.connect(links_added, sender=BlogPost.tags.through, dispatch_uid='notes.tag_links_added')
+    post_delete.connect(comment_deleted, sender=BlogComment, dispatch_uid='notes.comment_deleted')
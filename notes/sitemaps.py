@@ -0,0 +1,12 @@
+from forge.sitemaps import ModelSitemap
+from .models import BlogPost
+
+
+class BlogPostSitemap(ModelSitemap):
+    namespace = 'notes'
+    # Oldest first, so new posts land in the last shard
+    queryset = (
+        BlogPost.objects.filter(is_published=True, published_date__isnull=False)
+        .only('id', 'updated_at')
+        .order_by('published_date', 'id')
+    )
@@ -1,3 +1,395 @@
-from django.test import TestCase
+import unittest
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from forge.pagination import CursorPaginator
+from forge.testing import MigrationTestCase
+from .models import BlogComment, BlogPost, BlogPostTag, Tag
+from .search import search_posts
+from .spam import is_spam, score_comment
+from .text import make_excerpt, read_time_minutes
+
+
+def create_post(title, **kwargs):
+    kwargs.setdefault('is_published', True)
+    kwargs.setdefault('content', 'Body text')
+    return BlogPost.objects.create(title=title, slug=title.lower().replace(' ', '-'), **kwargs)
+
+
+class BlogSearchTests(TestCase):
+    def setUp(self):
+        self.kubernetes = create_post('Scaling Kubernetes', content='Clusters and pods')
+        self.security = create_post('Enterprise Security', content='Firewalls and kubernetes network policy')
+        create_post('Draft about kubernetes', is_published=False)
+
+    def test_search_matches_published_posts_only(self):
+        results = search_posts('kubernetes')
+        self.assertEqual({post.pk for post in results}, {self.kubernetes.pk, self.security.pk})
+
+    def test_blank_query_matches_nothing(self):
+        self.assertFalse(search_posts('   ').exists())
+
+    def test_list_view_filters_by_query(self):
+        response = self.client.get(reverse('notes:list'), {'q': 'firewalls'})
+        self.assertEqual([post.pk for post in response.context['posts']], [self.security.pk])
+
+    def test_api_pages_search_results_by_cursor(self):
+        response = self.client.get(reverse('notes:api_posts'), {'q': 'kubernetes'})
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNone(response.json()['next'])
+        self.assertEqual(self.client.get(reverse('notes:api_posts'), {'cursor': 'bogus'}).status_code, 400)
+
+    def test_search_results_page_by_rank_without_gaps(self):
+        extra = {create_post(f'Kubernetes {n}', content='kubernetes ' * n).pk for n in range(1, 4)}
+        paginator = CursorPaginator(search_posts('kubernetes'), ('-rank', '-id'), per_page=2)
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen.extend(post.pk for post in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sorted(seen), sorted(extra | {self.kubernetes.pk, self.security.pk}))
+        # Going back from the last page returns the rows before it
+        previous = paginator.page(page.previous_cursor)
+        self.assertEqual([post.pk for post in previous], seen[-3:-1])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Needs the PostgreSQL search trigger')
+    def test_title_matches_rank_above_body_matches(self):
+        self.assertEqual(list(search_posts('kubernetes'))[0], self.kubernetes)
+        self.security.title = 'Kubernetes Security'
+        self.security.save()
+        self.security.refresh_from_db()
+        self.assertIsNotNone(self.security.search_vector)
+
+
+class TagCountTests(TestCase):
+    def setUp(self):
+        self.django = Tag.objects.create(name='Django', slug='django')
+        self.cloud = Tag.objects.create(name='Cloud', slug='cloud')
+        self.post = create_post('Tagged Post')
+
+    def counts(self):
+        return dict(Tag.objects.values_list('slug', 'post_count'))
+
+    def test_blank_slug_is_generated_without_collisions(self):
+        slugs = [Tag.objects.create(name=name).slug for name in ['C', 'C++', 'C#', 'Go lang', 'go-lang']]
+        self.assertEqual(slugs, ['c', 'c-plus-plus', 'c-sharp', 'go-lang', 'go-lang-2'])
+
+    def test_counts_follow_links_and_publishing(self):
+        self.post.tags.add(self.django, self.cloud)
+        BlogPostTag.objects.create(post=create_post('Second Post'), tag=self.django)
+        self.assertEqual(self.counts(), {'django': 2, 'cloud': 1})
+
+        self.post.is_published = False
+        self.post.save()
+        self.assertEqual(self.counts(), {'django': 1, 'cloud': 0})
+
+        self.post.is_published = True
+        self.post.save()
+        self.post.tags.remove(self.cloud)
+        self.assertEqual(self.counts(), {'django': 2, 'cloud': 0})
+
+        self.post.delete()
+        self.assertEqual(self.counts(), {'django': 1, 'cloud': 0})
+
+    def test_drafts_are_not_counted(self):
+        create_post('Draft Post', is_published=False).tags.add(self.django)
+        self.django.posts.add(create_post('Another Draft', is_published=False), self.post)
+        self.assertEqual(self.counts(), {'django': 1, 'cloud': 0})
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.post.tags.add(self.django)
+        Tag.objects.update(post_count=0)
+        Tag.objects.rebuild_post_counts()
+        self.assertEqual(self.counts(), {'django': 1, 'cloud': 0})
+
+    def test_list_view_filters_by_tag(self):
+        self.post.tags.add(self.cloud)
+        create_post('Untagged Post')
+        response = self.client.get(reverse('notes:list'), {'tag': 'cloud'})
+        self.assertEqual([post.pk for post in response.context['posts']], [self.post.pk])
+        self.assertEqual(list(response.context['tag_cloud']), [self.cloud])
+
+
+class TagsMigrationTests(MigrationTestCase):
+    migrate_from = ('notes', '0004_blogpost_search_vector')
+    migrate_to = ('notes', '0005_tags')
+
+    def setUpBeforeMigration(self, apps):
+        author = apps.get_model('auth', 'User').objects.create(username='author')
+        BlogPost = apps.get_model('notes', 'BlogPost')
+        for title, tags, is_published in [('Dotnet', 'C#, F#', True), ('Notes', ' C# ,  Python', False)]:
+            BlogPost.objects.create(
+                title=title, slug=title.lower(), author=author, content='Body',
+                is_published=is_published, tags=tags,
+            )
+
+    def test_sharp_tags_keep_their_own_slugs_and_counts(self):
+        tags = self.apps.get_model('notes', 'Tag').objects.order_by('slug')
+        self.assertEqual(
+            list(tags.values_list('name', 'slug', 'post_count')),
+            [('C#', 'c-sharp', 1), ('F#', 'f-sharp', 1), ('Python', 'python', 0)],
+        )
+
+
+class RenderedContentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = create_post('Rendered Post', content='# Heading\n\n<script>alert(1)</script>\n\n```python\nprint(1)\n```')
+
+    def test_save_stores_sanitized_html(self):
+        self.assertIn('<h1 id="heading">Heading</h1>', self.post.content_html)
+        self.assertIn('class="highlight"', self.post.content_html)
+        self.assertNotIn('<script>', self.post.content_html)
+        self.assertEqual(len(self.post.content_hash), 64)
+
+    def test_unchanged_content_is_not_rerendered(self):
+        self.post.content_html = 'kept'
+        self.post.save()
+        self.assertEqual(self.post.content_html, 'kept')
+
+    def test_stale_render_is_refreshed_on_view(self):
+        BlogPost.objects.filter(pk=self.post.pk).update(content_html='', content_hash='')
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, '<h1 id="heading">Heading</h1>', html=True)
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.content_hash)
+
+    def test_body_fragment_is_cached(self):
+        self.client.get(self.post.get_absolute_url())
+        with self.assertNumQueries(4):
+            # The two conditional GET aggregates, the post and a page of
+            # comments; the tags are inside the cached fragment
+            response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, 'class="highlight"')
+
+
+class DerivedMetadataTests(TestCase):
+    def test_save_derives_read_time_and_excerpt(self):
+        post = create_post('Long Post', content='# Title\n\n' + 'word ' * 450)
+        self.assertEqual(post.read_time_minutes, 3)
+        self.assertTrue(post.excerpt.startswith('word word'))
+        self.assertLessEqual(len(post.excerpt), 300)
+
+    def test_written_excerpt_is_kept(self):
+        post = create_post('Manual Post', content='Body text', excerpt='Hand written', auto_excerpt=False)
+        self.assertEqual(post.excerpt, 'Hand written')
+
+    def test_excerpt_skips_markup_and_code(self):
+        text = '## Intro\n\nUse **bold** and [links](https://example.com).\n\n```\ncode here\n```\n\n- done'
+        self.assertEqual(make_excerpt(text), 'Use bold and links. done')
+        self.assertEqual(make_excerpt('one two three', max_length=9), 'one two…')
+        self.assertEqual(read_time_minutes(''), 1)
+
+    def test_recompute_command_updates_stale_rows(self):
+        post = create_post('Stale Post', content='word ' * 450)
+        BlogPost.objects.filter(pk=post.pk).update(read_time_minutes=5, excerpt='')
+        call_command('recompute_post_metadata', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.read_time_minutes, 3)
+        self.assertTrue(post.excerpt)
+
+
+class ConditionalDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = create_post('Conditional Requests')
+        self.url = reverse('notes:detail', args=[self.post.id])
+
+    def test_matching_etag_skips_rendering(self):
+        etag = self.client.get(self.url)['ETag']
+        # Just the two aggregate queries: no post, comment or tag lookups
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_approving_a_comment_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        comment = BlogComment.objects.create(
+            post=self.post, author_name='Ada', author_email='ada@example.com', content='Nice',
+        )
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        comment.is_approved = True
+        comment.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Nice')
+
+    def test_login_changes_etag_so_the_comment_form_keeps_working(self):
+        client = Client(enforce_csrf_checks=True)
+        etag = client.get(self.url)['ETag']
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        User.objects.create_user('editor', password='x', is_staff=True)
+        login_url = reverse('admin:login')
+        token = client.get(login_url).context['csrf_token']
+        response = client.post(login_url, {'username': 'editor', 'password': 'x', 'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 302)
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        # login rotated the CSRF secret, so the page is rendered again with a fresh token
+        self.assertEqual(response.status_code, 200)
+        response = client.post(reverse('notes:comment_create', args=[self.post.id]), {
+            'author_name': 'Ada', 'author_email': 'ada@example.com', 'content': 'Thanks',
+            'csrfmiddlewaretoken': response.context['csrf_token'],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(BlogComment.objects.filter(content='Thanks').exists())
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+
+class FeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        create_post('Feed Post', content='First paragraph of the post.')
+        create_post('Unpublished Post', is_published=False)
+
+    def test_feeds_list_published_posts(self):
+        for name in ('notes:feed_rss', 'notes:feed_atom'):
+            response = self.client.get(reverse(name))
+            self.assertContains(response, 'Feed Post')
+            self.assertContains(response, 'First paragraph of the post.')
+            self.assertNotContains(response, 'Unpublished Post')
+
+    def test_publishing_refreshes_cached_feed(self):
+        self.client.get(reverse('notes:feed_rss'))
+        create_post('Second Post')
+        self.assertContains(self.client.get(reverse('notes:feed_rss')), 'Second Post')
+
+
+class CommentModerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = create_post('Moderated Post')
+        self.admin = User.objects.create_superuser('moderator', 'moderator@example.com', 'password')
+
+    def add_comments(self, count, **kwargs):
+        BlogComment.objects.bulk_create([
+            BlogComment(post=self.post, author_name='Reader', author_email='reader@example.com',
+                        content=f'Comment {number}', **kwargs)
+            for number in range(count)
+        ])
+
+    def test_spam_scoring(self):
+        self.assertFalse(is_spam(score_comment('Thanks, the pooling section helped a lot.', 'Ada')))
+        self.assertTrue(is_spam(score_comment(
+            'CHEAP VIAGRA https://spam.example/a https://spam.example/b', 'casino bonus',
+        )))
+        self.assertTrue(is_spam(score_comment('<a href="https://spam.example">click</a>', 'x')))
+
+    def test_submitted_comment_is_scored_and_held(self):
+        response = self.client.post(reverse('notes:comment_create', args=[self.post.id]), {
+            'author_name': 'Spammer', 'author_email': 'spam@example.com',
+            'content': 'Cheap viagra casino loans https://spam.example',
+        })
+        self.assertRedirects(response, f'{self.post.get_absolute_url()}?comment=pending#comment-form',
+                             fetch_redirect_response=False)
+        comment = BlogComment.objects.get(post=self.post)
+        self.assertFalse(comment.is_approved)
+        self.assertTrue(is_spam(comment.spam_score))
+
+    def test_invalid_comment_is_rejected(self):
+        response = self.client.post(reverse('notes:comment_create', args=[self.post.id]), {'author_name': 'Ada'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BlogComment.objects.exists())
+
+    def test_bulk_actions_update_selection(self):
+        self.add_comments(3)
+        ids = [str(pk) for pk in BlogComment.objects.values_list('pk', flat=True)]
+        self.client.force_login(self.admin)
+        url = reverse('admin:notes_blogcomment_changelist')
+        self.client.post(url, {'action': 'approve_comments', '_selected_action': ids[:2]})
+        self.assertEqual(BlogComment.objects.filter(is_approved=True).count(), 2)
+        self.client.post(url, {'action': 'reject_comments', '_selected_action': ids})
+        self.assertEqual(BlogComment.objects.filter(is_approved=False, spam_score=1.0).count(), 3)
+
+    def test_queue_leaves_out_likely_spam_by_default(self):
+        self.add_comments(2)
+        self.add_comments(1, spam_score=0.9)
+        self.client.force_login(self.admin)
+        url = reverse('admin:notes_blogcomment_changelist')
+        counts = {
+            value: self.client.get(url, {'spam': value} if value else {}).context['cl'].result_count
+            for value in (None, 'no', 'yes', 'all')
+        }
+        self.assertEqual(counts, {None: 2, 'no': 2, 'yes': 1, 'all': 3})
+
+    def test_change_form_queries_do_not_grow_with_comments(self):
+        self.client.force_login(self.admin)
+        url = reverse('admin:notes_blogpost_change', args=[self.post.id])
+        self.add_comments(3)
+        self.client.get(url)  # warm the content type cache
+        with self.assertNumQueries(7):
+            self.client.get(url)
+        self.add_comments(100)
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        self.assertContains(response, '103 comments, page 1 of 5')
+
+
+class CommentCountTests(TestCase):
+    def setUp(self):
+        self.post = create_post('Counted Post')
+        self.other = create_post('Other Post')
+
+    def comment(self, post=None, **kwargs):
+        return BlogComment.objects.create(
+            post=post or self.post, author_name='Reader', author_email='reader@example.com',
+            content='Comment', **kwargs,
+        )
+
+    def count(self, post=None):
+        return BlogPost.objects.values_list('approved_comment_count', flat=True).get(pk=(post or self.post).pk)
+
+    def test_save_and_delete_move_the_count(self):
+        comment = self.comment()
+        self.assertEqual(self.count(), 0)
+        comment.is_approved = True
+        comment.save()
+        self.comment(is_approved=True)
+        self.assertEqual(self.count(), 2)
+        comment.is_approved = False
+        comment.save(update_fields=['is_approved'])
+        self.assertEqual(self.count(), 1)
+        BlogComment.objects.filter(post=self.post).delete()
+        self.assertEqual(self.count(), 0)
+
+    def test_set_approved_counts_only_changed_comments(self):
+        self.comment(is_approved=True)
+        self.comment()
+        self.comment()
+        self.comment(post=self.other)
+        BlogComment.objects.all().set_approved(True)
+        self.assertEqual((self.count(), self.count(self.other)), (3, 1))
+        BlogComment.objects.filter(post=self.post).set_approved(False)
+        self.assertEqual((self.count(), self.count(self.other)), (0, 1))
+
+    def test_saving_a_stale_post_keeps_the_count(self):
+        stale = BlogPost.objects.get(pk=self.post.pk)
+        self.comment(is_approved=True)
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.count(), 1)
+
+    def test_reconcile_fixes_drift(self):
+        self.comment(is_approved=True)
+        BlogPost.objects.filter(pk=self.other.pk).update(approved_comment_count=7)
+        out = StringIO()
+        call_command('reconcile_comment_counts', '--batch-size', '1', stdout=out)
+        self.assertIn('fixed 1', out.getvalue())
+        self.assertEqual((self.count(), self.count(self.other)), (1, 0))
+
+    def test_list_shows_counts_without_counting(self):
+        self.comment(is_approved=True)
+        with self.assertNumQueries(3):
+            # Posts, their tags and the tag cloud; no COUNT over comments
+            response = self.client.get(reverse('notes:list'))
+        self.assertContains(response, '1 comment')
@@ -0,0 +1,62 @@
+"""
+Plain-text metadata derived from a post's Markdown source.
+
+Both helpers walk the source with re.finditer, so no split() list or
+stripped copy of the whole text is built, and make_excerpt() stops reading
+as soon as the excerpt is full.
+"""
+import math
+import re
+
+WORDS_PER_MINUTE = 200
+
+WORD_RE = re.compile(r"\w[\w'’-]*")
+# A code fence line, a heading line, or a whitespace-separated token
+TOKEN_RE = re.compile(
+    r'^[ \t]*(?P<fence>```|~~~)[^\n]*$|^[ \t]*(?P<heading>#{1,6})[ \t][^\n]*$|\S+',
+    re.MULTILINE,
+)
+# Markdown decoration around a word: emphasis, quotes, tables, links
+MARKUP_CHARS = '*_>`~|[]()!'
+INLINE_MARKUP_RE = re.compile(r'[*`]|~~')
+LIST_MARKER_RE = re.compile(r'^(?:[-+*]|\d+[.)])$')
+LINK_TARGET_RE = re.compile(r'\]\([^)]*\)')
+
+
+def word_count(text):
+    """Count words in text without building a list of them."""
+    return sum(1 for _ in WORD_RE.finditer(text))
+
+
+def read_time_minutes(text, words_per_minute=WORDS_PER_MINUTE):
+    """Estimated reading time, rounded up, at least one minute."""
+    return max(1, math.ceil(word_count(text) / words_per_minute))
+
+
+def make_excerpt(text, max_length=300):
+    """
+    Return the leading prose of a Markdown document, at most max_length
+    characters, cut at a word boundary with an ellipsis. Headings, code
+    blocks, list markers and link targets are skipped.
+    """
+    words = []
+    length = 0
+    in_code = False
+    for match in TOKEN_RE.finditer(text):
+        if match.group('fence'):
+            in_code = not in_code
+            continue
+        token = match.group()
+        if in_code or match.group('heading') or LIST_MARKER_RE.match(token):
+            continue
+        word = INLINE_MARKUP_RE.sub('', LINK_TARGET_RE.sub('', token)).strip(MARKUP_CHARS)
+        if not word:
+            continue
+        added = len(word) + (1 if words else 0)
+        if length + added > max_length - 1:
+            if not words:
+                return word[:max_length - 1] + '…'
+            return ' '.join(words).rstrip('.,;:') + '…'
+        words.append(word)
+        length += added
+    return ' '.join(words)
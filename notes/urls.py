@@ -6,4 +6,9 @@ app_name = 'notes'
 urlpatterns = [
     path('', views.note_list, name='list'),
     path('<uuid:note_id>/', views.note_detail, name='detail'),
+    path('<uuid:note_id>/comments/', views.comment_create, name='comment_create'),
+    path('feed/', views.feed_rss, name='feed_rss'),
+    path('feed/atom/', views.feed_atom, name='feed_atom'),
+    path('api/posts/', views.api_posts, name='api_posts'),
+    path('api/posts/<uuid:note_id>/comments/', views.api_comments, name='api_comments'),
 ]
@@ -1,11 +1,178 @@
-from django.shortcuts import render
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
+from forge.conditional import conditional_on, csrf_secret
+from forge.pagination import CursorPaginator, InvalidCursor
+from forge.responses import cached_response
+from .feeds import LatestPostsAtomFeed, LatestPostsFeed
+from .forms import CommentForm
+from .models import BlogComment, BlogPost, Tag
+from .search import search_posts
+from .spam import score_comment
+
+POSTS_PER_PAGE = 20
+COMMENTS_PER_PAGE = 50
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+def _post_page(request):
+    """
+    Return (page, query, tag) for the published posts selected by ?q= and
+    ?tag=. Search results are paged by rank, everything else by date.
+    Raises Http404 for an unknown tag and InvalidCursor for a bad ?cursor=.
+    """
+    query = request.GET.get('q', '').strip()
+    tag_slug = request.GET.get('tag', '').strip()
+    posts = BlogPost.objects.filter(is_published=True, published_date__isnull=False)
+    tag = None
+    if tag_slug:
+        tag = get_object_or_404(Tag, slug=tag_slug)
+        posts = posts.filter(post_tags__tag=tag)
+    ordering = ('-published_date', '-id')
+    if query:
+        posts = search_posts(query, posts)
+        ordering = ('-rank', '-id')
+    posts = posts.select_related('author').prefetch_related('tags').defer('content', 'search_vector')
+    page = CursorPaginator(posts, ordering, per_page=POSTS_PER_PAGE).page(request.GET.get('cursor'))
+    return page, query, tag
+
+
+def _comment_page(request, post):
+    comments = post.comments.filter(is_approved=True).defer('author_email')
+    return CursorPaginator(comments, ('created_at', 'id'), per_page=COMMENTS_PER_PAGE).page(
+        request.GET.get('cursor')
+    )
 
 
 def note_list(request):
-    """List all blog posts/notes"""
-    return render(request, 'notes/list.html')
+    """List published blog posts, filtered by ?q= full-text search and ?tag= slug"""
+    try:
+        page, query, tag = _post_page(request)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+    return render(request, 'notes/list.html', {
+        'posts': page,
+        'next_url': _page_url(request, page.next_cursor),
+        'previous_url': _page_url(request, page.previous_cursor),
+        'query': query,
+        'tag': tag,
+        'tag_cloud': Tag.objects.cloud(),
+    })
 
 
+@conditional_on(
+    lambda request, note_id: BlogPost.objects.filter(id=note_id, is_published=True),
+    lambda request, note_id: BlogComment.objects.filter(post_id=note_id, is_approved=True),
+    # The comment form's CSRF token must match the visitor's current secret
+    vary=csrf_secret,
+)
 def note_detail(request, note_id):
-    """Blog post/note detail view"""
-    return render(request, 'notes/detail.html', {'note_id': note_id})
+    """Blog post/note detail view with its approved comments, paged by ?cursor="""
+    return _render_detail(request, _published_post(note_id), CommentForm())
+
+
+@require_POST
+def comment_create(request, note_id):
+    """Accept a comment for moderation, scoring it for spam first"""
+    post = _published_post(note_id)
+    form = CommentForm(request.POST)
+    if not form.is_valid():
+        return _render_detail(request, post, form, status=400)
+    comment = form.save(commit=False)
+    comment.post = post
+    comment.spam_score = score_comment(comment.content, comment.author_name, comment.author_email)
+    comment.save()
+    return redirect(f'{post.get_absolute_url()}?comment=pending#comment-form')
+
+
+def _published_post(note_id):
+    post = get_object_or_404(
+        BlogPost.objects.select_related('author').defer('search_vector'),
+        id=note_id, is_published=True,
+    )
+    # Posts saved before a renderer change are refreshed on first view;
+    # rerender_posts does the same in bulk
+    if post.render():
+        post.save(update_fields=['content_html', 'content_hash'])
+    return post
+
+
+def _render_detail(request, post, form, status=200):
+    try:
+        comments = _comment_page(request, post)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+    return render(request, 'notes/detail.html', {
+        'post': post,
+        'comments': comments,
+        'next_url': _page_url(request, comments.next_cursor),
+        'previous_url': _page_url(request, comments.previous_cursor),
+        'form': form,
+        'comment_pending': request.GET.get('comment') == 'pending',
+    }, status=status)
+
+
+def api_posts(request):
+    """JSON list of published posts; accepts ?q=, ?tag= and ?cursor="""
+    try:
+        page, _, _ = _post_page(request)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    return JsonResponse({
+        'results': [
+            {
+                'id': str(post.id),
+                'title': post.title,
+                'slug': post.slug,
+                'excerpt': post.excerpt,
+                'author': post.author.get_username() if post.author else None,
+                'published_date': post.published_date,
+                'read_time_minutes': post.read_time_minutes,
+                'comment_count': post.approved_comment_count,
+                'tags': [tag.slug for tag in post.tags.all()],
+                'url': request.build_absolute_uri(post.get_absolute_url()),
+            }
+            for post in page
+        ],
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    })
+
+
+def api_comments(request, note_id):
+    """JSON list of a published post's approved comments, oldest first; accepts ?cursor="""
+    post = get_object_or_404(BlogPost.objects.only('id'), id=note_id, is_published=True)
+    try:
+        page = _comment_page(request, post)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    return JsonResponse({
+        'results': [
+            {
+                'id': str(comment.id),
+                'author_name': comment.author_name,
+                'content': comment.content,
+                'created_at': comment.created_at,
+            }
+            for comment in page
+        ],
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    })
+
+
+def feed_rss(request):
+    """RSS 2.0 feed of the latest posts"""
+    return cached_response(request, LatestPostsFeed(), ['notes'], 'feed', 'rss')
+
+
+def feed_atom(request):
+    """Atom feed of the latest posts"""
+    return cached_response(request, LatestPostsAtomFeed(), ['notes'], 'feed', 'atom')
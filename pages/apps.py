@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class PagesConfig(AppConfig):
     name = 'pages'
+
+    def ready(self):
+        from forge.cache import invalidate_on_change
+        from .models import Page
+        invalidate_on_change(Page, 'pages')
@@ -1,4 +1,5 @@
 from django.db import models
+from django.urls import reverse
 from forge.models import BaseModel
 
 
@@ -15,6 +16,16 @@ class Page(BaseModel):
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return reverse('pages:detail', args=[self.slug])
+
     class Meta:
         ordering = ['title']
+        indexes = [
+            models.Index(
+                fields=['title'],
+                condition=models.Q(is_published=True),
+                name='page_published_title_idx',
+            ),
+        ]
 
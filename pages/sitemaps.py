@@ -0,0 +1,15 @@
+from forge.sitemaps import ModelSitemap, StaticViewSitemap
+from .models import Page
+
+
+class StaticPagesSitemap(StaticViewSitemap):
+    namespace = 'pages'
+    url_names = [
+        'pages:home', 'pages:about', 'pages:contact', 'services:list',
+        'hosting:list', 'pricing:index', 'portfolio:list', 'notes:list',
+    ]
+
+
+class PageSitemap(ModelSitemap):
+    namespace = 'pages'
+    queryset = Page.objects.filter(is_published=True).only('slug', 'updated_at').order_by('slug')
@@ -1,4 +1,6 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
+from forge.conditional import conditional_on
+from .models import Page
 
 
 def home(request):
@@ -14,3 +16,10 @@ def about(request):
 def contact(request):
     """Contact page view"""
     return render(request, 'pages/contact.html')
+
+
+@conditional_on(lambda request, slug: Page.objects.filter(slug=slug, is_published=True), namespace='pages')
+def page_detail(request, slug):
+    """Published content page view"""
+    page = get_object_or_404(Page, slug=slug, is_published=True)
+    return render(request, 'pages/detail.html', {'page': page})
@@ -1,5 +1,19 @@
 from django.contrib import admin
-from .models import PortfolioItem
+from .models import PortfolioItem, PortfolioItemTechnology, Technology
+
+
+class PortfolioItemTechnologyInline(admin.TabularInline):
+    model = PortfolioItemTechnology
+    extra = 1
+    autocomplete_fields = ['technology']
+    fields = ['technology']
+
+
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug']
+    search_fields = ['name', 'slug']
+    readonly_fields = ['id', 'created_at', 'updated_at']
 
 
 @admin.register(PortfolioItem)
@@ -10,4 +24,5 @@ class PortfolioItemAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ['id', 'created_at', 'updated_at']
     date_hierarchy = 'project_date'
+    inlines = [PortfolioItemTechnologyInline]
 
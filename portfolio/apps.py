@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class PortfolioConfig(AppConfig):
     name = 'portfolio'
+
+    def ready(self):
+        from forge.cache import invalidate_on_change
+        from .models import PortfolioItem, PortfolioItemTechnology, Technology
+        invalidate_on_change(PortfolioItem, 'portfolio')
+        invalidate_on_change(Technology, 'portfolio')
+        invalidate_on_change(PortfolioItemTechnology, 'portfolio')
@@ -0,0 +1,137 @@
+"""
+Faceted filtering for published portfolio items.
+
+A PortfolioFilter holds at most one value for each facet (technology slug,
+client name, project year, featured) and narrows the published items to
+those matching all of them. facet_counts() then reports, for every value of
+every facet, how many items would match if that facet's value were changed
+and the others kept, so the page can offer every useful next click.
+
+The counts come from a single UNION ALL query. It has one grouped branch per
+facet, and each branch applies every filter except its own. A rendered result
+is cached under the 'portfolio' namespace, keyed by the filter's signature
+(its canonical query string).
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import Cast, ExtractYear
+
+from .models import PortfolioItem
+
+FACETS = ('technology', 'client', 'year', 'featured')
+
+
+class PortfolioFilter:
+    """Facet values selected by a request's query string; invalid values are ignored."""
+
+    def __init__(self, technology=None, client=None, year=None, featured=False):
+        self.technology = technology or None
+        self.client = client or None
+        self.year = year
+        self.featured = featured
+
+    @classmethod
+    def from_query(cls, params):
+        year = params.get('year', '').strip()
+        return cls(
+            technology=params.get('technology', '').strip(),
+            client=params.get('client', '').strip(),
+            year=int(year) if year.isdigit() and len(year) == 4 else None,
+            featured=params.get('featured') in ('1', 'true'),
+        )
+
+    def as_params(self):
+        """The selected values as query parameters, in a fixed order."""
+        params = {
+            'technology': self.technology,
+            'client': self.client,
+            'year': self.year,
+            'featured': '1' if self.featured else None,
+        }
+        return {name: value for name, value in params.items() if value is not None}
+
+    @property
+    def signature(self):
+        """Canonical query string; equal filters have equal signatures."""
+        return urlencode(self.as_params())
+
+    @property
+    def cache_key(self):
+        """Short, cache-safe form of the signature."""
+        return hashlib.sha256(self.signature.encode()).hexdigest()[:32]
+
+    def q(self, exclude=None):
+        """Q for the selected facets, leaving out the facet named exclude."""
+        condition = Q(is_published=True)
+        if self.technology and exclude != 'technology':
+            condition &= Q(technologies__slug=self.technology)
+        if self.client and exclude != 'client':
+            condition &= Q(client_name=self.client)
+        if self.year and exclude != 'year':
+            condition &= Q(project_date__year=self.year)
+        if self.featured and exclude != 'featured':
+            condition &= Q(is_featured=True)
+        return condition
+
+    def items(self):
+        """Published items matching every selected facet, in the default order."""
+        return PortfolioItem.objects.filter(self.q()).prefetch_related('technologies')
+
+
+def _branch(portfolio_filter, facet, value, label, condition=Q()):
+    """One grouped branch of the facet query: (facet, value, label, count) rows."""
+    return (
+        PortfolioItem.objects.filter(portfolio_filter.q(exclude=facet), condition)
+        .annotate(facet=Value(facet), value=value, label=label)
+        .values('facet', 'value', 'label')
+        .annotate(count=Count('pk', distinct=True))
+        .order_by()
+    )
+
+
+def _facet_rows(portfolio_filter):
+    """UNION ALL of one grouped branch per facet."""
+    year = Cast(ExtractYear('project_date'), CharField())
+    featured = Case(When(is_featured=True, then=Value('1')), default=Value('0'))
+    branches = [
+        _branch(portfolio_filter, 'technology', F('technologies__slug'), F('technologies__name'),
+                Q(technologies__isnull=False)),
+        _branch(portfolio_filter, 'client', F('client_name'), F('client_name'), ~Q(client_name='')),
+        _branch(portfolio_filter, 'year', year, year, Q(project_date__isnull=False)),
+        _branch(portfolio_filter, 'featured', featured,
+                Case(When(is_featured=True, then=Value('Featured')), default=Value('Other'))),
+    ]
+    return branches[0].union(*branches[1:], all=True)
+
+
+def _group(portfolio_filter, rows):
+    selected = {name: str(value) for name, value in portfolio_filter.as_params().items()}
+    facets = {name: [] for name in FACETS}
+    for row in rows:
+        facets[row['facet']].append({
+            'value': row['value'],
+            'label': row['label'],
+            'count': row['count'],
+            'selected': selected.get(row['facet']) == row['value'],
+        })
+    for name, values in facets.items():
+        if name == 'year':
+            values.sort(key=lambda entry: entry['value'], reverse=True)
+        else:
+            values.sort(key=lambda entry: (-entry['count'], entry['label']))
+    return facets
+
+
+def facet_counts(portfolio_filter):
+    """
+    Return {facet: [{'value', 'label', 'count', 'selected'}, ...]} for every
+    facet, most common values first (years newest first), in one query.
+    """
+    return _group(portfolio_filter, _facet_rows(portfolio_filter))
+
+
+async def afacet_counts(portfolio_filter):
+    """Async variant of facet_counts()."""
+    return _group(portfolio_filter, [row async for row in _facet_rows(portfolio_filter)])
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:08
+
+import forge.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='portfolioitem',
+            name='id',
+            field=models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False),
+        ),
+    ]
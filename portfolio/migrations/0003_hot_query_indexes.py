@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0002_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='portfolioitem',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-is_featured', '-project_date', 'title'], name='portfolio_published_order_idx'),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:44
+
+import django.db.models.deletion
+import forge.ids
+from django.db import migrations, models
+from forge.slugs import name_key, normalize_name, unique_slug
+
+
+def split_technologies(apps, schema_editor):
+    """Turn each item's comma-separated technologies into Technology/PortfolioItemTechnology rows."""
+    PortfolioItem = apps.get_model('portfolio', 'PortfolioItem')
+    Technology = apps.get_model('portfolio', 'Technology')
+    PortfolioItemTechnology = apps.get_model('portfolio', 'PortfolioItemTechnology')
+
+    technologies = {}
+    slugs = set()
+    links = []
+    items = PortfolioItem.objects.exclude(technologies_used='').values_list('pk', 'technologies_used')
+    for item_id, names in items.iterator(chunk_size=2000):
+        seen = set()
+        for name in names.split(','):
+            name = normalize_name(name, 100)
+            key = name_key(name)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            # Names differing only in case or spacing are one technology; the first spelling wins
+            if key not in technologies:
+                slug = unique_slug(name, 120, slugs.__contains__)
+                slugs.add(slug)
+                technologies[key] = Technology(name=name, slug=slug)
+            links.append(PortfolioItemTechnology(item_id=item_id, technology=technologies[key]))
+
+    Technology.objects.bulk_create(technologies.values(), batch_size=1000)
+    PortfolioItemTechnology.objects.bulk_create(links, batch_size=1000)
+
+
+def join_technologies(apps, schema_editor):
+    """Write technology names back into the comma-separated field."""
+    PortfolioItem = apps.get_model('portfolio', 'PortfolioItem')
+    PortfolioItemTechnology = apps.get_model('portfolio', 'PortfolioItemTechnology')
+
+    names = {}
+    links = PortfolioItemTechnology.objects.order_by('created_at').values_list('item_id', 'technology__name')
+    for item_id, name in links:
+        names.setdefault(item_id, []).append(name)
+    items = list(PortfolioItem.objects.filter(pk__in=names).only('pk'))
+    for item in items:
+        item.technologies_used = ', '.join(names[item.pk])
+    PortfolioItem.objects.bulk_update(items, ['technologies_used'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('slug', models.SlugField(max_length=120, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Technologies',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PortfolioItemTechnology',
+            fields=[
+                ('id', models.UUIDField(default=forge.ids.uuid7, editable=False, help_text='Unique identifier for this record', primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Timestamp when the record was last updated')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_technologies', to='portfolio.portfolioitem')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_technologies', to='portfolio.technology')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='technologies',
+            field=models.ManyToManyField(blank=True, related_name='items', through='portfolio.PortfolioItemTechnology', to='portfolio.technology'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolioitemtechnology',
+            index=models.Index(fields=['technology', 'item'], name='portfoliotech_tech_item_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='portfolioitemtechnology',
+            constraint=models.UniqueConstraint(fields=('item', 'technology'), name='unique_portfolioitem_technology'),
+        ),
+        migrations.RunPython(split_technologies, join_technologies),
+        migrations.RemoveField(
+            model_name='portfolioitem',
+            name='technologies_used',
+        ),
+    ]
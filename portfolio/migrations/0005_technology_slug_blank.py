@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_technologies'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='technology',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='Generated from the name when left blank', max_length=120, unique=True),
+        ),
+    ]
@@ -1,5 +1,29 @@
 from django.db import models
+from django.urls import reverse
 from forge.models import BaseModel
+from forge.slugs import unique_slug
+
+
+class Technology(BaseModel):
+    """
+    Model for technologies used in portfolio projects.
+    Uses UUID as primary key via BaseModel inheritance.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=120, unique=True, blank=True, help_text="Generated from the name when left blank")
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            others = Technology.objects.exclude(pk=self.pk)
+            self.slug = unique_slug(self.name, 120, lambda slug: others.filter(slug=slug).exists())
+        super().save(*args, **kwargs)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = "Technologies"
 
 
 class PortfolioItem(BaseModel):
@@ -13,7 +37,7 @@ class PortfolioItem(BaseModel):
     short_description = models.CharField(max_length=300)
     client_name = models.CharField(max_length=200, blank=True)
     project_date = models.DateField(null=True, blank=True)
-    technologies_used = models.TextField(help_text="Comma-separated list of technologies")
+    technologies = models.ManyToManyField(Technology, through='PortfolioItemTechnology', related_name='items', blank=True)
     project_url = models.URLField(blank=True)
     image_url = models.URLField(blank=True)
     is_featured = models.BooleanField(default=False)
@@ -22,6 +46,36 @@ class PortfolioItem(BaseModel):
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return reverse('portfolio:detail', args=[self.id])
+
     class Meta:
         ordering = ['-is_featured', '-project_date', 'title']
+        indexes = [
+            models.Index(
+                fields=['-is_featured', '-project_date', 'title'],
+                condition=models.Q(is_published=True),
+                name='portfolio_published_order_idx',
+            ),
+        ]
+
 
+class PortfolioItemTechnology(BaseModel):
+    """
+    Link between a portfolio item and a technology.
+    Uses UUID as primary key via BaseModel inheritance.
+    """
+    item = models.ForeignKey(PortfolioItem, on_delete=models.CASCADE, related_name='item_technologies')
+    technology = models.ForeignKey(Technology, on_delete=models.CASCADE, related_name='item_technologies')
+
+    def __str__(self):
+        return f"{self.item} - {self.technology}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'technology'], name='unique_portfolioitem_technology'),
+        ]
+        indexes = [
+            # Technology filter: items for one technology without touching other links
+            models.Index(fields=['technology', 'item'], name='portfoliotech_tech_item_idx'),
+        ]
@@ -0,0 +1,7 @@
+from forge.sitemaps import ModelSitemap
+from .models import PortfolioItem
+
+
+class PortfolioItemSitemap(ModelSitemap):
+    namespace = 'portfolio'
+    queryset = PortfolioItem.objects.filter(is_published=True).only('id', 'updated_at').order_by('id')
@@ -1,3 +1,103 @@
+import datetime
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from forge.testing import MigrationTestCase
+from .facets import PortfolioFilter, facet_counts
+from .models import PortfolioItem, Technology
+
+
+def create_item(title, **kwargs):
+    kwargs.setdefault('description', 'Description')
+    kwargs.setdefault('short_description', 'Short description')
+    return PortfolioItem.objects.create(title=title, slug=title.lower().replace(' ', '-'), **kwargs)
+
+
+class PortfolioFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.django = Technology.objects.create(name='Django', slug='django')
+        self.postgres = Technology.objects.create(name='PostgreSQL', slug='postgresql')
+        self.erp = create_item('ERP Rollout', client_name='Acme', project_date=datetime.date(2024, 5, 1), is_featured=True)
+        self.portal = create_item('Customer Portal', client_name='Beta', project_date=datetime.date(2023, 2, 1))
+        create_item('Draft Project', client_name='Acme', is_published=False).technologies.add(self.django)
+        self.erp.technologies.add(self.django, self.postgres)
+        self.portal.technologies.add(self.django)
+
+    def counts(self, facets, facet):
+        return {entry['value']: entry['count'] for entry in facets[facet]}
+
+    def test_facet_counts_in_one_query(self):
+        portfolio_filter = PortfolioFilter.from_query({'technology': 'postgresql'})
+        with self.assertNumQueries(1):
+            facets = facet_counts(portfolio_filter)
+        # A facet's own filter is left out of its counts
+        self.assertEqual(self.counts(facets, 'technology'), {'django': 2, 'postgresql': 1})
+        self.assertEqual(self.counts(facets, 'client'), {'Acme': 1})
+        self.assertEqual(self.counts(facets, 'year'), {'2024': 1})
+        self.assertEqual(self.counts(facets, 'featured'), {'1': 1})
+
+    def test_filters_combine(self):
+        portfolio_filter = PortfolioFilter.from_query({'technology': 'django', 'year': '2023', 'featured': ''})
+        self.assertEqual([item.title for item in portfolio_filter.items()], ['Customer Portal'])
+        self.assertEqual(portfolio_filter.signature, 'technology=django&year=2023')
+
+    def test_invalid_values_are_ignored(self):
+        self.assertEqual(PortfolioFilter.from_query({'year': 'soon', 'client': '  '}).signature, '')
+
+    def test_list_is_cached_by_filter_signature(self):
+        url = reverse('portfolio:list')
+        self.client.get(url, {'client': 'Beta'})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'client': 'Beta'})
+        self.assertContains(response, 'Customer Portal')
+        self.assertNotContains(response, 'ERP Rollout')
+
+    def test_linking_a_technology_invalidates_results(self):
+        url = reverse('portfolio:api_items')
+        self.assertEqual(len(self.client.get(url, {'technology': 'postgresql'}).json()['results']), 1)
+        self.portal.technologies.add(self.postgres)
+        self.assertEqual(len(self.client.get(url, {'technology': 'postgresql'}).json()['results']), 2)
+
+
+    def test_renaming_a_technology_changes_the_detail_etag(self):
+        url = reverse('portfolio:detail', args=[self.erp.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.postgres.name = 'Postgres'
+        self.postgres.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Postgres<')
+
+class TechnologySlugTests(TestCase):
+    def test_symbols_are_spelled_out_and_collisions_numbered(self):
+        names = ['C', 'C++', 'C#', 'Node.js', 'NodeJS']
+        slugs = [Technology.objects.create(name=name).slug for name in names]
+        self.assertEqual(slugs, ['c', 'c-plus-plus', 'c-sharp', 'nodejs', 'nodejs-2'])
+
+
+class TechnologiesMigrationTests(MigrationTestCase):
+    migrate_from = ('portfolio', '0003_hot_query_indexes')
+    migrate_to = ('portfolio', '0004_technologies')
+
+    def setUpBeforeMigration(self, apps):
+        PortfolioItem = apps.get_model('portfolio', 'PortfolioItem')
+        for title, technologies in [('Compiler', 'C, C++,  c'), ('Game Engine', 'C#, C++')]:
+            PortfolioItem.objects.create(
+                title=title, slug=title.lower().replace(' ', '-'), description='Description',
+                short_description='Short', technologies_used=technologies,
+            )
 
-# Create your tests here.
+    def test_c_family_languages_become_separate_technologies(self):
+        technologies = self.apps.get_model('portfolio', 'Technology').objects.order_by('slug')
+        self.assertEqual(
+            list(technologies.values_list('name', 'slug')),
+            [('C', 'c'), ('C++', 'c-plus-plus'), ('C#', 'c-sharp')],
+        )
+        links = self.apps.get_model('portfolio', 'PortfolioItemTechnology').objects
+        self.assertEqual(
+            sorted(links.values_list('item__title', 'technology__name')),
+            [('Compiler', 'C'), ('Compiler', 'C++'), ('Game Engine', 'C#'), ('Game Engine', 'C++')],
+        )
@@ -6,4 +6,5 @@ app_name = 'portfolio'
 urlpatterns = [
     path('', views.portfolio_list, name='list'),
     path('<uuid:portfolio_id>/', views.portfolio_detail, name='detail'),
+    path('api/items/', views.api_items, name='api_items'),
 ]
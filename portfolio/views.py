@@ -1,11 +1,93 @@
+from urllib.parse import urlencode
+
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
+from forge.cache import acached
+from forge.conditional import conditional_on
+from .facets import PortfolioFilter, afacet_counts
+from .models import PortfolioItem, PortfolioItemTechnology, Technology
+
+LIST_DEPENDENCIES = (
+    lambda request: PortfolioItem.objects.filter(is_published=True),
+    lambda request: PortfolioItemTechnology.objects.all(),
+    lambda request: Technology.objects.all(),
+)
+
+
+async def _filtered(portfolio_filter):
+    """(items, facets) for a filter, cached by its signature."""
+    async def build():
+        items = [item async for item in portfolio_filter.items()]
+        return items, await afacet_counts(portfolio_filter)
+
+    return await acached('portfolio', build, 'filtered', portfolio_filter.cache_key)
+
+
+def _facet_url(request, portfolio_filter, facet, entry):
+    """URL selecting entry's value for facet, or clearing the facet if it is selected."""
+    params = portfolio_filter.as_params()
+    if entry['selected']:
+        params.pop(facet)
+    else:
+        params[facet] = entry['value']
+    return f'{request.path}?{urlencode(params)}' if params else request.path
+
+
+@conditional_on(*LIST_DEPENDENCIES, namespace='portfolio')
+async def portfolio_list(request):
+    """List published portfolio items; ?technology=, ?client=, ?year= and ?featured=1 filter them"""
+    portfolio_filter = PortfolioFilter.from_query(request.GET)
+    items, facets = await _filtered(portfolio_filter)
+    for facet, entries in facets.items():
+        for entry in entries:
+            entry['url'] = _facet_url(request, portfolio_filter, facet, entry)
+    return render(request, 'portfolio/list.html', {
+        'items': items,
+        'facets': facets,
+        'is_filtered': bool(portfolio_filter.as_params()),
+    })
 
 
-def portfolio_list(request):
-    """List all portfolio items"""
-    return render(request, 'portfolio/list.html')
+@conditional_on(*LIST_DEPENDENCIES, namespace='portfolio')
+async def api_items(request):
+    """JSON list of published portfolio items with facet counts; accepts the list's filters"""
+    portfolio_filter = PortfolioFilter.from_query(request.GET)
+    items, facets = await _filtered(portfolio_filter)
+    return JsonResponse({
+        'filters': portfolio_filter.as_params(),
+        'results': [
+            {
+                'id': str(item.id),
+                'title': item.title,
+                'slug': item.slug,
+                'short_description': item.short_description,
+                'client_name': item.client_name,
+                'project_date': item.project_date,
+                'is_featured': item.is_featured,
+                'technologies': [technology.slug for technology in item.technologies.all()],
+                'url': request.build_absolute_uri(item.get_absolute_url()),
+            }
+            for item in items
+        ],
+        'facets': facets,
+    })
 
 
-def portfolio_detail(request, portfolio_id):
+@conditional_on(
+    lambda request, portfolio_id: PortfolioItem.objects.filter(id=portfolio_id, is_published=True),
+    lambda request, portfolio_id: PortfolioItemTechnology.objects.filter(item_id=portfolio_id),
+    # The page shows each technology's name and links to its slug
+    lambda request, portfolio_id: Technology.objects.filter(items__id=portfolio_id),
+    namespace='portfolio',
+)
+async def portfolio_detail(request, portfolio_id):
     """Portfolio item detail view"""
-    return render(request, 'portfolio/detail.html', {'portfolio_id': portfolio_id})
+    item = await acached(
+        'portfolio',
+        lambda: PortfolioItem.objects.filter(id=portfolio_id, is_published=True)
+        .prefetch_related('technologies').afirst(),
+        'detail', portfolio_id,
+    )
+    if item is None:
+        raise Http404('Portfolio item not found')
+    return render(request, 'portfolio/detail.html', {'item': item})
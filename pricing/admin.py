@@ -22,6 +22,7 @@ class PricingPlanAdmin(admin.ModelAdmin):
 class PricingFeatureAdmin(admin.ModelAdmin):
     list_display = ['plan', 'feature_text', 'is_included', 'display_order']
     list_filter = ['is_included', 'plan']
+    list_select_related = ['plan']
     search_fields = ['feature_text']
     readonly_fields = ['id', 'created_at', 'updated_at']
 
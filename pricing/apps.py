@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class PricingConfig(AppConfig):
     name = 'pricing'
+
+    def ready(self):
+        from forge.cache import invalidate_on_change
+        from .models import PricingPlan, PricingFeature
+        invalidate_on_change(PricingPlan, 'pricing')
+        invalidate_on_change(PricingFeature, 'pricing')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pricing', '0002_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pricingfeature',
+            index=models.Index(fields=['plan', 'display_order', 'feature_text'], name='pricingfeature_plan_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricingplan',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['display_order', 'name'], name='pricingplan_active_order_idx'),
+        ),
+    ]
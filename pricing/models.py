@@ -2,6 +2,30 @@ from django.db import models
 from forge.models import BaseModel
 
 
+class PricingPlanQuerySet(models.QuerySet):
+    """
+    Query API for the pricing page.
+    """
+
+    def active(self):
+        return self.filter(is_active=True)
+
+    def with_features(self):
+        """
+        Prefetch each plan's features in display order.
+        Ordering is spelled out so the prefetch query does not join back to
+        the plan table for PricingFeature's default ordering.
+        """
+        return self.prefetch_related(models.Prefetch(
+            'features',
+            queryset=PricingFeature.objects.order_by('display_order', 'feature_text'),
+        ))
+
+    def for_pricing_page(self):
+        """Active plans with their ordered features in exactly two queries."""
+        return self.active().with_features()
+
+
 class PricingPlan(BaseModel):
     """
     Model for pricing plans.
@@ -15,11 +39,20 @@ class PricingPlan(BaseModel):
     is_active = models.BooleanField(default=True)
     display_order = models.IntegerField(default=0)
 
+    objects = PricingPlanQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     class Meta:
         ordering = ['display_order', 'name']
+        indexes = [
+            models.Index(
+                fields=['display_order', 'name'],
+                condition=models.Q(is_active=True),
+                name='pricingplan_active_order_idx',
+            ),
+        ]
 
 
 class PricingFeature(BaseModel):
@@ -37,4 +70,10 @@ class PricingFeature(BaseModel):
 
     class Meta:
         ordering = ['plan', 'display_order', 'feature_text']
+        indexes = [
+            models.Index(
+                fields=['plan', 'display_order', 'feature_text'],
+                name='pricingfeature_plan_order_idx',
+            ),
+        ]
 
@@ -1,3 +1,59 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from .models import PricingPlan, PricingFeature
 
-# Create your tests here.
+
+class PricingQueryTests(TestCase):
+    def create_plans(self, count, features_per_plan):
+        for i in range(count):
+            plan = PricingPlan.objects.create(
+                name=f'Plan {i}', slug=f'plan-{i}-{PricingPlan.objects.count()}',
+                description='', display_order=i,
+            )
+            PricingFeature.objects.bulk_create([
+                PricingFeature(plan=plan, feature_text=f'Feature {j}', display_order=-j)
+                for j in range(features_per_plan)
+            ])
+
+    def test_query_count_is_flat(self):
+        self.create_plans(1, 1)
+        with self.assertNumQueries(2):
+            plans = list(PricingPlan.objects.for_pricing_page())
+            for plan in plans:
+                list(plan.features.all())
+
+        self.create_plans(10, 20)
+        with self.assertNumQueries(2):
+            plans = list(PricingPlan.objects.for_pricing_page())
+            for plan in plans:
+                list(plan.features.all())
+        self.assertEqual(len(plans), 11)
+
+    def test_features_are_in_display_order(self):
+        self.create_plans(1, 3)
+        plan = PricingPlan.objects.for_pricing_page().get()
+        self.assertEqual(
+            [feature.feature_text for feature in plan.features.all()],
+            ['Feature 2', 'Feature 1', 'Feature 0'],
+        )
+
+    def test_inactive_plans_are_excluded(self):
+        self.create_plans(2, 1)
+        PricingPlan.objects.filter(name='Plan 0').update(is_active=False)
+        self.assertEqual(
+            [plan.name for plan in PricingPlan.objects.for_pricing_page()],
+            ['Plan 1'],
+        )
+
+    def test_pricing_page_query_count_is_flat(self):
+        # Two conditional GET aggregates plus plans and their features
+        cache.clear()
+        self.create_plans(2, 2)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('pricing:index'))
+        cache.clear()
+        self.create_plans(8, 10)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('pricing:index'))
+        self.assertContains(response, 'Feature 9')
@@ -1,6 +1,18 @@
 from django.shortcuts import render
+from forge.cache import acached
+from forge.conditional import conditional_on
+from .models import PricingFeature, PricingPlan
 
 
-def pricing_index(request):
+@conditional_on(
+    lambda request: PricingPlan.objects.active(),
+    lambda request: PricingFeature.objects.filter(plan__is_active=True),
+    namespace='pricing',
+)
+async def pricing_index(request):
     """Pricing page view"""
-    return render(request, 'pricing/index.html')
+    async def build():
+        return [plan async for plan in PricingPlan.objects.for_pricing_page()]
+
+    plans = await acached('pricing', build, 'index')
+    return render(request, 'pricing/index.html', {'plans': plans})
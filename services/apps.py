@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class ServicesConfig(AppConfig):
     name = 'services'
+
+    def ready(self):
+        from forge.cache import invalidate_on_change
+        from .models import Service
+        invalidate_on_change(Service, 'services')
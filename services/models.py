@@ -1,4 +1,5 @@
 from django.db import models
+from django.urls import reverse
 from forge.models import BaseModel
 
 
@@ -18,6 +19,16 @@ class Service(BaseModel):
     def __str__(self):
         return self.name
 
+    def get_absolute_url(self):
+        return reverse('services:detail', args=[self.id])
+
     class Meta:
         ordering = ['-is_featured', 'name']
+        indexes = [
+            models.Index(
+                fields=['-is_featured', 'name'],
+                condition=models.Q(is_active=True),
+                name='service_active_order_idx',
+            ),
+        ]
 
@@ -0,0 +1,7 @@
+from forge.sitemaps import ModelSitemap
+from .models import Service
+
+
+class ServiceSitemap(ModelSitemap):
+    namespace = 'services'
+    queryset = Service.objects.filter(is_active=True).only('id', 'updated_at').order_by('id')
@@ -1,3 +1,50 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from .models import Service
 
-# Create your tests here.
+
+class ServiceCatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(
+            name='Cloud Integration', slug='cloud-integration',
+            description='Full description', short_description='Short description',
+        )
+
+    def test_warm_cache_costs_no_queries(self):
+        self.client.get(reverse('services:list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('services:list'))
+        self.assertContains(response, 'Cloud Integration')
+
+    def test_save_invalidates_cached_list(self):
+        self.client.get(reverse('services:list'))
+        self.service.name = 'Cloud Migration'
+        self.service.save()
+        response = self.client.get(reverse('services:list'))
+        self.assertContains(response, 'Cloud Migration')
+
+    def test_inactive_service_detail_is_404(self):
+        self.service.is_active = False
+        self.service.save()
+        response = self.client.get(reverse('services:detail', args=[self.service.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_matching_etag_gets_304_without_queries(self):
+        url = reverse('services:detail', args=[self.service.id])
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_save_changes_etag(self):
+        url = reverse('services:list')
+        etag = self.client.get(url)['ETag']
+        self.service.name = 'Cloud Migration'
+        self.service.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
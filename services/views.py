@@ -1,11 +1,31 @@
+from django.http import Http404
 from django.shortcuts import render
+from forge.cache import acached
+from forge.conditional import conditional_on
+from .models import Service
 
 
-def service_list(request):
-    """List all services"""
-    return render(request, 'services/list.html')
+@conditional_on(lambda request: Service.objects.filter(is_active=True), namespace='services')
+async def service_list(request):
+    """List all active services"""
+    async def build():
+        return [service async for service in Service.objects.filter(is_active=True)]
 
+    services = await acached('services', build, 'list')
+    return render(request, 'services/list.html', {'services': services})
 
-def service_detail(request, service_id):
+
+@conditional_on(
+    lambda request, service_id: Service.objects.filter(id=service_id, is_active=True),
+    namespace='services',
+)
+async def service_detail(request, service_id):
     """Service detail view"""
-    return render(request, 'services/detail.html', {'service_id': service_id})
+    service = await acached(
+        'services',
+        lambda: Service.objects.filter(id=service_id, is_active=True).afirst(),
+        'detail', service_id,
+    )
+    if service is None:
+        raise Http404('Service not found')
+    return render(request, 'services/detail.html', {'service': service})